@@ -0,0 +1,193 @@
+"""
+Одновременные писатели комментариев и читатели лент на SQLite
+в профиле базы по умолчанию и в профиле production (core/db.py).
+
+Каждый профиль получает свою копию одной и той же базы. Писатели
+в отдельных процессах добавляют комментарии к свежим постам, читатели
+открывают первую страницу главной и комментарии поста. Каждая операция
+оформлена как запрос: между операциями отправляются сигналы
+request_started и request_finished, поэтому без CONN_MAX_AGE
+соединение открывается заново на каждую операцию.
+
+    python -m benchmarks.concurrency --writers 4 --readers 8 --duration 10
+
+В отчете операции в секунду, p50/p95 в мс и число ошибок
+"database is locked" для писателей и читателей.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.utils import setup_django
+
+PROFILES = ('default', 'production')
+HOT_POSTS = 100
+COMMENT_TEXT = 'Комментарий бенчмарка'
+
+
+def populate(posts, seed):
+    """
+    Заполняет базу и возвращает id авторов и свежих постов.
+    """
+    from posts.models import Post, User
+    from posts.seed import Seeder
+
+    seeder = Seeder(seed=seed)
+    seeder.users(max(posts // 10, 2))
+    seeder.groups(max(posts // 1000, 1))
+    seeder.posts(posts)
+    seeder.comments(posts * 2)
+    seeder.finish()
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    post_ids = list(Post.objects.order_by('-pub_date', '-pk').values_list(
+        'pk', flat=True
+    )[:HOT_POSTS])
+    return user_ids, post_ids
+
+
+def write(rng, user_ids, post_ids):
+    from django.db import transaction
+
+    from posts.models import Comment
+
+    with transaction.atomic():
+        Comment.objects.create(
+            post_id=rng.choice(post_ids),
+            author_id=rng.choice(user_ids),
+            text=COMMENT_TEXT
+        )
+
+
+def read(rng, user_ids, post_ids):
+    from django.conf import settings
+
+    from posts.models import Comment, Post
+
+    list(Post.objects.select_related('author', 'group').order_by(
+        '-pub_date', '-pk'
+    )[:settings.ELEMENTS_PER_PAGE])
+    list(Comment.objects.filter(post_id=rng.choice(post_ids)).select_related(
+        'author'
+    ).order_by('created', 'pk')[:settings.COMMENTS_PER_PAGE])
+
+
+def run_worker(profile, db_path, role, seed, options, ids, barrier, results):
+    """
+    Настраивает Django в профиле profile, дожидается остальных
+    процессов и выполняет операции role в течение options.duration
+    секунд. Кладет в results (role, время операций в мс, число ошибок).
+    """
+    os.environ['DATABASE_PROFILE'] = profile
+    setup_django(db_path, migrate=False)
+
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError, connections
+
+    user_ids, post_ids = ids
+    operation = write if role == 'writer' else read
+    rng = random.Random(seed)
+    timings, errors = [], 0
+    barrier.wait()
+    deadline = time.time() + options.duration
+    while time.time() < deadline:
+        request_started.send(sender=None)
+        start = time.perf_counter()
+        try:
+            operation(rng, user_ids, post_ids)
+        except OperationalError:
+            errors += 1
+        else:
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            request_finished.send(sender=None)
+    connections.close_all()
+    results.put((role, timings, errors))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return round(ordered[index], 2)
+
+
+def bench_profile(profile, template, options, ids):
+    db_path = os.path.join(os.path.dirname(template), f'{profile}.sqlite3')
+    shutil.copy(template, db_path)
+    roles = ['writer'] * options.writers + ['reader'] * options.readers
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(len(roles))
+    queue = context.Queue()
+    processes = [
+        context.Process(target=run_worker, args=(
+            profile, db_path, role, options.seed + number, options, ids,
+            barrier, queue
+        ))
+        for number, role in enumerate(roles)
+    ]
+    for process in processes:
+        process.start()
+    results = {role: ([], 0) for role in set(roles)}
+    for _ in processes:
+        role, timings, errors = queue.get()
+        role_timings, role_errors = results[role]
+        results[role] = (role_timings + timings, role_errors + errors)
+    for process in processes:
+        process.join()
+    return {
+        role: {
+            'ops': round(len(timings) / options.duration, 1),
+            'p50': percentile(timings, 50),
+            'p95': percentile(timings, 95),
+            'errors': errors,
+        }
+        for role, (timings, errors) in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Секунд нагрузки на каждый профиль')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args()
+
+    os.environ['DATABASE_PROFILE'] = 'default'
+    template = setup_django(
+        os.path.join(tempfile.mkdtemp(), 'template.sqlite3')
+    )
+
+    from django.db import connections
+
+    ids = populate(options.posts, options.seed)
+    connections.close_all()
+
+    print(f'{options.posts} постов, писателей {options.writers}, '
+          f'читателей {options.readers}, {options.duration:g} с')
+    print(f'{"профиль":<12}{"роль":<8}{"оп/с":>9}{"p50":>9}{"p95":>9}'
+          f'{"ошибок":>8}')
+    results = {}
+    for profile in PROFILES:
+        results[profile] = bench_profile(profile, template, options, ids)
+        for role, data in sorted(results[profile].items()):
+            print(f'{profile:<12}{role:<8}{data["ops"]:>9}{data["p50"]:>9}'
+                  f'{data["p95"]:>9}{data["errors"]:>8}')
+    for role in sorted(results['default']):
+        before = results['default'][role]['ops']
+        after = results['production'][role]['ops']
+        if before:
+            print(f'{role}: пропускная способность x{after / before:.2f}')
+    shutil.rmtree(os.path.dirname(template), ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
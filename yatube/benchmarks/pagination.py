@@ -0,0 +1,76 @@
+"""
+Сравнение нумерованной и курсорной паджинации ленты
+на первой и глубокой странице.
+
+    python -m benchmarks.pagination --posts 60000 --page 5000
+"""
+import argparse
+
+from benchmarks.utils import measure, setup_django
+
+
+def populate(posts_count):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from posts.models import Post
+
+    author = get_user_model().objects.create_user(username='bench')
+    Post.objects.bulk_create(
+        Post(author=author, text=f'Пост {i}') for i in range(posts_count)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE posts_post "
+            "SET pub_date = datetime('2020-01-01', '+' || id || ' minutes')"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=60000)
+    parser.add_argument('--page', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.core.paginator import Paginator
+
+    from posts.models import Post
+    from posts.paginators import CursorPaginator, encode_cursor
+
+    populate(args.posts)
+    per_page = settings.ELEMENTS_PER_PAGE
+    posts = Post.objects.all()
+
+    def numbered(number):
+        def run():
+            list(Paginator(posts, per_page).get_page(number).object_list)
+        return run
+
+    def cursor(after):
+        def run():
+            list(CursorPaginator(posts, per_page).page(after=after))
+        return run
+
+    anchor = posts.order_by('-pub_date', '-pk')[
+        (args.page - 1) * per_page - 1
+    ]
+    deep_cursor = encode_cursor(anchor.pub_date, anchor.pk)
+
+    results = (
+        ('pages', 1, numbered(1)),
+        ('pages', args.page, numbered(args.page)),
+        ('cursor', 1, cursor(None)),
+        ('cursor', args.page, cursor(deep_cursor)),
+    )
+    print(f'{args.posts} постов, {per_page} на странице')
+    for mode, number, run in results:
+        elapsed = measure(run, args.repeat)
+        print(f'{mode:>7} страница {number:>6}: {elapsed:8.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+Задержка всех страниц сайта на наборах данных разного размера.
+
+Для каждого размера база дополняется командой seed_content, затем
+каждая страница из posts/urls.py, users/urls.py и about/urls.py
+запрашивается тестовым клиентом из нескольких потоков. В отчете
+p50/p95/p99 в мс, медиана и максимум числа SQL-запросов на запрос
+(из заголовка Server-Timing) и запросов в секунду. Теплые ленты
+отдаются из кеша без запросов к базе, поэтому каждая страница
+замеряется еще и холодной: перед каждым запросом холодного прохода
+кеш очищается (p95 и число SQL-запросов в колонках cold).
+
+    python -m benchmarks.routes --sizes 1000,10000 --output results.json
+    python -m benchmarks.routes --sizes 1000,10000 --baseline results.json
+
+С --baseline прогон завершается с кодом 1, если теплая или холодная
+p95 страницы выросла больше чем на --tolerance (и на --min-delta мс)
+или выросло число запросов к базе.
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import math
+import re
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import setup_django
+
+BENCH_USERNAME = 'bench'
+BENCH_FOLLOWS = 10
+QUERIES_PATTERN = re.compile(r'sql;desc="(\d+) queries"')
+
+Route = namedtuple('Route', ('kwargs', 'login', 'relogin'))
+
+
+def route(*kwargs, login=False, relogin=False):
+    return Route(kwargs, login, relogin)
+
+
+# Страница -> аргументы URL из контекста прогона и нужен ли вход.
+# logout завершает сессию, поэтому вход повторяется перед каждым запросом
+ROUTES = {
+    'posts:index': route(),
+    'posts:group': route('slug'),
+    'posts:post_create': route(login=True),
+    'posts:follow_index': route(login=True),
+    'posts:search': route(),
+    'posts:profile': route('username'),
+    'posts:post_detail': route('username', 'post_id'),
+    'posts:post_edit': route('own_username', 'own_post_id', login=True),
+    'posts:comments': route('username', 'post_id'),
+    'posts:add_comment': route('username', 'post_id', login=True),
+    'posts:profile_follow': route('username', login=True),
+    'posts:profile_unfollow': route('other_username', login=True),
+    'users:signup': route(),
+    'users:logout': route(login=True, relogin=True),
+    'users:login': route(),
+    'users:password_change': route(login=True),
+    'users:password_change_done': route(login=True),
+    'users:password_reset': route(),
+    'users:password_reset_done': route(),
+    'users:password_reset_confirm': route('uidb64', 'token'),
+    'users:password_reset_complete': route(),
+    'about:me': route(),
+    'about:tech': route(),
+}
+QUERY_STRINGS = {
+    'posts:search': '?q=мир',
+}
+URL_KWARGS = {
+    'own_username': 'username',
+    'own_post_id': 'post_id',
+    'other_username': 'username',
+}
+
+
+def check_coverage():
+    """
+    Падает, если в urls.py приложений появилась страница без бенчмарка.
+    """
+    from about import urls as about_urls
+    from posts import urls as posts_urls
+    from users import urls as users_urls
+
+    names = {
+        f'{module.app_name}:{pattern.name}'
+        for module in (posts_urls, users_urls, about_urls)
+        for pattern in module.urlpatterns
+    }
+    missing = names - set(ROUTES)
+    if missing:
+        sys.exit('Нет бенчмарка для страниц: ' + ', '.join(sorted(missing)))
+
+
+def grow(posts, seed, batch_size=1000):
+    """
+    Дополняет базу до posts постов: на 10 постов один пользователь
+    и два комментария.
+    """
+    from posts.models import Post
+    from posts.seed import Seeder
+
+    missing = posts - Post.objects.count()
+    if missing <= 0:
+        return
+    seeder = Seeder(seed=seed, batch_size=batch_size)
+    seeder.users(max(missing // 10, 2))
+    seeder.groups(max(missing // 1000, 1))
+    seeder.posts(missing)
+    seeder.comments(missing * 2)
+    seeder.follows(20)
+    seeder.finish()
+
+
+def make_context():
+    """
+    Готовит пользователя прогона и аргументы страниц: популярного автора,
+    его последний пост и группу, собственный пост и ссылку сброса пароля.
+    """
+    from django.contrib.auth.tokens import default_token_generator
+    from django.db.models import Count
+    from django.utils.encoding import force_bytes
+    from django.utils.http import urlsafe_base64_encode
+
+    from posts import timeline
+    from posts.models import Follow, Group, Post, User
+
+    user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+    authors = list(
+        User.objects.exclude(pk=user.pk)
+        .annotate(total=Count('posts')).order_by('-total', 'pk')
+        [:BENCH_FOLLOWS + 1]
+    )
+    for author in authors[1:]:
+        if not Follow.objects.filter(user=user, following=author).exists():
+            Follow.objects.create(user=user, following=author)
+            timeline.backfill(user, author)
+    own_post = user.posts.first() or Post.objects.create(
+        author=user, text='Пост для бенчмарка'
+    )
+    author = authors[0]
+    post = author.posts.order_by('-pub_date').first()
+    group = Group.objects.annotate(total=Count('posts')).order_by(
+        '-total', 'pk'
+    ).first()
+    return user, {
+        'username': author.username,
+        'post_id': post.pk,
+        'slug': group.slug,
+        'own_username': user.username,
+        'own_post_id': own_post.pk,
+        'other_username': authors[-1].username,
+        'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': default_token_generator.make_token(user),
+    }
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return round(ordered[index], 2)
+
+
+def make_client(spec, user):
+    from django.test import Client
+
+    client = Client()
+    if spec.login:
+        client.force_login(user)
+    return client
+
+
+def get_page(client, url, spec, user):
+    """
+    Запрашивает страницу и возвращает время в мс, число SQL-запросов
+    и код ответа.
+    """
+    if spec.relogin:
+        client.force_login(user)
+    start = time.perf_counter()
+    response = client.get(url)
+    elapsed = (time.perf_counter() - start) * 1000
+    match = QUERIES_PATTERN.search(response.get('Server-Timing', ''))
+    return elapsed, int(match.group(1)) if match else 0, response.status_code
+
+
+def bench_route(name, spec, context, user, options):
+    from django.core.cache import cache
+    from django.db import connections
+    from django.urls import reverse
+
+    from posts import objects
+
+    url = reverse(name, kwargs={
+        URL_KWARGS.get(key, key): context[key] for key in spec.kwargs
+    }) + QUERY_STRINGS.get(name, '')
+    samples = []
+
+    def worker(count):
+        client = make_client(spec, user)
+        try:
+            for _ in range(count):
+                samples.append(get_page(client, url, spec, user))
+        finally:
+            connections.close_all()
+
+    warmup = make_client(spec, user)
+    for _ in range(options.warmup):
+        get_page(warmup, url, spec, user)
+
+    concurrency = options.concurrency
+    counts = [
+        options.requests // concurrency
+        + (1 if i < options.requests % concurrency else 0)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, counts))
+    wall = time.perf_counter() - started
+
+    cold_samples = []
+    cold = make_client(spec, user)
+    for _ in range(options.cold):
+        cache.clear()
+        objects.local.clear()
+        cold_samples.append(get_page(cold, url, spec, user))
+
+    timings, queries, statuses = zip(*samples)
+    cold_timings = [elapsed for elapsed, _, _ in cold_samples]
+    return {
+        'url': url,
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+        'queries_p50': percentile(queries, 50),
+        'queries_max': max(queries),
+        'rps': round(len(timings) / wall, 1),
+        'cold_p95': percentile(cold_timings, 95),
+        'cold_queries': max(
+            (count for _, count, _ in cold_samples), default=None
+        ),
+        'status': sorted(set(statuses)),
+    }
+
+
+# Метрики, которые сравниваются с baseline: (время, запросы к базе)
+COMPARED = (('p95', 'queries_max'), ('cold_p95', 'cold_queries'))
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """
+    Возвращает список регрессий относительно baseline.
+    """
+    regressions = []
+    for size, routes in results.items():
+        for name, current in routes.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            for timing, queries in COMPARED:
+                before, after = previous.get(timing), current.get(timing)
+                if before is not None and after is not None and (
+                        after - before > min_delta
+                        and after > before * (1 + tolerance)):
+                    regressions.append(
+                        f'{size} {name}: {timing} {before} -> {after} мс'
+                    )
+                before, after = previous.get(queries), current.get(queries)
+                if before is not None and after is not None and (
+                        after > before):
+                    regressions.append(
+                        f'{size} {name}: {queries} {before} -> {after}'
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Число постов в базе, через запятую')
+    parser.add_argument('--requests', type=int, default=100,
+                        help='Запросов к каждой странице')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cold', type=int, default=10,
+                        help='Запросов к каждой странице с пустым кешем')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help='Файл базы; по умолчанию временный')
+    parser.add_argument('--output', help='Куда записать результаты JSON')
+    parser.add_argument('--baseline', help='Результаты для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Допустимый относительный рост p95')
+    parser.add_argument('--min-delta', type=float, default=5.0,
+                        help='Рост p95 меньше этого числа мс не считается')
+    options = parser.parse_args()
+
+    setup_django(options.db)
+    check_coverage()
+    logging.getLogger('core.middleware').setLevel(logging.ERROR)
+
+    results = {}
+    sizes = [int(size) for size in options.sizes.split(',')]
+    for step, size in enumerate(sizes):
+        grow(size, options.seed + step)
+        user, context = make_context()
+        results[str(size)] = {}
+        print(f'\n{size} постов')
+        print(f'{"страница":<32}{"p50":>9}{"p95":>9}{"p99":>9}'
+              f'{"SQL":>8}{"rps":>9}{"cold p95":>10}{"cold SQL":>9}')
+        for name, spec in ROUTES.items():
+            data = bench_route(name, spec, context, user, options)
+            results[str(size)][name] = data
+            sql = f'{data["queries_p50"]:g}/{data["queries_max"]}'
+            print(f'{name:<32}{data["p50"]:>9}{data["p95"]:>9}'
+                  f'{data["p99"]:>9}{sql:>8}{data["rps"]:>9}'
+                  f'{data["cold_p95"]!s:>10}{data["cold_queries"]!s:>9}')
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump({
+                'created': dt.datetime.now().isoformat(),
+                'requests': options.requests,
+                'concurrency': options.concurrency,
+                'cold': options.cold,
+                'results': results,
+            }, output, ensure_ascii=False, indent=2)
+
+    if options.baseline:
+        with open(options.baseline) as source:
+            baseline = json.load(source)['results']
+        regressions = compare(
+            results, baseline, options.tolerance, options.min_delta
+        )
+        if regressions:
+            print('\nРегрессии:\n' + '\n'.join(regressions))
+            sys.exit(1)
+        print('\nРегрессий нет')
+
+
+if __name__ == '__main__':
+    main()
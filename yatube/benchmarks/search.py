@@ -0,0 +1,105 @@
+"""
+Сравнение поиска по индексу FTS5 с поиском LIKE '%слово%',
+которым раньше искала админка.
+
+    python -m benchmarks.search --posts 1000000
+"""
+import argparse
+import itertools
+import random
+
+from benchmarks.utils import measure, setup_django
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_POST = 30
+BATCH_SIZE = 10000
+
+
+def make_vocabulary(rng):
+    letters = 'абвгдежзиклмнопрстуфхцчшэюя'
+    return [
+        ''.join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def populate(posts_count, vocabulary, rng):
+    """
+    Заполняет базу постами из случайных слов. Частоты слов убывают
+    по закону Ципфа, как в живом тексте.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from posts.models import Post, make_excerpt
+
+    author = get_user_model().objects.create_user(username='bench')
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(vocabulary) + 1)
+    ))
+    with transaction.atomic():
+        for start in range(0, posts_count, BATCH_SIZE):
+            texts = (
+                ' '.join(rng.choices(
+                    vocabulary, cum_weights=cum_weights, k=WORDS_PER_POST
+                ))
+                for _ in range(min(BATCH_SIZE, posts_count - start))
+            )
+            Post.objects.bulk_create(
+                Post(author=author, text=text, excerpt=make_excerpt(text))
+                for text in texts
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+
+    from posts.models import Post
+    from posts.search import SearchPaginator, build_match, matching_ids
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    populate(args.posts, vocabulary, rng)
+    per_page = settings.ELEMENTS_PER_PAGE
+    posts = Post.objects.order_by('-pub_date', '-pk')
+
+    def like_page(word):
+        return lambda: list(posts.filter(text__icontains=word)[:per_page])
+
+    def like_count(word):
+        return lambda: posts.filter(text__icontains=word).count()
+
+    def fts_page(word):
+        return lambda: list(SearchPaginator(word, per_page).page())
+
+    def fts_count(word):
+        match = build_match(word)
+        return lambda: Post.objects.filter(pk__in=matching_ids(match)).count()
+
+    words = (
+        ('частое', vocabulary[0]),
+        ('среднее', vocabulary[100]),
+        ('редкое', vocabulary[-1]),
+    )
+    print(f'{args.posts} постов, {per_page} на странице')
+    for label, word in words:
+        for name, run in (
+            ('LIKE страница', like_page(word)),
+            ('LIKE count', like_count(word)),
+            ('FTS5 страница', fts_page(word)),
+            ('FTS5 count', fts_count(word)),
+        ):
+            elapsed = measure(run, args.repeat)
+            print(f'{label:>8} {name:>14}: {elapsed:10.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Общие инструменты бенчмарков: временная база и замер времени.
+
+Бенчмарки запускаются из каталога проекта, например:
+    python -m benchmarks.pagination
+"""
+import os
+import statistics
+import tempfile
+import time
+
+import django
+
+
+def setup_django(db_path=None, migrate=True):
+    """
+    Настраивает Django на отдельную SQLite-базу и применяет миграции.
+    Рабочая база проекта не затрагивается, общий кеш (CACHE_BACKEND=sqlite)
+    тоже: бенчмарк получает свой файл кеша во временном каталоге.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    if settings.CACHE_BACKEND == 'sqlite':
+        settings.CACHES['default']['LOCATION'] = os.path.join(
+            tempfile.mkdtemp(), 'cache.sqlite3'
+        )
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+    return db_path
+
+
+def measure(func, repeat=20):
+    """
+    Выполняет func repeat раз и возвращает медиану времени в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
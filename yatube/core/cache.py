@@ -0,0 +1,328 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache.backends.locmem import LocMemCache as BaseLocMemCache
+
+from . import metrics
+
+MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """
+    Учитывает попадания и промахи кеша в счетчиках текущего запроса.
+    get_many базового BaseCache сводится к get и учитывается им же.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version=version)
+        metrics.record_cache(value is not MISSING)
+        return default if value is MISSING else value
+
+
+class LocMemCache(InstrumentedCacheMixin, BaseLocMemCache):
+    pass
+
+
+class BaseSQLiteCache(BaseCache):
+    """
+    Общий для всех воркеров хоста кеш в файле SQLite в режиме WAL.
+
+    LOCATION - путь к файлу. Значения хранятся в pickle, поэтому
+    каталог файла должен принадлежать пользователю процесса и быть
+    закрыт для остальных (0700), а сам файл создается с правами 0600.
+    OPTIONS:
+    MAX_ENTRIES - максимальное число записей,
+    MAX_SIZE - максимальный суммарный размер значений в байтах,
+    CULL_FREQUENCY - при переполнении удаляется 1/CULL_FREQUENCY записей,
+    давно не читавшихся (LRU).
+
+    Целые числа хранятся как INTEGER, поэтому incr - один атомарный
+    UPDATE, видимый всем процессам.
+    """
+    # Отметка о чтении обновляется не чаще раза в столько секунд,
+    # чтобы чтения не превращались в запись
+    ACCESS_RESOLUTION = 1.0
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        if not location:
+            raise ImproperlyConfigured(
+                'Для SQLiteCache нужен путь к файлу кеша (CACHE_LOCATION)'
+            )
+        self._path = location
+        options = params.get('OPTIONS', {})
+        self._max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        self._local = threading.local()
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            self._create_file()
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            with self._write() as connection:
+                self._create_tables(connection)
+        return connection
+
+    def _create_file(self):
+        """
+        Создает файл кеша с правами 0600 в закрытом каталоге.
+        Файлы журнала WAL SQLite создает с правами файла базы.
+        """
+        directory = os.path.dirname(os.path.abspath(self._path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.stat(directory)
+        if info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise ImproperlyConfigured(
+                f'Каталог кеша {directory} должен принадлежать '
+                'пользователю процесса и быть закрыт для остальных (0700)'
+            )
+        descriptor = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            os.fchmod(descriptor, 0o600)
+        finally:
+            os.close(descriptor)
+
+    @staticmethod
+    def _create_tables(connection):
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'expires REAL, accessed REAL NOT NULL, '
+            'size INTEGER NOT NULL)'
+        )
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS cache_accessed '
+            'ON cache (accessed)'
+        )
+        # Число записей и их размер ведут триггеры, чтобы проверка
+        # переполнения при записи не просматривала всю таблицу
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_stats ('
+            'id INTEGER PRIMARY KEY CHECK (id = 0), '
+            'entries INTEGER NOT NULL, size INTEGER NOT NULL)'
+        )
+        connection.execute(
+            'INSERT OR IGNORE INTO cache_stats '
+            'SELECT 0, COUNT(*), TOTAL(size) FROM cache'
+        )
+        connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS cache_inserted '
+            'AFTER INSERT ON cache BEGIN '
+            'UPDATE cache_stats SET entries = entries + 1, '
+            'size = size + NEW.size; END'
+        )
+        connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS cache_deleted '
+            'AFTER DELETE ON cache BEGIN '
+            'UPDATE cache_stats SET entries = entries - 1, '
+            'size = size - OLD.size; END'
+        )
+        connection.execute(
+            'CREATE TRIGGER IF NOT EXISTS cache_resized '
+            'AFTER UPDATE OF size ON cache BEGIN '
+            'UPDATE cache_stats SET size = size - OLD.size + NEW.size; END'
+        )
+
+    @contextmanager
+    def _write(self):
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    @staticmethod
+    def _dump(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _fetch(self, keys):
+        now = time.time()
+        placeholders = ', '.join('?' * len(keys))
+        rows = self._connection.execute(
+            f'SELECT key, value, expires, accessed FROM cache '
+            f'WHERE key IN ({placeholders})',
+            keys
+        ).fetchall()
+        found, expired, touched = {}, [], []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append(key)
+                continue
+            found[key] = self._load(value)
+            if now - accessed > self.ACCESS_RESOLUTION:
+                touched.append(key)
+        if expired or touched:
+            with self._write() as connection:
+                connection.executemany(
+                    'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                    ((key, now) for key in expired)
+                )
+                connection.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?',
+                    ((now, key) for key in touched)
+                )
+        return found
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        if not keys:
+            return {}
+        found = self._fetch(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    def _store(self, mode, key, value, timeout):
+        value = self._dump(value)
+        size = len(value) if isinstance(value, bytes) else 8
+        now = time.time()
+        with self._write() as connection:
+            if mode == 'add':
+                connection.execute(
+                    'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                    (key, now)
+                )
+            # Замена записи - UPDATE, а не REPLACE: REPLACE удаляет
+            # старую строку без триггеров и сбивает cache_stats
+            on_conflict = 'NOTHING' if mode == 'add' else (
+                'UPDATE SET value = excluded.value, '
+                'expires = excluded.expires, '
+                'accessed = excluded.accessed, size = excluded.size'
+            )
+            cursor = connection.execute(
+                'INSERT INTO cache (key, value, expires, accessed, size) '
+                'VALUES (?, ?, ?, ?, ?) '
+                f'ON CONFLICT (key) DO {on_conflict}',
+                (key, value, self.get_backend_timeout(timeout), now, size)
+            )
+            stored = cursor.rowcount == 1
+            if stored:
+                self._cull(connection, now)
+        return stored
+
+    def _stats(self, connection):
+        return connection.execute(
+            'SELECT entries, size FROM cache_stats'
+        ).fetchone()
+
+    def _cull(self, connection, now):
+        entries, size = self._stats(connection)
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (now,)
+        )
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+            return
+        entries, size = self._stats(connection)
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            (max(entries // self._cull_frequency, 1),)
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._store('add', self._key(key, version), value, timeout)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._store('set', self._key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            cursor = connection.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time())
+            )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            row = connection.execute(
+                'SELECT value FROM cache WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            if not isinstance(row[0], int):
+                raise TypeError(f"Value of '{key}' is not an integer")
+            connection.execute(
+                'UPDATE cache SET value = value + ? WHERE key = ?',
+                (delta, key)
+            )
+        return row[0] + delta
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._connection.execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, time.time())
+        ).fetchone() is not None
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        with self._write() as connection:
+            connection.executemany(
+                'DELETE FROM cache WHERE key = ?', ((key,) for key in keys)
+            )
+
+    def clear(self):
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение живет весь срок потока, как у LocMemCache
+        pass
+
+
+class SQLiteCache(InstrumentedCacheMixin, BaseSQLiteCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        for key in keys:
+            metrics.record_cache(key in found)
+        return found
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register()
+def check_local_cache(app_configs, **kwargs):
+    """
+    Предупреждает, что в кеше процесса надолго остаются ленты:
+    сброс версий и hot-листов не доходит до других воркеров.
+    """
+    feed_timeout = (
+        settings.FEED_CACHE_TIMEOUT + settings.FEED_CACHE_STALE_TIMEOUT
+    )
+    if (not isinstance(caches['default'], LocMemCache)
+            or feed_timeout <= settings.LOCAL_FEED_CACHE_TIMEOUT):
+        return []
+    return [Warning(
+        'Кеш в памяти процесса хранит ленты '
+        f'{feed_timeout} с: другие воркеры не видят сброс лент '
+        'и отдают устаревшие страницы.',
+        hint='Включите общий кеш CACHE_BACKEND=sqlite с CACHE_LOCATION '
+             'или уменьшите FEED_CACHE_TIMEOUT и FEED_CACHE_STALE_TIMEOUT до '
+             f'{settings.LOCAL_FEED_CACHE_TIMEOUT} с.',
+        id='core.W001',
+    )]
@@ -0,0 +1,41 @@
+"""
+Настройка соединений с базой SQLite.
+
+На каждом новом соединении выполняются PRAGMA из settings.SQLITE_PRAGMAS.
+Профиль DATABASE_PROFILE=production включает журнал WAL, в котором
+чтения не ждут записи, а запись не ждет чтений, и держит соединения
+открытыми между запросами (CONN_MAX_AGE), поэтому PRAGMA выполняются
+один раз на соединение, а не на каждый запрос.
+"""
+import sqlite3
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Выполняет PRAGMA нового соединения. Запросы идут мимо курсора
+    Django и не попадают в счетчики запросов страницы.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name}={value}')
+
+
+def copy_database(source, target):
+    """
+    Копирует базу SQLite source в target через backup API: копия
+    согласована, даже если в source в это время пишут, а открытые
+    соединения с target видят новые данные без переподключения.
+    """
+    origin = sqlite3.connect(source)
+    copy = sqlite3.connect(target)
+    try:
+        origin.backup(copy)
+    finally:
+        copy.close()
+        origin.close()
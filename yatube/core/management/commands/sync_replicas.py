@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import copy_database
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в копии для чтения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять копирование каждые столько секунд; '
+                 '0 - скопировать один раз'
+        )
+
+    def handle(self, *args, **options):
+        source = settings.DATABASES['default']['NAME']
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(source, settings.DATABASES[alias]['NAME'])
+            self.stdout.write(
+                f'Скопировано в копий: {len(settings.DATABASE_REPLICAS)}'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,92 @@
+"""
+Счетчики текущего запроса: SQL, кеш и рендеринг шаблонов.
+
+Счетчики хранятся в threading.local, поэтому каждый поток
+gunicorn-воркера видит только свой запрос.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        """
+        Обертка для connection.execute_wrapper: считает запросы и их время.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'template_ms': round(self.template_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def finish():
+    metrics = current()
+    _local.metrics = None
+    return metrics
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def record_cache(hit):
+    metrics = current()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+@contextmanager
+def render_template():
+    """
+    Учитывает время рендеринга шаблона. Шаблоны, вложенные в другой
+    (карточки постов внутри страницы), уже входят во время внешнего
+    и отдельно не считаются.
+    """
+    metrics = current()
+    if metrics is None or metrics.template_depth:
+        yield
+        return
+    metrics.template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.template_depth -= 1
+        metrics.template_time += time.perf_counter() - start
@@ -0,0 +1,115 @@
+import json
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, routers
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudgetExceeded(Exception):
+    pass
+
+
+def get_budget(view_name):
+    """
+    Возвращает бюджет страницы: значения 'default' из
+    settings.REQUEST_BUDGETS, дополненные значениями для view_name.
+    """
+    budgets = settings.REQUEST_BUDGETS
+    return {**budgets.get('default', {}), **budgets.get(view_name, {})}
+
+
+def server_timing(data):
+    return ', '.join((
+        f'sql;desc="{data["queries"]} queries";dur={data["sql_ms"]}',
+        f'cache;desc="{data["cache_hits"]} hits, '
+        f'{data["cache_misses"]} misses"',
+        f'tpl;dur={data["template_ms"]}',
+        f'total;dur={data["total_ms"]}',
+    ))
+
+
+class RequestMetricsMiddleware:
+    """
+    Считает SQL-запросы и их время, обращения к кешу и время рендеринга
+    шаблонов. Отдает их в заголовке Server-Timing и строкой JSON в лог,
+    а при превышении бюджета страницы предупреждает или падает
+    (settings.REQUEST_BUDGET_ACTION = 'warn' или 'raise').
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        current = metrics.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(current.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.finish()
+
+        view_name = getattr(request.resolver_match, 'view_name', None)
+        data = current.as_dict()
+        response['Server-Timing'] = server_timing(data)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            **data
+        }))
+        self.check_budget(view_name, data)
+        return response
+
+    def check_budget(self, view_name, data):
+        exceeded = {
+            name: (data[name], limit)
+            for name, limit in get_budget(view_name).items()
+            if data[name] > limit
+        }
+        if not exceeded:
+            return
+        message = f'{view_name}: превышен бюджет ' + ', '.join(
+            f'{name}={value} > {limit}'
+            for name, (value, limit) in exceeded.items()
+        )
+        if settings.REQUEST_BUDGET_ACTION == 'raise':
+            raise RequestBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включает чтение из копий базы для view-функции запроса
+    (core/routers.py). Если в запросе была запись, ставит cookie,
+    с которой следующие запросы пользователя читают из основной базы.
+    Стоит выше SessionMiddleware, чтобы учитывать и запись сессии.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.finish()
+        if wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routers.start(request, view_func)
@@ -0,0 +1,117 @@
+"""
+Маршрутизация запросов между основной базой и копиями для чтения.
+
+Запись всегда идет в основную базу (default). Чтения моделей
+приложений settings.REPLICA_APP_LABELS во view-функциях из модулей
+settings.REPLICA_VIEW_MODULES идут в случайную копию
+из settings.DATABASE_REPLICAS, сессии читаются из основной базы.
+После записи пользователь еще settings.REPLICA_STICKY_SECONDS секунд
+читает только из основной базы (cookie settings.REPLICA_STICKY_COOKIE),
+чтобы видеть свои изменения, пока копии их догоняют.
+
+Данные, которые надолго ложатся в общий кеш (страницы лент, кеш
+объектов, hot-листы), в течение того же окна после любой записи
+на сайте читаются из основной базы (fresh_reads): иначе в кеше
+надолго осталось бы состояние отставшей копии.
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+LAST_WRITE_KEY = 'replica-last-write'
+
+_state = threading.local()
+
+
+def start(request, view_func):
+    """
+    Начинает запрос: чтения идут в копии, если копии настроены,
+    view-функция из REPLICA_VIEW_MODULES и пользователь недавно
+    ничего не записывал.
+    """
+    _state.replicas = bool(
+        settings.DATABASE_REPLICAS
+        and view_func.__module__ in settings.REPLICA_VIEW_MODULES
+        and settings.REPLICA_STICKY_COOKIE not in request.COOKIES
+    )
+    _state.wrote = False
+    _state.primary = 0
+
+
+def finish():
+    """
+    Завершает запрос и возвращает True, если в нем была запись.
+    """
+    wrote = getattr(_state, 'wrote', False)
+    _state.__dict__.clear()
+    return wrote
+
+
+def reads_replicas():
+    return (getattr(_state, 'replicas', False)
+            and not getattr(_state, 'primary', 0))
+
+
+@contextmanager
+def use_primary():
+    """
+    Внутри блока все чтения идут в основную базу.
+    """
+    _state.primary = getattr(_state, 'primary', 0) + 1
+    try:
+        yield
+    finally:
+        _state.primary -= 1
+
+
+@contextmanager
+def fresh_reads():
+    """
+    Читает из основной базы, если на сайте была запись
+    за последние REPLICA_STICKY_SECONDS секунд.
+    """
+    if not reads_replicas():
+        yield
+        return
+    last_write = cache.get(LAST_WRITE_KEY, 0)
+    if time.time() - last_write < settings.REPLICA_STICKY_SECONDS:
+        with use_primary():
+            yield
+    else:
+        yield
+
+
+class ReplicaRouter:
+    """
+    Чтения в копии (см. start), запись и миграции - в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (reads_replicas()
+                and model._meta.app_label in settings.REPLICA_APP_LABELS):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if getattr(_state, 'wrote', True):
+            return 'default'
+        _state.wrote = True
+        # Дальше в этом запросе читается то, что только что записано
+        _state.replicas = False
+        if settings.DATABASE_REPLICAS:
+            # Отметка ставится до записи, чтобы кеши, которые
+            # сбросит эта запись, заполнялись уже из основной базы
+            cache.set(LAST_WRITE_KEY, time.time(), None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
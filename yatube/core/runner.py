@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Запускает тесты с кешем в памяти процесса, даже если задан
+    CACHE_BACKEND=sqlite: тесты очищают кеш, и общий кеш воркеров
+    они не должны затрагивать.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_settings = override_settings(
+            CACHES={'default': settings.CACHE_BACKENDS['locmem']},
+            FEED_CACHE_TIMEOUT=settings.LOCAL_FEED_CACHE_TIMEOUT,
+            FEED_CACHE_STALE_TIMEOUT=0
+        )
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
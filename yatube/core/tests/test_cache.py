@@ -0,0 +1,149 @@
+"""
+Модуль предназначен для тестирования общего кеша на SQLite.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from core.cache import SQLiteCache
+
+INCREMENTS = 200
+WORKERS = 4
+
+
+def make_cache(path, **options):
+    return SQLiteCache(path, {'OPTIONS': options})
+
+
+def increment(path):
+    cache = make_cache(path)
+    for _ in range(INCREMENTS):
+        cache.incr('counter')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'cache.sqlite3')
+        self.cache = make_cache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_shared_between_instances(self):
+        """
+        Тест проверяет, что разные экземпляры кеша (воркеры) видят
+        записи и удаления друг друга.
+        """
+        other = make_cache(self.path)
+        self.cache.set('key', {'value': [1, 2]})
+        self.assertEqual(other.get('key'), {'value': [1, 2]})
+        other.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_add_get_many_and_expiry(self):
+        """
+        Тест проверяет add, get_many и истечение срока записи.
+        """
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.cache.set('expired', 'value', timeout=0)
+        self.assertEqual(
+            self.cache.get_many(['key', 'expired', 'missing']),
+            {'key': 'first'}
+        )
+        self.assertTrue(self.cache.add('expired', 'again'))
+
+    def test_incr_is_atomic_across_processes(self):
+        """
+        Тест проверяет, что incr из нескольких процессов не теряет
+        приращений.
+        """
+        self.cache.set('counter', 0, None)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=increment, args=(self.path,))
+            for _ in range(WORKERS)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get('counter'), WORKERS * INCREMENTS)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_lru_eviction_by_entries(self):
+        """
+        Тест проверяет, что при переполнении вытесняются записи,
+        которые дольше всего не читались.
+        """
+        cache = make_cache(self.path, MAX_ENTRIES=3, CULL_FREQUENCY=3)
+        cache.ACCESS_RESOLUTION = 0
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        cache.get('a')
+        cache.set('d', 'd')
+        self.assertEqual(
+            cache.get_many(['a', 'b', 'c', 'd']),
+            {'a': 'a', 'c': 'c', 'd': 'd'}
+        )
+
+    def test_size_cap(self):
+        """
+        Тест проверяет, что суммарный размер значений не превышает MAX_SIZE.
+        """
+        cache = make_cache(self.path, MAX_SIZE=10000, CULL_FREQUENCY=2)
+        for number in range(20):
+            cache.set(f'key{number}', b'x' * 1000)
+        size, = cache._connection.execute(
+            'SELECT TOTAL(size) FROM cache'
+        ).fetchone()
+        self.assertLessEqual(size, 10000)
+        self.assertIsNotNone(cache.get('key19'))
+
+    def test_stats_follow_writes_without_count(self):
+        """
+        Тест проверяет, что число и размер записей ведутся при каждой
+        записи, удалении и истечении, а запись не считает всю таблицу.
+        """
+        statements = []
+        self.cache._connection.set_trace_callback(statements.append)
+        self.cache.set('a', b'x' * 100)
+        self.cache.set('a', b'x' * 10)
+        self.cache.add('a', b'x' * 1000)
+        self.cache.set('b', 1)
+        self.cache.set('c', 'c', timeout=-1)
+        self.cache.get('c')
+        self.cache.delete('b')
+        self.assertFalse(any('COUNT(' in sql for sql in statements))
+        self.assertEqual(
+            self.cache._stats(self.cache._connection),
+            self.cache._connection.execute(
+                'SELECT COUNT(*), TOTAL(size) FROM cache'
+            ).fetchone()
+        )
+        self.cache.clear()
+        self.assertEqual(self.cache._stats(self.cache._connection), (0, 0))
+
+    def test_private_file(self):
+        """
+        Тест проверяет, что кеш создает закрытый каталог и файл
+        и не открывает файл в каталоге, доступном другим пользователям.
+        """
+        path = os.path.join(self.dir, 'private', 'cache.sqlite3')
+        make_cache(path).set('key', 'value')
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777,
+                         0o700)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        shared = os.path.join(self.dir, 'shared')
+        os.mkdir(shared)
+        os.chmod(shared, 0o777)
+        with self.assertRaises(ImproperlyConfigured):
+            make_cache(os.path.join(shared, 'cache.sqlite3')).get('key')
+        with self.assertRaises(ImproperlyConfigured):
+            make_cache('')
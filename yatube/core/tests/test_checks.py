@@ -0,0 +1,44 @@
+"""
+Модуль предназначен для тестирования системных проверок настроек.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_local_cache
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'core.cache.LocMemCache'}}
+TEST_LONG_TIMEOUT = 60 * 60
+
+
+@override_settings(FEED_CACHE_TIMEOUT=TEST_LONG_TIMEOUT,
+                   FEED_CACHE_STALE_TIMEOUT=0)
+class LocalCacheCheckTest(SimpleTestCase):
+    def test_shared_cache_allowed(self):
+        """
+        Тест проверяет, что долгий кеш лент в общем кеше допустим.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            caches = {'default': {
+                'BACKEND': 'core.cache.SQLiteCache',
+                'LOCATION': os.path.join(directory, 'cache.sqlite3'),
+            }}
+            with self.settings(CACHES=caches):
+                self.assertEqual(check_local_cache(None), [])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_warns_about_long_local_feeds(self):
+        """
+        Тест проверяет, что долгий кеш лент в памяти процесса
+        вызывает предупреждение, а короткий - нет.
+        """
+        self.assertEqual(
+            [warning.id for warning in check_local_cache(None)],
+            ['core.W001']
+        )
+        with self.settings(
+            FEED_CACHE_TIMEOUT=settings.LOCAL_FEED_CACHE_TIMEOUT
+        ):
+            self.assertEqual(check_local_cache(None), [])
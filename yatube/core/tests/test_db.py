@@ -0,0 +1,63 @@
+"""
+Модуль предназначен для тестирования настройки соединений SQLite.
+"""
+import os
+import shutil
+import tempfile
+
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+
+TEST_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 1024 * 1024,
+    'cache_size': -1024,
+    'busy_timeout': 1000,
+}
+# Значения, которые SQLite возвращает при чтении PRAGMA
+TEST_EXPECTED = {
+    'journal_mode': 'wal',
+    'synchronous': 1,
+    'mmap_size': 1024 * 1024,
+    'cache_size': -1024,
+    'busy_timeout': 1000,
+}
+
+
+class SQLitePragmasTest(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.wrapper = connections['default'].__class__(
+            {
+                **connections['default'].settings_dict,
+                'NAME': os.path.join(self.dir, 'db.sqlite3'),
+            },
+            alias='pragmas'
+        )
+
+    def tearDown(self):
+        self.wrapper.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def pragma(self, name):
+        with self.wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS=TEST_PRAGMAS)
+    def test_production_pragmas(self):
+        """
+        Тест проверяет, что профиль production включается
+        на каждом новом соединении.
+        """
+        for name, value in TEST_EXPECTED.items():
+            with self.subTest(pragma=name):
+                self.assertEqual(self.pragma(name), value)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_default_profile(self):
+        """
+        Тест проверяет, что без профиля соединение не меняется.
+        """
+        self.assertEqual(self.pragma('journal_mode'), 'delete')
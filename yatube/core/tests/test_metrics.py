@@ -0,0 +1,27 @@
+"""
+Модуль предназначен для тестирования учета времени шаблонов.
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core import metrics
+
+
+class TemplateMetricsTest(SimpleTestCase):
+    def setUp(self):
+        self.metrics = metrics.start()
+        self.addCleanup(metrics.finish)
+
+    def test_nested_templates_counted_once(self):
+        """
+        Тест проверяет, что время вложенного шаблона не прибавляется
+        ко времени внешнего второй раз.
+        """
+        with mock.patch('core.metrics.time.perf_counter',
+                        side_effect=[0, 3]):
+            with metrics.render_template():
+                with metrics.render_template():
+                    pass
+        self.assertEqual(self.metrics.template_time, 3)
+        self.assertEqual(self.metrics.template_depth, 0)
@@ -0,0 +1,73 @@
+"""
+Модуль предназначен для тестирования счетчиков запроса.
+"""
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from core.middleware import RequestBudgetExceeded
+from posts.models import Post, User
+
+TEST_USER_USERNAME = 'amogus'
+TEST_POST_TEXT = 'Текст'
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER_USERNAME)
+        Post.objects.create(author=cls.user, text=TEST_POST_TEXT)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_server_timing_header(self):
+        """
+        Тест проверяет, что ответ содержит разбивку времени Server-Timing.
+        """
+        response = self.guest_client.get('/')
+        timing = response['Server-Timing']
+        for metric in ('sql;', 'cache;', 'tpl;', 'total;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    def test_structured_log_line(self):
+        """
+        Тест проверяет, что в лог пишется строка JSON со счетчиками запроса.
+        """
+        with self.assertLogs('core.middleware', 'INFO') as logs:
+            self.guest_client.get('/')
+            self.guest_client.get('/')
+        first, second = (json.loads(line.split(':', 2)[2])
+                         for line in logs.output)
+        self.assertEqual(first['view'], 'posts:index')
+        self.assertEqual(first['status'], 200)
+        self.assertGreater(first['queries'], 0)
+        self.assertGreater(first['template_ms'], 0)
+        self.assertGreater(first['cache_misses'], 0)
+        self.assertGreater(second['cache_hits'], 0)
+        self.assertEqual(second['queries'], 0)
+
+    @override_settings(REQUEST_BUDGETS={'posts:index': {'queries': 0}})
+    def test_budget_warning(self):
+        """
+        Тест проверяет предупреждение о превышении бюджета страницы.
+        """
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            self.guest_client.get('/')
+        self.assertIn('posts:index', logs.output[0])
+
+    @override_settings(
+        REQUEST_BUDGETS={'posts:index': {'queries': 0}},
+        REQUEST_BUDGET_ACTION='raise'
+    )
+    def test_budget_raise(self):
+        """
+        Тест проверяет исключение при превышении бюджета в строгом режиме.
+        """
+        with self.assertRaises(RequestBudgetExceeded):
+            self.guest_client.get('/')
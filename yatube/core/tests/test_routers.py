@@ -0,0 +1,130 @@
+"""
+Модуль предназначен для тестирования маршрутизации чтений в копии базы.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from about.views import AboutMePage
+from core import routers
+from core.db import copy_database
+from core.middleware import ReplicaRoutingMiddleware
+from posts import views as posts_views
+from posts.models import Post
+
+TEST_REPLICA = 'replica'
+TEST_ROWS = 3
+
+
+@override_settings(DATABASE_REPLICAS=[TEST_REPLICA])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get(self, view_func, write=False, cookies=None):
+        """
+        Выполняет запрос через middleware и возвращает ответ
+        и базы, из которых view-функция читала до и после записи.
+        """
+        reads = []
+
+        def get_response(request):
+            middleware.process_view(request, view_func, (), {})
+            reads.append(router.db_for_read(Post))
+            if write:
+                self.assertEqual(router.db_for_write(Post), DEFAULT_DB_ALIAS)
+                reads.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = self.factory.get('/')
+        request.COOKIES.update(cookies or {})
+        return middleware(request), reads
+
+    def test_reads_stick_to_primary_after_write(self):
+        """
+        Тест проверяет, что страницы posts.views читают из копии,
+        а после записи пользователь читает из основной базы.
+        """
+        response, reads = self.get(posts_views.index)
+        self.assertEqual(reads, [TEST_REPLICA])
+        self.assertFalse(response.cookies)
+
+        response, reads = self.get(AboutMePage.as_view())
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+
+        response, reads = self.get(posts_views.add_comment, write=True)
+        self.assertEqual(reads, [TEST_REPLICA, DEFAULT_DB_ALIAS])
+        cookie = response.cookies[settings.REPLICA_STICKY_COOKIE]
+        self.assertEqual(
+            cookie['max-age'], settings.REPLICA_STICKY_SECONDS
+        )
+
+        response, reads = self.get(
+            posts_views.index,
+            cookies={settings.REPLICA_STICKY_COOKIE: cookie.value}
+        )
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+        self.assertEqual(router.db_for_read(Post), DEFAULT_DB_ALIAS)
+
+    def test_cache_fills_read_primary_after_write(self):
+        """
+        Тест проверяет, что после записи на сайте данные для общего
+        кеша читаются из основной базы, а после окна - снова из копии.
+        """
+        def fill(request):
+            routers.start(request, posts_views.index)
+            with routers.fresh_reads():
+                db = router.db_for_read(Post)
+            routers.finish()
+            return db
+
+        request = self.factory.get('/')
+        self.assertEqual(fill(request), TEST_REPLICA)
+        self.get(posts_views.post_create, write=True)
+        self.assertEqual(fill(request), DEFAULT_DB_ALIAS)
+        with self.settings(REPLICA_STICKY_SECONDS=0):
+            self.assertEqual(fill(request), TEST_REPLICA)
+
+
+class CopyDatabaseTest(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, 'primary.sqlite3')
+        self.target = os.path.join(self.dir, 'replica.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_copy_visible_to_open_connection(self):
+        """
+        Тест проверяет, что открытое соединение с копией
+        видит данные, скопированные после подключения.
+        """
+        primary = sqlite3.connect(self.source)
+        primary.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        primary.commit()
+        copy_database(self.source, self.target)
+        replica = sqlite3.connect(self.target)
+        try:
+            primary.executemany(
+                'INSERT INTO item VALUES (?)',
+                [(number,) for number in range(TEST_ROWS)]
+            )
+            primary.commit()
+            copy_database(self.source, self.target)
+            self.assertEqual(
+                replica.execute('SELECT COUNT(*) FROM item').fetchone()[0],
+                TEST_ROWS
+            )
+        finally:
+            replica.close()
+            primary.close()
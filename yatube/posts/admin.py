@@ -1,30 +1,99 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.forms import BaseModelFormSet, ModelChoiceField
+from django.utils.functional import cached_property
 
 from .models import Comment, Follow, Group, Post
+from .paginators import EstimatedCountPaginator
+from .search import build_match, is_available, matching_ids
+
+
+class SharedChoicesFormSet(BaseModelFormSet):
+    """
+    Формы list_editable, в которых варианты выбора внешних ключей
+    загружаются одним запросом на страницу, а не запросом на строку.
+    """
+
+    @cached_property
+    def shared_choices(self):
+        return {
+            name: list(field.choices)
+            for name, field in self.form.base_fields.items()
+            if isinstance(field, ModelChoiceField)
+        }
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        for name, choices in self.shared_choices.items():
+            field = form.fields[name]
+            field.choices = choices
+            # Админка оборачивает виджет в RelatedFieldWidgetWrapper
+            if hasattr(field.widget, 'widget'):
+                field.widget.widget.choices = choices
+        return form
+
+
+class FastAdmin(admin.ModelAdmin):
+    """
+    Общие настройки списков для больших таблиц: число строк оценивается
+    без полного COUNT(*), а при фильтрации не считается общее число строк.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Номера страниц списка в админке считаются с нуля
+        try:
+            number = int(request.GET.get(PAGE_VAR, 0)) + 1
+        except ValueError:
+            number = 1
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            number=number
+        )
 
 
 @admin.register(Post)
-class AdminZonePost(admin.ModelAdmin):
+class AdminZonePost(FastAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author',)
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('pub_date', 'group')
     empty_value_display = '-пусто-'
 
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs['formset'] = SharedChoicesFormSet
+        return super().get_changelist_formset(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет посты по полнотекстовому индексу вместо LIKE по всей таблице.
+        """
+        match = build_match(search_term)
+        if not match or not is_available():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=matching_ids(match)), False
+
 
 @admin.register(Group)
-class AdminZoneGroup(admin.ModelAdmin):
+class AdminZoneGroup(FastAdmin):
     list_display = ('pk', 'title', 'slug', 'description',)
-    list_filter = ('title',)
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Comment)
-class AdminZoneComment(admin.ModelAdmin):
+class AdminZoneComment(FastAdmin):
     list_display = ('pk', 'text', 'author', 'post', 'created',)
-    list_filter = ('post',)
+    list_select_related = ('author', 'post__author', 'post__group')
+    raw_id_fields = ('post', 'author')
+    list_filter = ('created',)
 
 
 @admin.register(Follow)
-class AdminZoneFollow(admin.ModelAdmin):
+class AdminZoneFollow(FastAdmin):
     list_display = ('pk', 'user', 'following',)
-    list_filter = ('user',)
+    list_select_related = ('user', 'following')
+    raw_id_fields = ('user', 'following')
@@ -0,0 +1,238 @@
+"""
+Кеширование страниц лент с инвалидацией по версиям.
+
+У каждой ленты (главная, группа, профиль) есть номер версии в кеше.
+Закешированная страница хранит номер версии, с которой она построена,
+поэтому изменение поста или комментария просто увеличивает версию
+затронутых лент, и их страницы пересчитываются при следующем запросе.
+
+Обращения к кешу лент считаются в процессе и раз в STATS_FLUSH_INTERVAL
+секунд добавляются к общим счетчикам.
+"""
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.routers import fresh_reads
+
+from . import objects
+
+STATS = ('hit', 'stale', 'refresh', 'early', 'miss')
+STATS_FLUSH_INTERVAL = 10
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed = time.monotonic()
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def post_scopes(post):
+    """
+    Возвращает ленты, в которых показывается пост.
+    """
+    scopes = [index_scope(), profile_scope(post.author.username)]
+    if post.group_id is not None:
+        scopes.append(group_scope(post.group.slug))
+    return scopes
+
+
+def _version_key(scope):
+    return f'feed-version:{scope}'
+
+
+def get_version(scope):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        # Начальная версия от времени не совпадет с версией,
+        # которая была до вытеснения ключа из кеша
+        cache.add(_version_key(scope), time.time_ns(), None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def _modified_key(scope):
+    return f'feed-modified:{scope}'
+
+
+def get_modified(scope):
+    """
+    Возвращает время (timestamp) последнего сброса ленты. Если отметки
+    нет в кеше, ее заменяет текущее время: оно не раньше любого изменения.
+    """
+    modified = cache.get(_modified_key(scope))
+    if modified is None:
+        cache.add(_modified_key(scope), time.time(), None)
+        modified = cache.get(_modified_key(scope))
+    return modified
+
+
+def bump(*scopes):
+    """
+    Сбрасывает закешированные страницы перечисленных лент
+    и запоминает время сброса.
+    """
+    scopes = set(scopes)
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), time.time_ns(), None)
+    now = time.time()
+    cache.set_many({_modified_key(scope): now for scope in scopes}, None)
+
+
+def page_key(request, scope):
+    raw = '|'.join((
+        scope,
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''),
+        request.get_full_path(),
+    ))
+    return 'feed-page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _stats_key(name):
+    return f'feed-stats:{name}'
+
+
+def flush_stats():
+    """
+    Переносит счетчики процесса в общий кеш.
+    """
+    global _stats_flushed
+    with _stats_lock:
+        pending = dict(_stats)
+        _stats.clear()
+        _stats_flushed = time.monotonic()
+    for name, value in pending.items():
+        key = _stats_key(name)
+        if not cache.add(key, value, None):
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.set(key, value, None)
+
+
+def record(name):
+    with _stats_lock:
+        _stats[name] += 1
+        due = time.monotonic() - _stats_flushed > STATS_FLUSH_INTERVAL
+    if due:
+        flush_stats()
+
+
+def get_stats():
+    """
+    Возвращает счетчики обращений к кешу лент:
+    hit - свежая страница, stale - отдана устаревшая страница,
+    пока другой воркер ее пересчитывает, refresh - пересчет после
+    изменения ленты или истечения срока, early - досрочный пересчет,
+    miss - страницы не было в кеше.
+    """
+    flush_stats()
+    keys = {_stats_key(name): name for name in STATS}
+    found = cache.get_many(list(keys))
+    return {name: found.get(key, 0) for key, name in keys.items()}
+
+
+def reset_stats():
+    global _stats_flushed
+    with _stats_lock:
+        _stats.clear()
+        _stats_flushed = time.monotonic()
+    cache.delete_many([_stats_key(name) for name in STATS])
+
+
+def expires_early(entry):
+    """
+    Вероятностное досрочное истечение (XFetch): чем ближе срок
+    и чем дольше пересчет страницы, тем вероятнее пересчитать ее заранее.
+    """
+    gap = -entry['delta'] * settings.FEED_CACHE_BETA * math.log(
+        1.0 - random.random()
+    )
+    return time.time() + gap >= entry['expires']
+
+
+def render_and_store(key, version, view, request, *args, **kwargs):
+    start = time.perf_counter()
+    # Страница хранится под новой версией ленты долго, поэтому объекты
+    # для нее не берутся из кеша процесса: копии там могли устареть
+    # после изменения в другом воркере
+    with fresh_reads(), objects.local.skip():
+        response = view(request, *args, **kwargs)
+    delta = time.perf_counter() - start
+    if response.status_code == 200 and not response.cookies:
+        entry = {
+            'response': response,
+            'version': version,
+            'delta': delta,
+            'expires': time.time() + settings.FEED_CACHE_TIMEOUT,
+        }
+        cache.set(
+            key,
+            entry,
+            settings.FEED_CACHE_TIMEOUT + settings.FEED_CACHE_STALE_TIMEOUT
+        )
+    return response
+
+
+def cache_feed(scope_of):
+    """
+    Кеширует страницу ленты на settings.FEED_CACHE_TIMEOUT секунд.
+    scope_of получает аргументы view-функции и возвращает имя ленты.
+    Страница кешируется отдельно для каждой сессии, так как содержит
+    кнопки, зависящие от пользователя.
+
+    Когда лента изменилась или срок страницы подходит к концу,
+    страницу пересчитывает один воркер под короткой блокировкой,
+    а остальные в это время отдают устаревшую копию.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            scope = scope_of(*args, **kwargs)
+            version = get_version(scope)
+            key = page_key(request, scope)
+            entry = cache.get(key)
+            if entry is None:
+                record('miss')
+                return render_and_store(
+                    key, version, view, request, *args, **kwargs
+                )
+            outdated = entry['version'] != version
+            if not outdated and not expires_early(entry):
+                record('hit')
+                return entry['response']
+            lock = f'{key}:lock'
+            if not cache.add(lock, 1, settings.FEED_CACHE_LOCK_TIMEOUT):
+                record('stale')
+                return entry['response']
+            try:
+                record('refresh' if outdated else 'early')
+                return render_and_store(
+                    key, version, view, request, *args, **kwargs
+                )
+            finally:
+                cache.delete(lock)
+        return wrapper
+    return decorator
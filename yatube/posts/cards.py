@@ -0,0 +1,72 @@
+"""
+Кеширование отрендеренных карточек постов.
+
+Карточка не зависит от зрителя и ленты: кнопка редактирования
+для автора подставляется вместо метки ACTIONS_MARKER уже после кеша.
+Ключ строится из id поста, его updated_at и показанных на карточке
+данных, которых нет в updated_at: числа комментариев, имени автора
+и группы. Поэтому редактирование поста, новый комментарий и смена
+группы просто меняют ключ, а старые карточки истекают сами.
+Карточка страницы поста с полным текстом хранится отдельно
+от карточки с отрывком для лент.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+CARD_TEMPLATE = 'posts/includes/post_item.html'
+ACTIONS_TEMPLATE = 'posts/includes/post_actions.html'
+ACTIONS_MARKER = '<!--post-actions-->'
+
+
+def card_key(post, full=False):
+    group = post.group
+    raw = '|'.join(map(str, (
+        post.comment_count,
+        post.author.username,
+        group.slug if group else '',
+        group.title if group else '',
+    )))
+    return '{}:{}:{}:{}'.format(
+        'post-card-full' if full else 'post-card',
+        post.pk,
+        post.updated_at.timestamp(),
+        hashlib.md5(raw.encode()).hexdigest()
+    )
+
+
+def get_cards(posts):
+    """
+    Возвращает закешированные карточки постов одним запросом к кешу:
+    словарь ключ карточки -> HTML.
+    """
+    return cache.get_many([card_key(post) for post in posts])
+
+
+def render_card(post, cards=None, full=False):
+    """
+    Возвращает HTML карточки без кнопок автора: из cards, заранее
+    полученного get_cards, из кеша или отрендеренный заново
+    и сохраненный в кеш. Карточка с full=True показывает полный текст
+    поста вместо отрывка и кешируется под своим ключом.
+    """
+    key = card_key(post, full)
+    html = cache.get(key) if cards is None else cards.get(key)
+    if html is None:
+        html = get_template(CARD_TEMPLATE).render(
+            {'post': post, 'full': full}
+        )
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def personalize(html, post, user):
+    """
+    Подставляет в карточку кнопки, зависящие от зрителя.
+    """
+    actions = ''
+    if user.is_authenticated and user.pk == post.author_id:
+        actions = get_template(ACTIONS_TEMPLATE).render({'post': post})
+    return html.replace(ACTIONS_MARKER, actions)
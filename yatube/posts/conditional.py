@@ -0,0 +1,80 @@
+"""
+Валидаторы для условных GET-запросов (ETag и Last-Modified).
+
+Валидаторы поста считаются одним запросом по индексу, валидаторы лент
+берутся из кеша; и те и другие - до построения страницы,
+поэтому на неизменившуюся страницу декоратор django.views.decorators.http
+.condition отвечает 304 без запроса ленты и без рендеринга шаблона.
+Страницы содержат кнопки, зависящие от пользователя, поэтому
+пользователь входит в ETag.
+"""
+import datetime as dt
+import hashlib
+
+from django.views.decorators.http import condition
+
+from . import cache
+from .resolvers import resolve_post
+
+
+def make_etag(request, *parts):
+    raw = '|'.join(map(str, (
+        *parts,
+        request.user.pk if request.user.is_authenticated else '',
+        request.get_full_path(),
+    )))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def post_validators(request, username, post_id):
+    """
+    Возвращает состояние поста, от которого зависит его страница:
+    дату изменения, дату последнего комментария, число комментариев,
+    число постов автора, имя автора и название группы.
+    Пост берется из resolve_post, поэтому ETag, Last-Modified
+    и сама страница обходятся одним запросом.
+    Для несуществующего поста возвращает None.
+    """
+    post = resolve_post(request, username, post_id)
+    if post is None:
+        return None
+    stats = getattr(post.author, 'stats', None)
+    return (
+        post.updated_at, post.last_comment, post.comment_count,
+        stats.post_count if stats else 0, post.author.first_name,
+        post.author.last_name, post.group.title if post.group else None,
+    )
+
+
+def post_etag(request, username, post_id):
+    validators = post_validators(request, username, post_id)
+    if validators is None:
+        return None
+    return make_etag(request, *validators)
+
+
+def post_last_modified(request, username, post_id):
+    validators = post_validators(request, username, post_id)
+    if validators is None:
+        return None
+    updated_at, last_comment = validators[:2]
+    return max(filter(None, (updated_at, last_comment)))
+
+
+def conditional_feed(scope_of):
+    """
+    Добавляет ленте ETag и Last-Modified. Оба строятся из кеша
+    без запросов к базе: ETag - по версии ленты, Last-Modified - по времени
+    ее последнего сброса. Версия и время меняются вместе при любом
+    изменении ленты, в том числе при удалении поста, новом комментарии
+    и подписке.
+    """
+    def etag(request, *args, **kwargs):
+        return make_etag(request, cache.get_version(scope_of(*args, **kwargs)))
+
+    def last_modified(request, *args, **kwargs):
+        return dt.datetime.fromtimestamp(
+            cache.get_modified(scope_of(*args, **kwargs)), dt.timezone.utc
+        )
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
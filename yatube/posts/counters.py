@@ -0,0 +1,110 @@
+"""
+Денормализованные счетчики: комментарии поста, посты и подписчики
+автора.
+
+Счетчики меняются атомарным UPDATE ... SET x = x + delta,
+а recount_* пересчитывают их пачками и исправляют расхождения.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import objects
+from .models import AuthorStats, Comment, Follow, Post, User
+
+
+def change_comment_count(post_id, delta):
+    changes = {'comment_count': F('comment_count') + delta}
+    if delta < 0:
+        # У удаленного комментария не остается даты, поэтому
+        # Last-Modified страницы поста сдвигается датой изменения поста
+        changes['updated_at'] = timezone.now()
+    Post.objects.filter(pk=post_id).update(**changes)
+
+
+def _change_stats(user_id, field, delta):
+    updated = AuthorStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta}
+    )
+    # Строки нет и при удалении автора вместе с постами: тогда
+    # ее не нужно создавать заново
+    if not updated and delta > 0:
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(user_id=user_id)], ignore_conflicts=True
+        )
+        AuthorStats.objects.filter(user_id=user_id).update(
+            **{field: F(field) + delta}
+        )
+
+
+def change_post_count(user_id, delta):
+    _change_stats(user_id, 'post_count', delta)
+    # Число постов показывается из закешированного пользователя
+    objects.users.forget(user_id)
+
+
+def change_follower_count(user_id, delta):
+    """
+    Меняет число подписчиков автора и возвращает новое значение
+    или None, если автора уже нет.
+    """
+    _change_stats(user_id, 'follower_count', delta)
+    counts = AuthorStats.objects.filter(user_id=user_id).values_list(
+        'follower_count', flat=True
+    )
+    return counts[0] if counts else None
+
+
+def _count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def _batches(queryset, batch_size):
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        batch = list(ids.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return
+        last = batch[-1]
+        yield batch[0], last
+
+
+def recount_comments(batch_size=1000):
+    """
+    Пересчитывает Post.comment_count. Возвращает число обновленных постов.
+    """
+    updated = 0
+    for first, last in _batches(Post.objects.all(), batch_size):
+        updated += Post.objects.filter(pk__range=(first, last)).update(
+            comment_count=_count_of(Comment, 'post')
+        )
+    return updated
+
+
+def recount_authors(batch_size=1000):
+    """
+    Пересчитывает AuthorStats.post_count и AuthorStats.follower_count.
+    Возвращает число авторов.
+    """
+    updated = 0
+    for first, last in _batches(User.objects.all(), batch_size):
+        AuthorStats.objects.bulk_create(
+            (AuthorStats(user_id=user_id) for user_id in
+             User.objects.filter(pk__range=(first, last), stats=None)
+             .values_list('pk', flat=True)),
+            ignore_conflicts=True
+        )
+        updated += AuthorStats.objects.filter(
+            pk__gte=first, pk__lte=last
+        ).update(
+            post_count=_count_of(Post, 'author'),
+            follower_count=_count_of(Follow, 'following')
+        )
+    return updated
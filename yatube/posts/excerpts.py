@@ -0,0 +1,27 @@
+"""
+Заполнение Post.excerpt для постов, сохраненных без save():
+после bulk_create, UPDATE и миграции, добавившей поле.
+"""
+from . import objects
+from .counters import _batches
+from .models import Post, make_excerpt
+
+
+def fill_excerpts(batch_size=1000, refill=False):
+    """
+    Заполняет пустые отрывки постов пачками по batch_size,
+    с refill - пересчитывает все. Возвращает число обновленных постов.
+    """
+    posts = Post.objects.all() if refill else Post.objects.filter(excerpt='')
+    updated = 0
+    for first, last in _batches(posts, batch_size):
+        batch = list(
+            posts.filter(pk__range=(first, last)).only('pk', 'text')
+        )
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+        Post.objects.bulk_update(batch, ['excerpt'])
+        updated += len(batch)
+    if updated:
+        objects.posts.reset()
+    return updated
@@ -0,0 +1,226 @@
+"""
+Списки id последних постов главной и лент групп (hot-листы).
+
+Первые settings.HOT_FEED_PAGES страниц этих лент открываются чаще
+всего. Для каждой ленты в кеше хранится компактный массив id ее
+последних постов вместе с числом постов ленты. Массив поддерживается
+при создании и удалении поста, а не перезапрашивается, поэтому
+страница из него - это выборка постов по id (сначала из кеша объектов
+posts.objects, недостающие через in_bulk) без сортировки ленты по pub_date.
+
+Массовые операции без сигналов (загрузка контента, синтетические
+данные) сбрасывают все списки через reset.
+"""
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+
+from core.routers import fresh_reads
+
+from . import objects, paginators
+from .cache import group_scope, index_scope
+
+ID_TYPECODE = 'q'
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 1.0
+LOCK_POLL = 0.005
+
+
+def _generation():
+    key = 'hot-generation'
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def reset():
+    """
+    Сбрасывает все hot-листы.
+    """
+    cache.set('hot-generation', time.time_ns(), None)
+
+
+def size():
+    return settings.HOT_FEED_PAGES * settings.ELEMENTS_PER_PAGE
+
+
+def _list_key(scope):
+    return f'hot-ids:{_generation()}:{scope}'
+
+
+def post_scopes(post):
+    scopes = [index_scope()]
+    if post.group_id is not None:
+        scopes.append(group_scope(post.group.slug))
+    return scopes
+
+
+def load(scope, queryset):
+    """
+    Возвращает (id постов, число постов) ленты.
+    Отсутствующий в кеше список строится по queryset.
+    """
+    key = _list_key(scope)
+    entry = cache.get(key)
+    if entry is None:
+        with fresh_reads():
+            ids = array(ID_TYPECODE, queryset.order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', flat=True)[:size()])
+            count = len(ids) if len(ids) < size() else queryset.count()
+        cache.add(
+            key, (ids.tobytes(), count), settings.FEED_CACHE_TIMEOUT
+        )
+        return ids, count
+    raw, count = entry
+    ids = array(ID_TYPECODE)
+    ids.frombytes(raw)
+    return ids, count
+
+
+def _change(scope, change):
+    """
+    Меняет список ленты функцией change(ids, count) -> (ids, count)
+    под короткой блокировкой. Если другой воркер не отпустил блокировку
+    за LOCK_WAIT секунд, список удаляется и будет построен заново.
+    """
+    key = _list_key(scope)
+    lock = f'{key}:lock'
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock, 1, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            cache.delete(key)
+            return
+        time.sleep(LOCK_POLL)
+    try:
+        entry = cache.get(key)
+        if entry is None:
+            return
+        raw, count = entry
+        ids = array(ID_TYPECODE)
+        ids.frombytes(raw)
+        ids, count = change(ids, count)
+        cache.set(
+            key, (ids.tobytes(), count), settings.FEED_CACHE_TIMEOUT
+        )
+    finally:
+        cache.delete(lock)
+
+
+def push(post, scopes=None):
+    """
+    Добавляет новый пост в начало списков его лент.
+    """
+    def change(ids, count):
+        ids.insert(0, post.pk)
+        return ids[:size()], count + 1
+
+    for scope in scopes or post_scopes(post):
+        _change(scope, change)
+
+
+def remove(post, scopes=None):
+    """
+    Убирает пост из списков лент. Конец списка после этого неполон,
+    и страницы, которым его не хватает, читаются из базы.
+    """
+    def change(ids, count):
+        if post.pk in ids:
+            ids.remove(post.pk)
+        return ids, count - 1
+
+    for scope in scopes or post_scopes(post):
+        _change(scope, change)
+
+
+def discard(scope):
+    cache.delete(_list_key(scope))
+
+
+def get_posts(ids, queryset):
+    """
+    Возвращает посты с id из ids в том же порядке.
+    Если какого-то поста уже нет, возвращает None.
+    """
+    posts = objects.posts.get_many(ids, queryset)
+    if len(posts) < len(ids):
+        return None
+    return [posts[pk] for pk in ids]
+
+
+def _slice(ids, count, start):
+    """
+    id постов страницы с позиции start или None,
+    если список ленты не покрывает страницу целиком.
+    """
+    per_page = settings.ELEMENTS_PER_PAGE
+    page_ids = list(ids[start:start + per_page])
+    if len(page_ids) < min(per_page, count - start):
+        return None
+    return page_ids
+
+
+def _cursor_start(request, ids):
+    per_page = settings.ELEMENTS_PER_PAGE
+    for name, shift in (('after', 1), ('before', -per_page)):
+        position = paginators.decode_cursor(request.GET.get(name))
+        if position is None:
+            continue
+        try:
+            return max(ids.index(position[1]) + shift, 0)
+        except ValueError:
+            return None
+    return 0
+
+
+def _page(request, ids, count, queryset):
+    per_page = settings.ELEMENTS_PER_PAGE
+    if settings.PAGINATION_MODE == 'cursor':
+        start = _cursor_start(request, ids)
+        if start is None:
+            return None
+        page_ids = _slice(ids, count, start)
+        if page_ids is None:
+            return None
+        posts = get_posts(page_ids, queryset)
+        if posts is None:
+            return None
+        if not posts:
+            return paginators.CursorPage([])
+        first, last = posts[0], posts[-1]
+        return paginators.CursorPage(
+            posts,
+            next_cursor=(paginators.encode_cursor(last.pub_date, last.pk)
+                         if start + per_page < count else None),
+            previous_cursor=(paginators.encode_cursor(first.pub_date, first.pk)
+                             if start else None)
+        )
+    paginator = paginators.WindowedPaginator(queryset, per_page, count=count)
+    try:
+        number = paginator.validate_number(request.GET.get('page') or 1)
+    except InvalidPage:
+        return None
+    page_ids = _slice(ids, count, (number - 1) * per_page)
+    if page_ids is None:
+        return None
+    posts = get_posts(page_ids, queryset)
+    if posts is None:
+        return None
+    return paginators.WindowedPage(posts, number, paginator)
+
+
+def paginate(request, scope, queryset):
+    """
+    Страница ленты scope: первые страницы из hot-листа,
+    остальные через paginators.paginate.
+    """
+    ids, count = load(scope, queryset)
+    page = _page(request, ids, count, queryset)
+    if page is None:
+        return paginators.paginate(request, queryset)
+    return page
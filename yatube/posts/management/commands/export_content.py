@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.transfer import dump_record, export_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, группы, посты, комментарии и подписки '
+        'в NDJSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл выгрузки; по умолчанию стандартный вывод'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз'
+        )
+
+    def handle(self, *args, **options):
+        records = export_records(options['chunk_size'])
+        if options['output'] == '-':
+            count = self.write(self.stdout, records)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                count = self.write(output, records)
+        self.stderr.write(self.style.SUCCESS(f'Выгружено записей: {count}'))
+
+    def write(self, output, records):
+        count = 0
+        for record in records:
+            output.write(dump_record(record) + '\n')
+            count += 1
+        return count
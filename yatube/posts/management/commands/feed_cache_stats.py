@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счетчики обращений к кешу страниц лент'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счетчики после вывода'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = sum(stats.values())
+        for name, value in stats.items():
+            share = value / total * 100 if total else 0
+            self.stdout.write(f'{name:>8}: {value} ({share:.1f}%)')
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts.excerpts import fill_excerpts
+
+
+class Command(BaseCommand):
+    help = 'Заполняет отрывки постов для карточек в лентах'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать и уже заполненные отрывки'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько постов обновлять за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        updated = fill_excerpts(options['batch_size'], options['all'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнено отрывков: {updated}'
+        ))
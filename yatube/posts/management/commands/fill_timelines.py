@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = ('Раскладывает по лентам подписчиков посты авторов, '
+            'опустившихся до порога TIMELINE_FANOUT_LIMIT')
+
+    def handle(self, *args, **options):
+        authors = timeline.fill_pending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнены ленты подписчиков авторов: {authors}'
+        ))
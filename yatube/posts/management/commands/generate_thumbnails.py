@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Готовит миниатюры изображений для существующих постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THUMBNAIL_WORKERS,
+            help='Число процессов; 0 - в текущем процессе'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать и уже готовые миниатюры'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50,
+            help='Сколько постов отдавать процессу за раз'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image=None)
+        if not options['all']:
+            posts = posts.filter(thumbnail='')
+        post_ids = list(posts.values_list('pk', flat=True).order_by('pk'))
+        if options['workers']:
+            with thumbnails.make_executor(options['workers']) as executor:
+                names = executor.map(
+                    thumbnails.generate,
+                    post_ids,
+                    chunksize=options['chunk_size']
+                )
+                done = sum(1 for name in names if name)
+        else:
+            done = sum(1 for pk in post_ids if thumbnails.generate(pk))
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово миниатюр: {done} из {len(post_ids)}'
+        ))
@@ -0,0 +1,59 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.transfer import (ContentImportError, Importer, read_checkpoint,
+                            write_checkpoint)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает контент из NDJSON-выгрузки export_content. '
+        'Прерванная загрузка продолжается с контрольной точки. '
+        'Посты и комментарии сохраняют свои id: если id занят '
+        'другим объектом, загрузка останавливается'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько записей сохранять в одной транзакции'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; по умолчанию <path>.checkpoint'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать с начала файла, не читая контрольную точку'
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint'] or f'{options["path"]}.checkpoint'
+        start = 0 if options['restart'] else read_checkpoint(checkpoint)
+        importer = Importer(options['batch_size'])
+        try:
+            with open(options['path'], encoding='utf-8') as source:
+                for line, text in enumerate(source, 1):
+                    if line <= start or not text.strip():
+                        continue
+                    done = importer.done_line
+                    importer.add(json.loads(text), line)
+                    if importer.done_line != done:
+                        write_checkpoint(checkpoint, importer.done_line)
+            importer.finish()
+        except (ContentImportError, ValueError) as error:
+            raise CommandError(
+                f'{error}. Загружено строк: {importer.done_line}'
+            )
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {importer.loaded}'
+            + (f', продолжено со строки {start + 1}' if start else '')
+        ))
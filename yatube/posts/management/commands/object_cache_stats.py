@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.objects import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счетчики обращений к кешу объектов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счетчики после вывода'
+        )
+
+    def handle(self, *args, **options):
+        for label, stats in get_stats().items():
+            total = sum(stats.values())
+            hits = total - stats['miss']
+            rate = hits / total * 100 if total else 0
+            self.stdout.write(f'{label}: попаданий {rate:.1f}%')
+            for name, value in stats.items():
+                self.stdout.write(f'{name:>8}: {value}')
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import objects
+from posts.counters import recount_authors, recount_comments
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счетчики комментариев постов, '
+            'постов и подписчиков авторов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько строк пересчитывать за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = recount_comments(batch_size)
+        authors = recount_authors(batch_size)
+        objects.users.reset()
+        objects.posts.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано постов: {posts}, авторов: {authors}'
+        ))
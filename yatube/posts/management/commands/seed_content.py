@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+
+from posts.seed import SEED_PASSWORD, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает синтетических пользователей, группы, посты, комментарии '
+        'и подписки для нагрузочного тестирования'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=20,
+            help='Среднее число подписок пользователя'
+        )
+        parser.add_argument(
+            '--image-ratio',
+            type=float,
+            default=0.0,
+            help='Доля постов с картинкой, от 0 до 1'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней распределить даты постов'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Один seed всегда дает одни и те же данные'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько объектов сохранять в одной транзакции'
+        )
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days']
+        )
+        steps = (
+            ('Пользователи', seeder.users, (options['users'],)),
+            ('Группы', seeder.groups, (options['groups'],)),
+            ('Посты', seeder.posts,
+             (options['posts'], options['image_ratio'])),
+            ('Комментарии', seeder.comments, (options['comments'],)),
+            ('Подписки', seeder.follows, (options['follows'],)),
+            ('Счетчики и ленты', seeder.finish, ()),
+        )
+        for title, step, arguments in steps:
+            step(*arguments)
+            self.stdout.write(f'{title}: готово')
+        self.stdout.write(self.style.SUCCESS(
+            'Пароль созданных пользователей: ' + SEED_PASSWORD
+        ))
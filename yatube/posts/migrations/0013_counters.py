@@ -0,0 +1,51 @@
+# Generated by Django 2.2.26 on 2026-10-18 20:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    comments = Comment.objects.filter(post=models.OuterRef('pk')).order_by(
+    ).values('post').annotate(total=models.Count('pk')).values('total')
+    Post.objects.update(comment_count=Coalesce(
+        models.Subquery(comments), 0
+    ))
+    AuthorStats.objects.bulk_create(
+        AuthorStats(user_id=author_id, post_count=total)
+        for author_id, total in Post.objects.order_by().values(
+            'author'
+        ).annotate(total=models.Count('pk')).values_list('author', 'total')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(help_text='Автор', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, help_text='Количество постов автора', verbose_name='Постов')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество комментариев к посту', verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
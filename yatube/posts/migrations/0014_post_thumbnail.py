@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-18 20:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, help_text='Миниатюра изображения для лент', upload_to='', verbose_name='Миниатюра'),
+        ),
+    ]
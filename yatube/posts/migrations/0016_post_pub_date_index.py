@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-18 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_fts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, help_text='Дата публикации поста', verbose_name='Дата пуликации'),
+        ),
+    ]
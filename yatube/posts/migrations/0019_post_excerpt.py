@@ -0,0 +1,18 @@
+# Generated by Django 2.2.26 on 2026-10-18 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Начало текста поста для карточек в лентах', max_length=300, verbose_name='Отрывок'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.26 on 2026-10-18 23:10
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_follower_count(apps, schema_editor):
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=author_id) for author_id in
+         Follow.objects.order_by().values_list('following', flat=True)
+         .distinct()),
+        ignore_conflicts=True
+    )
+    followers = Follow.objects.filter(
+        following=models.OuterRef('pk')
+    ).order_by().values('following').annotate(
+        total=models.Count('pk')
+    ).values('total')
+    AuthorStats.objects.update(follower_count=Coalesce(
+        models.Subquery(followers), 0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0, help_text='Количество подписчиков автора', verbose_name='Подписчиков'),
+        ),
+        migrations.RunPython(fill_follower_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.26 on 2026-10-18 22:06
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_authorstats_follower_count'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_group_updated_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.26 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_drop_feed_updated_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='fill_pending',
+            field=models.BooleanField(default=False, help_text='Посты автора нужно разложить по лентам подписчиков', verbose_name='Ленты ждут заполнения'),
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(condition=models.Q(fill_pending=True), fields=['fill_pending'], name='stats_fill_pending_idx'),
+        ),
+    ]
@@ -5,6 +5,39 @@ from django.db import models
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+EXCERPT_PLACEHOLDER = '…'
+# Колонки поста, которые нужны карточке в ленте: без полного текста
+CARD_FIELDS = (
+    'pub_date', 'updated_at', 'excerpt', 'image', 'thumbnail',
+    'comment_count', 'author', 'author__username',
+    'group', 'group__slug', 'group__title',
+)
+
+
+def make_excerpt(text):
+    """
+    Возвращает начало текста не длиннее EXCERPT_LENGTH символов,
+    обрезанное по границе слова. Переносы строк сохраняются.
+    """
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    head = text[:EXCERPT_LENGTH - len(EXCERPT_PLACEHOLDER)]
+    if not text[len(head)].isspace():
+        words = head.rsplit(None, 1)
+        if len(words) > 1:
+            head = words[0]
+    return head.rstrip() + EXCERPT_PLACEHOLDER
+
+
+class PostQuerySet(models.QuerySet):
+    def for_cards(self):
+        """
+        Посты для карточек лент: с автором и группой одним запросом
+        и без полного текста, вместо него отрывок excerpt.
+        """
+        return self.select_related('author', 'group').only(*CARD_FIELDS)
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -31,6 +64,11 @@ class Post(models.Model):
         auto_now_add=True,
         help_text='Дата публикации поста'
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        help_text='Дата последнего изменения поста'
+    )
     author = models.ForeignKey(
         User,
         verbose_name='Автор',
@@ -54,11 +92,42 @@ class Post(models.Model):
         null=True,
         help_text='Загрузите картинку',
     )
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        blank=True,
+        editable=False,
+        help_text='Миниатюра изображения для лент'
+    )
+    comment_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False,
+        help_text='Количество комментариев к посту'
+    )
+    excerpt = models.CharField(
+        'Отрывок',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text='Начало текста поста для карточек в лентах'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date', )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Ленты сортируются по (-pub_date, -id): индексы лент
+        # заканчиваются этими полями, чтобы сортировка шла по индексу
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_date_id_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_date_idx'),
+            models.Index(fields=('group', '-pub_date', '-id'),
+                         name='post_group_date_idx'),
+        )
 
 
     def __str__(self):
@@ -75,6 +144,15 @@ class Post(models.Model):
         res += f'Текст: {shorten_text}'
         return res
 
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+        super().save(*args, **kwargs)
+
+    @property
+    def is_truncated(self):
+        return self.excerpt.endswith(EXCERPT_PLACEHOLDER)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -103,6 +181,10 @@ class Comment(models.Model):
         ordering = ('created', )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(fields=('post', 'created'),
+                         name='comment_post_created_idx'),
+        )
 
 
     def __str__(self):
@@ -140,3 +222,90 @@ class Follow(models.Model):
         return (f'Подписка {self.user.get_full_name()} '
                 f'({self.user.username}) на {self.following.get_full_name()} '
                 f'({self.following.username})')
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        verbose_name='Автор',
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        help_text='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        'Постов',
+        default=0,
+        help_text='Количество постов автора'
+    )
+    follower_count = models.PositiveIntegerField(
+        'Подписчиков',
+        default=0,
+        help_text='Количество подписчиков автора'
+    )
+    fill_pending = models.BooleanField(
+        'Ленты ждут заполнения',
+        default=False,
+        help_text='Посты автора нужно разложить по лентам подписчиков'
+    )
+
+    class Meta():
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+        indexes = (
+            models.Index(
+                fields=('fill_pending',),
+                name='stats_fill_pending_idx',
+                condition=models.Q(fill_pending=True)
+            ),
+        )
+
+    def __str__(self):
+        return f'Постов у {self.user.username}: {self.post_count}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Читатель',
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        help_text='Владелец ленты подписок'
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        help_text='Пост в ленте'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='Автор поста'
+    )
+    pub_date = models.DateTimeField(
+        'Дата пуликации',
+        help_text='Дата публикации поста'
+    )
+
+    class Meta():
+        ordering = ('-pub_date', '-post_id')
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        unique_together = ('user', 'post',)
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_date_idx'
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='timeline_user_author_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Пост {self.post_id} в ленте {self.user_id}'
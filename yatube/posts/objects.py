@@ -0,0 +1,349 @@
+"""
+Кеш объектов (cache-aside) для пользователей, групп и постов.
+
+Объект ищется сначала в кеше процесса (L1) с коротким сроком
+settings.OBJECT_CACHE_LOCAL_TIMEOUT, затем в общем кеше, затем в базе.
+По естественному ключу (username, slug) в кеше лежит только id объекта,
+а сам объект хранится под ключом id, поэтому его сбрасывает одно
+удаление. Сигналы post_save и post_delete сбрасывают объект в общем
+кеше и в L1 своего процесса, L1 других процессов устаревает не дольше
+чем на OBJECT_CACHE_LOCAL_TIMEOUT секунд. Страницы лент, которые сами
+хранятся в общем кеше часами, строятся мимо L1 (local.skip).
+
+Ключи содержат поколение модели из общего кеша. Поколение читается
+один раз за запрос, поэтому reset после массовых операций
+(и очистка общего кеша) сразу видна всем процессам.
+
+Попадания в L1, в общий кеш и промахи считаются в процессе
+и раз в STATS_FLUSH_INTERVAL секунд добавляются к общим счетчикам.
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.dispatch import receiver
+from django.http import Http404
+
+from core.routers import fresh_reads
+
+from .models import CARD_FIELDS, Group, Post, User
+
+STATS = ('local', 'shared', 'miss')
+STATS_FLUSH_INTERVAL = 10
+MISSING = object()
+
+
+class LocalCache:
+    """
+    Кеш процесса с ограниченным числом записей (LRU) и сроком жизни.
+    Значения хранятся сериализованными, чтобы потоки не делили
+    и не меняли один и тот же объект модели.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._skipped = threading.local()
+
+    @contextmanager
+    def skip(self):
+        """
+        Внутри блока объекты читаются мимо кеша процесса: из общего
+        кеша или из базы. Так строятся страницы, которые сами
+        хранятся в общем кеше долго.
+        """
+        depth = getattr(self._skipped, 'depth', 0)
+        self._skipped.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._skipped.depth = depth
+
+    def get(self, key):
+        if getattr(self._skipped, 'depth', 0):
+            return MISSING
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (
+                time.monotonic() + settings.OBJECT_CACHE_LOCAL_TIMEOUT, value
+            )
+            self._data.move_to_end(key)
+            while len(self._data) > settings.OBJECT_CACHE_LOCAL_MAX_ENTRIES:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local = LocalCache()
+_generations = threading.local()
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed = time.monotonic()
+
+
+@receiver(request_started)
+def forget_generations(**kwargs):
+    """
+    Поколения моделей перечитываются из общего кеша в каждом запросе.
+    """
+    _generations.__dict__.clear()
+
+
+def _stats_key(label, name):
+    return f'object-stats:{label}:{name}'
+
+
+def flush_stats():
+    """
+    Переносит счетчики процесса в общий кеш.
+    """
+    global _stats_flushed
+    with _stats_lock:
+        pending = dict(_stats)
+        _stats.clear()
+        _stats_flushed = time.monotonic()
+    for (label, name), value in pending.items():
+        key = _stats_key(label, name)
+        if not cache.add(key, value, None):
+            try:
+                cache.incr(key, value)
+            except ValueError:
+                cache.set(key, value, None)
+
+
+def record(label, name, count=1):
+    with _stats_lock:
+        _stats[label, name] += count
+        due = time.monotonic() - _stats_flushed > STATS_FLUSH_INTERVAL
+    if due:
+        flush_stats()
+
+
+def get_stats():
+    """
+    Возвращает счетчики обращений к кешу объектов по моделям:
+    local - объект найден в кеше процесса, shared - в общем кеше,
+    miss - прочитан из базы.
+    """
+    flush_stats()
+    keys = {
+        _stats_key(registry_label, name): (registry_label, name)
+        for registry_label in REGISTRY for name in STATS
+    }
+    found = cache.get_many(list(keys))
+    stats = {label: dict.fromkeys(STATS, 0) for label in REGISTRY}
+    for key, (label, name) in keys.items():
+        stats[label][name] = found.get(key, 0)
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+    cache.delete_many([
+        _stats_key(label, name) for label in REGISTRY for name in STATS
+    ])
+
+
+class ObjectCache:
+    """
+    Кеш объектов модели model по id и по полю natural_key.
+    Объекты читаются из queryset с select_related,
+    а если задан only - только с этими полями, defer - без этих полей.
+    """
+
+    def __init__(self, model, natural_key=None, select_related=(), only=(),
+                 defer=()):
+        self.model = model
+        self.natural_key = natural_key
+        self.select_related = select_related
+        self.only = only
+        self.defer = defer
+        self.label = model._meta.label_lower
+
+    def queryset(self):
+        queryset = self.model.objects.select_related(*self.select_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.defer:
+            queryset = queryset.defer(*self.defer)
+        return queryset
+
+    def _generation_key(self):
+        return f'object-generation:{self.label}'
+
+    def _generation(self):
+        generation = getattr(_generations, self.label, None)
+        if generation is None:
+            key = self._generation_key()
+            generation = cache.get(key)
+            if generation is None:
+                cache.add(key, time.time_ns(), None)
+                generation = cache.get(key)
+            setattr(_generations, self.label, generation)
+        return generation
+
+    def _pk_key(self, generation, pk):
+        return f'object:{self.label}:{generation}:{pk}'
+
+    def _natural_key(self, generation, value):
+        return f'object:{self.label}:{generation}:{self.natural_key}:{value}'
+
+    def _lookup(self, key):
+        value = local.get(key)
+        if value is not MISSING:
+            record(self.label, 'local')
+            return value
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            record(self.label, 'shared')
+            local.set(key, value)
+        return value
+
+    def _store(self, generation, objs):
+        values = {}
+        for obj in objs:
+            values[self._pk_key(generation, obj.pk)] = obj
+            if self.natural_key:
+                values[self._natural_key(
+                    generation, getattr(obj, self.natural_key)
+                )] = obj.pk
+        cache.set_many(values, settings.OBJECT_CACHE_TIMEOUT)
+        for key, value in values.items():
+            local.set(key, value)
+
+    def get(self, pk=None, **natural):
+        """
+        Возвращает объект по id или по естественному ключу
+        (get(username=...)) или None, если его нет.
+        """
+        generation = self._generation()
+        if natural:
+            (field, value), = natural.items()
+            if field != self.natural_key:
+                raise ValueError(f'{self.label} не кешируется по {field}')
+            pk = self._lookup(self._natural_key(generation, value))
+            if pk is not MISSING:
+                obj = self._lookup(self._pk_key(generation, pk))
+                # После переименования старый ключ указывает
+                # на объект с другим значением поля
+                if (obj is not MISSING
+                        and getattr(obj, self.natural_key) == value):
+                    return obj
+        else:
+            obj = self._lookup(self._pk_key(generation, pk))
+            if obj is not MISSING:
+                return obj
+            natural = {'pk': pk}
+        record(self.label, 'miss')
+        with fresh_reads():
+            obj = self.queryset().filter(**natural).first()
+        if obj is not None:
+            self._store(generation, [obj])
+        return obj
+
+    def get_or_404(self, pk=None, **natural):
+        obj = self.get(pk, **natural)
+        if obj is None:
+            raise Http404(f'{self.model._meta.object_name} не найден')
+        return obj
+
+    def get_many(self, ids, queryset=None):
+        """
+        Возвращает словарь id -> объект для найденных ids: из кеша,
+        недостающие одним in_bulk по queryset.
+        """
+        generation = self._generation()
+        objects = {}
+        shared_keys = {}
+        for pk in ids:
+            key = self._pk_key(generation, pk)
+            obj = local.get(key)
+            if obj is MISSING:
+                shared_keys[key] = pk
+            else:
+                record(self.label, 'local')
+                objects[pk] = obj
+        found = cache.get_many(list(shared_keys))
+        for key, obj in found.items():
+            record(self.label, 'shared')
+            local.set(key, obj)
+            objects[shared_keys[key]] = obj
+        missing = [pk for pk in shared_keys.values() if pk not in objects]
+        if missing:
+            record(self.label, 'miss', len(missing))
+            if queryset is None:
+                queryset = self.queryset()
+            with fresh_reads():
+                loaded = queryset.in_bulk(missing)
+            self._store(generation, loaded.values())
+            objects.update(loaded)
+        return objects
+
+    def forget(self, *objects_or_ids):
+        """
+        Сбрасывает объекты (или объекты с такими id) после изменения.
+        """
+        generation = self._generation()
+        keys = []
+        for item in objects_or_ids:
+            if isinstance(item, self.model):
+                keys.append(self._pk_key(generation, item.pk))
+                if self.natural_key:
+                    keys.append(self._natural_key(
+                        generation, getattr(item, self.natural_key)
+                    ))
+            else:
+                keys.append(self._pk_key(generation, item))
+        cache.delete_many(keys)
+        local.delete(*keys)
+
+    def reset(self):
+        """
+        Сбрасывает все объекты модели, например после массовой загрузки.
+        """
+        generation = time.time_ns()
+        cache.set(self._generation_key(), generation, None)
+        setattr(_generations, self.label, generation)
+
+
+# Хеш пароля в кеш не попадает
+users = ObjectCache(
+    User, 'username', select_related=('stats',), defer=('password',)
+)
+groups = ObjectCache(Group, 'slug')
+# Посты кешируются для карточек лент, без полного текста
+posts = ObjectCache(
+    Post, select_related=('author', 'group'), only=CARD_FIELDS
+)
+
+REGISTRY = {cached.label: cached for cached in (users, groups, posts)}
+
+
+def reset():
+    for cached in REGISTRY.values():
+        cached.reset()
@@ -0,0 +1,343 @@
+import base64
+import binascii
+import hashlib
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_cursor(pub_date, pk):
+    """
+    Упаковывает позицию записи в ленте (pub_date, id) в непрозрачный токен.
+    """
+    raw = f'{pub_date.isoformat()}{CURSOR_SEPARATOR}{pk}'
+    token = base64.urlsafe_b64encode(raw.encode())
+    return token.decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Распаковывает токен в пару (pub_date, id).
+    Для испорченного токена возвращает None.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, pk = raw.decode().split(CURSOR_SEPARATOR)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class CursorPage:
+    """
+    Страница ленты, выбранная по курсору.
+    Повторяет интерфейс django.core.paginator.Page, нужный шаблонам.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset-паджинатор по паре (дата, id), по умолчанию (pub_date, pk).
+    Не выполняет COUNT(*) и OFFSET, поэтому любая страница
+    стоит столько же, сколько первая. По умолчанию первыми идут
+    новые записи, с descending=False - старые.
+    """
+
+    def __init__(self, object_list, per_page, key=('pub_date', 'pk'),
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.date_field, self.id_field = key
+        self.descending = descending
+
+    def _ordered(self, queryset, forward=True):
+        sign = '-' if forward == self.descending else ''
+        return queryset.order_by(
+            f'{sign}{self.date_field}', f'{sign}{self.id_field}'
+        )
+
+    def _cursor(self, obj):
+        return encode_cursor(
+            getattr(obj, self.date_field), getattr(obj, self.id_field)
+        )
+
+    def _beyond(self, position, forward=True):
+        date, pk = position
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{self.date_field: date, f'{self.id_field}__{lookup}': pk})
+        )
+
+    def _make_page(self, objects, has_next, has_previous):
+        return CursorPage(
+            objects,
+            next_cursor=self._cursor(objects[-1]) if has_next else None,
+            previous_cursor=self._cursor(objects[0]) if has_previous else None
+        )
+
+    def _fetch(self, position=None, forward=True, limit=None):
+        """
+        Читает limit записей (по умолчанию per_page + 1) после позиции
+        position или с начала ленты; с forward=False - в обратную сторону.
+        """
+        objects = self.object_list
+        if position is not None:
+            objects = self._beyond(position, forward)
+        limit = limit or self.per_page + 1
+        return list(self._ordered(objects, forward)[:limit])
+
+    def _first_page(self):
+        objects = self._fetch()
+        return self._make_page(
+            objects[:self.per_page],
+            has_next=len(objects) > self.per_page,
+            has_previous=False
+        )
+
+    def _page_after(self, position):
+        objects = self._fetch(position)
+        if not objects:
+            return self._first_page()
+        return self._make_page(
+            objects[:self.per_page],
+            has_next=len(objects) > self.per_page,
+            has_previous=True
+        )
+
+    def _page_before(self, position):
+        objects = self._fetch(position, forward=False)
+        if len(objects) <= self.per_page:
+            return self._first_page()
+        objects = objects[:self.per_page]
+        objects.reverse()
+        return self._make_page(objects, has_next=True, has_previous=True)
+
+    def page(self, after=None, before=None):
+        """
+        Возвращает страницу после курсора after или перед курсором before.
+        Без курсора (или с испорченным курсором) возвращает первую страницу.
+        """
+        position = decode_cursor(after)
+        if position is not None:
+            return self._page_after(position)
+        position = decode_cursor(before)
+        if position is not None:
+            return self._page_before(position)
+        return self._first_page()
+
+
+class MergedFeed:
+    """
+    Лента, слитая из нескольких потоков, упорядоченных по (дата, id).
+    streams - пары (queryset, key), потоки не должны пересекаться по id.
+    Каждый поток читается своим диапазоном индекса с LIMIT, поэтому
+    объединение обходится без OR по разным индексам и без сортировки
+    во временном B-дереве. load получает список id и возвращает объекты
+    в том же порядке, count - функция, возвращающая число записей
+    для нумерованных страниц.
+    """
+
+    def __init__(self, streams, load, count):
+        self.streams = streams
+        self.load = load
+        self.count_records = count
+
+    def fetch(self, limit, position=None, forward=True):
+        """
+        Возвращает limit объектов ленты после позиции position
+        или с начала; с forward=False - в обратную сторону.
+        """
+        streams = (
+            CursorPaginator(
+                queryset.values_list(*key), limit, key=key
+            )._fetch(position, forward, limit)
+            for queryset, key in self.streams
+        )
+        rows = islice(heapq.merge(*streams, reverse=forward), limit)
+        return self.load([pk for _, pk in rows])
+
+    @cached_property
+    def count(self):
+        return self.count_records()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('MergedFeed supports only slices')
+        if not index.stop:
+            return []
+        return self.fetch(index.stop)[index.start:]
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """
+    Keyset-паджинатор ленты MergedFeed по (pub_date, pk) ее объектов.
+    """
+
+    def _fetch(self, position=None, forward=True, limit=None):
+        return self.object_list.fetch(
+            limit or self.per_page + 1, position, forward
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator, который не выполняет полный COUNT(*) по большой таблице.
+    Строки считаются точно до settings.EXACT_COUNT_LIMIT или до страницы
+    после запрошенной (number), если она дальше. Если строк больше,
+    для выборки без фильтров их число оценивается по максимальному id,
+    а для выборки с фильтрами сообщается на страницу больше: следующая
+    страница остается доступной, и с переходом на нее порог растет.
+    """
+
+    def __init__(self, *args, number=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.number = number
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return len(self.object_list)
+        limit = max(
+            settings.EXACT_COUNT_LIMIT, (self.number + 1) * self.per_page
+        )
+        count = self.object_list.order_by()[:limit + 1].count()
+        if count <= limit:
+            return count
+        query = self.object_list.query
+        if query.where or query.distinct or query.combinator:
+            return limit + self.per_page
+        estimate = self.object_list.aggregate(estimate=Max('pk'))['estimate']
+        return max(estimate or 0, count)
+
+
+class WindowedPage(Page):
+    @cached_property
+    def page_window(self):
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class WindowedPaginator(Paginator):
+    """
+    Paginator нумерованных страниц лент. Шаблону отдается не весь
+    page_range, а окно page.page_window: первые и последние страницы
+    и несколько страниц вокруг текущей, пропуски отмечены ELLIPSIS.
+    Число записей передается готовым (count) или считается один раз
+    и хранится в кеше settings.PAGE_COUNT_CACHE_TIMEOUT секунд.
+    """
+    ELLIPSIS = '…'
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return len(self.object_list)
+        key = 'page-count:' + hashlib.md5(
+            str(self.object_list.query).encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, settings.PAGE_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1):
+        """
+        Номера страниц окна вокруг страницы number.
+        """
+        number = self.validate_number(number)
+        window = self.on_each_side + self.on_ends
+        if self.num_pages <= (window + 1) * 2:
+            yield from self.page_range
+            return
+        if number > window + 2:
+            yield from range(1, self.on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - self.on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < self.num_pages - window - 1:
+            yield from range(number + 1, number + self.on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(
+                self.num_pages - self.on_ends + 1, self.num_pages + 1
+            )
+        else:
+            yield from range(number + 1, self.num_pages + 1)
+
+
+def paginate(request, object_list, key=('pub_date', 'pk'), count=None):
+    """
+    Возвращает страницу ленты в режиме settings.PAGINATION_MODE:
+    'pages' - нумерованные страницы (?page=) с числом записей count,
+    если оно известно заранее,
+    'cursor' - курсорные страницы (?after=/?before=) по полям key.
+    Лента MergedFeed листается по (pub_date, pk) своих объектов.
+    """
+    if settings.PAGINATION_MODE == 'cursor':
+        if isinstance(object_list, MergedFeed):
+            paginator = MergedCursorPaginator(
+                object_list, settings.ELEMENTS_PER_PAGE
+            )
+        else:
+            paginator = CursorPaginator(
+                object_list, settings.ELEMENTS_PER_PAGE, key=key
+            )
+        return paginator.page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before')
+        )
+    paginator = WindowedPaginator(
+        object_list, settings.ELEMENTS_PER_PAGE, count=count
+    )
+    return paginator.get_page(request.GET.get('page'))
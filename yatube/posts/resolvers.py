@@ -0,0 +1,40 @@
+"""
+Поиск поста по адресу вида /<username>/<post_id>/.
+"""
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+
+from .models import Comment, Post
+
+
+def resolve_post(request, username, post_id):
+    """
+    Возвращает пост вместе с автором, его счетчиками и группой
+    одним запросом, проверяя, что пост принадлежит автору username.
+    К посту добавляется дата последнего комментария last_comment.
+    Результат запоминается в request, поэтому валидаторы условного GET
+    и view-функция обходятся одним запросом. Если поста нет, возвращает None.
+    """
+    resolved = getattr(request, '_resolved_post', None)
+    if resolved is not None and resolved[0] == (username, post_id):
+        return resolved[1]
+    last_comment = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    # get, в отличие от first, не добавляет ORDER BY,
+    # которому понадобилась бы сортировка во временном B-дереве
+    try:
+        post = Post.objects.select_related('author__stats', 'group').annotate(
+            last_comment=Subquery(last_comment)
+        ).get(pk=post_id, author__username=username)
+    except Post.DoesNotExist:
+        post = None
+    request._resolved_post = ((username, post_id), post)
+    return post
+
+
+def get_post_or_404(request, username, post_id):
+    post = resolve_post(request, username, post_id)
+    if post is None:
+        raise Http404('Пост не найден')
+    return post
@@ -0,0 +1,223 @@
+"""
+Полнотекстовый поиск по постам.
+
+На SQLite текст постов индексируется виртуальной таблицей FTS5
+posts_post_fts (миграция 0015), которую триггеры базы обновляют
+при вставке, изменении и удалении постов. SQLite пересоздает таблицу
+posts_post при изменении ее схемы, и триггеры пропадают, поэтому
+после каждой миграции они восстанавливаются (ensure_triggers).
+
+Результаты упорядочены по релевантности bm25 и листаются курсором
+по паре (ранг, id), поэтому глубокие страницы не требуют OFFSET.
+"""
+import base64
+import binascii
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginators import CURSOR_SEPARATOR, CursorPage
+
+FTS_TABLE = 'posts_post_fts'
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_TOKENS = 16
+
+TRIGGERS = {
+    'posts_post_fts_insert': (
+        'CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post '
+        f'BEGIN INSERT INTO {FTS_TABLE}(rowid, text) '
+        'VALUES (new.id, new.text); END'
+    ),
+    'posts_post_fts_delete': (
+        'CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post '
+        f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) '
+        "VALUES ('delete', old.id, old.text); END"
+    ),
+    'posts_post_fts_update': (
+        'CREATE TRIGGER posts_post_fts_update '
+        'AFTER UPDATE OF text ON posts_post '
+        f'BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        f'INSERT INTO {FTS_TABLE}(rowid, text) '
+        'VALUES (new.id, new.text); END'
+    ),
+}
+
+SEARCH_SQL = (
+    f'SELECT rowid, bm25({FTS_TABLE}), '
+    f'snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+    f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s{{condition}} '
+    f'ORDER BY bm25({FTS_TABLE}) {{rank_order}}, rowid {{id_order}} '
+    f'LIMIT %s'
+)
+AFTER_CONDITION = (
+    f' AND (bm25({FTS_TABLE}) > %s '
+    f'OR (bm25({FTS_TABLE}) = %s AND rowid < %s))'
+)
+BEFORE_CONDITION = (
+    f' AND (bm25({FTS_TABLE}) < %s '
+    f'OR (bm25({FTS_TABLE}) = %s AND rowid > %s))'
+)
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def ensure_triggers(connection):
+    """
+    Создает недостающие триггеры индекса и перестраивает индекс,
+    если триггеров не было и он мог отстать от таблицы постов.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE tbl_name IN ('posts_post', %s)",
+            (FTS_TABLE,)
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        if FTS_TABLE not in existing or not missing:
+            return
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def build_match(query):
+    """
+    Превращает строку поиска в запрос FTS5: каждое слово в кавычках
+    и с поиском по префиксу, все слова обязательны.
+    Операторы FTS5 из пользовательского ввода не передаются.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def matching_ids(match):
+    """
+    Подзапрос id постов, подходящих под запрос FTS5.
+    """
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,)
+    )
+
+
+def encode_cursor(rank, pk):
+    raw = f'{rank!r}{CURSOR_SEPARATOR}{pk}'
+    token = base64.urlsafe_b64encode(raw.encode())
+    return token.decode().rstrip('=')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        rank, pk = raw.decode().split(CURSOR_SEPARATOR)
+        return float(rank), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def highlight(snippet):
+    """
+    Экранирует фрагмент текста и выделяет найденные слова тегом <mark>.
+    """
+    return mark_safe(
+        escape(snippet)
+        .replace(SNIPPET_START, '<mark>')
+        .replace(SNIPPET_END, '</mark>')
+    )
+
+
+class SearchPaginator:
+    """
+    Keyset-паджинатор результатов поиска по паре (ранг bm25, id).
+    Чем меньше bm25, тем выше пост; при равном ранге выше новый пост.
+    """
+
+    def __init__(self, query, per_page):
+        self.match = build_match(query)
+        self.per_page = int(per_page)
+
+    def _fetch(self, position=None, forward=True):
+        condition = ''
+        params = [SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS,
+                  SNIPPET_TOKENS, self.match]
+        if position is not None:
+            rank, pk = position
+            condition = AFTER_CONDITION if forward else BEFORE_CONDITION
+            params += [rank, rank, pk]
+        sql = SEARCH_SQL.format(
+            condition=condition,
+            rank_order='ASC' if forward else 'DESC',
+            id_order='DESC' if forward else 'ASC'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [self.per_page + 1])
+            return cursor.fetchall()
+
+    def _cursor(self, row):
+        pk, rank, _ = row
+        return encode_cursor(rank, pk)
+
+    def _make_page(self, rows, has_next, has_previous):
+        posts = Post.objects.for_cards().in_bulk(
+            [pk for pk, _, _ in rows]
+        )
+        objects = []
+        for pk, _, snippet in rows:
+            if pk in posts:
+                posts[pk].snippet = highlight(snippet)
+                objects.append(posts[pk])
+        return CursorPage(
+            objects,
+            next_cursor=self._cursor(rows[-1]) if has_next else None,
+            previous_cursor=self._cursor(rows[0]) if has_previous else None
+        )
+
+    def _first_page(self):
+        rows = self._fetch()
+        return self._make_page(
+            rows[:self.per_page],
+            has_next=len(rows) > self.per_page,
+            has_previous=False
+        )
+
+    def page(self, after=None, before=None):
+        """
+        Возвращает страницу результатов после курсора after
+        или перед курсором before.
+        """
+        if not self.match:
+            return CursorPage([])
+        position = decode_cursor(after)
+        if position is not None:
+            rows = self._fetch(position)
+            if not rows:
+                return self._first_page()
+            return self._make_page(
+                rows[:self.per_page],
+                has_next=len(rows) > self.per_page,
+                has_previous=True
+            )
+        position = decode_cursor(before)
+        if position is not None:
+            rows = self._fetch(position, forward=False)
+            if len(rows) <= self.per_page:
+                return self._first_page()
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return self._make_page(rows, has_next=True, has_previous=True)
+        return self._first_page()
@@ -0,0 +1,241 @@
+"""
+Синтетический контент для нагрузочного тестирования.
+
+Все случайные значения берутся из random.Random и Faker с общим seed,
+а даты отсчитываются от SEED_EPOCH, поэтому один seed всегда дает
+одну и ту же базу. Популярность пользователей подчиняется степенному
+закону: немногие авторы пишут большую часть постов и собирают
+большую часть подписчиков, как на живом сайте.
+"""
+import datetime as dt
+import itertools
+import random
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from faker import Faker
+from PIL import Image
+
+from . import cache
+from .models import Comment, Follow, Group, Post, User, make_excerpt
+from .transfer import explicit_dates, refresh_denormalized
+
+SEED_EPOCH = dt.datetime(2022, 1, 1, tzinfo=dt.timezone.utc)
+SEED_LOCALE = 'ru_RU'
+SEED_PASSWORD = 'password'
+IMAGE_COUNT = 10
+IMAGE_SIZE = (960, 540)
+# Показатель степенного закона популярности: доля i-го по популярности
+# пользователя пропорциональна 1 / i ** POPULARITY_EXPONENT
+POPULARITY_EXPONENT = 1.0
+# Параметр распределения Парето для числа подписок пользователя
+FOLLOWS_SHAPE = 2.0
+COMMENT_DELAY = dt.timedelta(days=7)
+
+
+def power_law_weights(count, exponent=POPULARITY_EXPONENT):
+    """
+    Накопленные веса для random.choices: вес i-го элемента 1 / i ** exponent.
+    """
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Seeder:
+    """
+    Создает пользователей, группы, посты, комментарии и подписки
+    через bulk_create пачками по batch_size с явными id, поэтому
+    связи между объектами не требуют повторных запросов к базе.
+    """
+
+    def __init__(self, seed=0, batch_size=1000, days=365):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.faker = Faker(SEED_LOCALE)
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.start = SEED_EPOCH - dt.timedelta(days=days)
+        self.span = SEED_EPOCH - self.start
+        self.user_ids = range(0)
+        self.popular_users = []
+        self.user_weights = []
+        self.group_ids = range(0)
+        self.post_ids = range(0)
+
+    def save(self, model, objects):
+        """
+        Сохраняет объекты пачками по batch_size, каждую в своей транзакции.
+        """
+        objects = iter(objects)
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                return
+            with transaction.atomic(), explicit_dates():
+                model.objects.bulk_create(batch)
+
+    def date_of(self, index, count):
+        """
+        Дата index-го из count объектов: даты растут вместе с id
+        и равномерно покрывают период до SEED_EPOCH.
+        """
+        return self.start + self.span * ((index + self.rng.random()) / count)
+
+    def users(self, count):
+        first = next_pk(User)
+        self.user_ids = range(first, first + count)
+        password = make_password(SEED_PASSWORD, salt=f'seed{self.seed}')
+        self.save(User, (
+            User(pk=pk,
+                 username=f'{self.faker.user_name()}{pk}',
+                 first_name=self.faker.first_name(),
+                 last_name=self.faker.last_name(),
+                 email=f'user{pk}@example.com',
+                 password=password,
+                 date_joined=self.start)
+            for pk in self.user_ids
+        ))
+        self.popular_users = list(self.user_ids)
+        self.rng.shuffle(self.popular_users)
+        self.user_weights = power_law_weights(count)
+
+    def groups(self, count):
+        first = next_pk(Group)
+        self.group_ids = range(first, first + count)
+        self.save(Group, (
+            Group(pk=pk,
+                  title=self.faker.sentence(nb_words=3).rstrip('.'),
+                  slug=f'group-{pk}',
+                  description=self.faker.paragraph())
+            for pk in self.group_ids
+        ))
+
+    def images(self):
+        """
+        Создает IMAGE_COUNT картинок, общих для всех постов.
+        """
+        names = []
+        # Отдельный генератор: уже созданные картинки не должны
+        # сдвигать последовательность случайных чисел для постов
+        colors = random.Random(self.seed)
+        for number in range(IMAGE_COUNT):
+            name = f'posts/seed-{self.seed}-{number}.png'
+            color = tuple(colors.randrange(256) for _ in range(3))
+            if not default_storage.exists(name):
+                buffer = BytesIO()
+                Image.new('RGB', IMAGE_SIZE, color).save(buffer, 'png')
+                name = default_storage.save(
+                    name, ContentFile(buffer.getvalue())
+                )
+            names.append(name)
+        return names
+
+    def random_author(self):
+        return self.rng.choices(
+            self.popular_users, cum_weights=self.user_weights
+        )[0]
+
+    def posts(self, count, image_ratio=0.0, group_ratio=0.7):
+        first = next_pk(Post)
+        self.post_ids = range(first, first + count)
+        images = self.images() if image_ratio and count else []
+
+        def post(index, pk):
+            author_id = self.random_author()
+            group_id = (self.rng.choice(self.group_ids)
+                        if self.group_ids
+                        and self.rng.random() < group_ratio else None)
+            text = self.faker.text(max_nb_chars=self.rng.randint(50, 1000))
+            return Post(pk=pk,
+                        author_id=author_id,
+                        group_id=group_id,
+                        text=text,
+                        excerpt=make_excerpt(text),
+                        pub_date=self.date_of(index, count),
+                        image=(self.rng.choice(images)
+                               if images and self.rng.random() < image_ratio
+                               else None))
+
+        self.save(Post, (
+            post(index, pk) for index, pk in enumerate(self.post_ids)
+        ))
+
+    def comments(self, count):
+        if not self.post_ids:
+            return
+        post_weights = power_law_weights(len(self.post_ids))
+        # Популярны и свежие, и старые посты, поэтому порядок случаен
+        popular_posts = list(range(len(self.post_ids)))
+        self.rng.shuffle(popular_posts)
+
+        def comment():
+            index = self.rng.choices(
+                popular_posts, cum_weights=post_weights
+            )[0]
+            created = self.date_of(
+                index, len(self.post_ids)
+            ) + COMMENT_DELAY * self.rng.random()
+            return Comment(post_id=self.post_ids[index],
+                           author_id=self.rng.choice(self.user_ids),
+                           text=self.faker.sentence(),
+                           created=created)
+
+        self.save(Comment, (comment() for _ in range(count)))
+
+    def follows(self, average):
+        """
+        Подписывает пользователей в среднем на average авторов.
+        Число подписок распределено по Парето, а авторы выбираются
+        по степенному закону популярности.
+        """
+        limit = len(self.user_ids) - 1
+        if not average or limit < 1:
+            return
+        mean = FOLLOWS_SHAPE / (FOLLOWS_SHAPE - 1)
+
+        def follows_of(user_id):
+            count = min(limit, round(
+                average / mean * self.rng.paretovariate(FOLLOWS_SHAPE)
+            ))
+            authors = set()
+            # Непопулярные авторы выпадают редко, поэтому число попыток
+            # ограничено, иначе набор большого числа подписок затянется
+            for _ in range(count * 10):
+                if len(authors) >= count:
+                    break
+                author_id = self.random_author()
+                if author_id != user_id:
+                    authors.add(author_id)
+            return (Follow(user_id=user_id, following_id=author_id)
+                    for author_id in sorted(authors))
+
+        self.save(Follow, itertools.chain.from_iterable(
+            follows_of(user_id) for user_id in self.user_ids
+        ))
+
+    def finish(self):
+        """
+        Пересчитывает счетчики и ленты подписок и сбрасывает
+        закешированные ленты новых групп и пользователей.
+        """
+        refresh_denormalized([User, Group, Post], self.batch_size)
+        slugs = Group.objects.filter(
+            pk__gte=self.group_ids.start, pk__lt=self.group_ids.stop
+        ).values_list('slug', flat=True)
+        usernames = User.objects.filter(
+            pk__gte=self.user_ids.start, pk__lt=self.user_ids.stop
+        ).values_list('username', flat=True)
+        cache.bump(
+            cache.index_scope(),
+            *(cache.group_scope(slug) for slug in slugs),
+            *(cache.profile_scope(username) for username in usernames)
+        )
@@ -0,0 +1,225 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import cache, counters, hot, objects, search, timeline
+from .models import Comment, Follow, Group, Post, User
+
+# id постов, которые удаляются вместе с комментариями, в этом потоке
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@receiver(request_started)
+def forget_deleting_posts(**kwargs):
+    """
+    Отметки удалений, прерванных ошибкой или откатом,
+    не переживают запрос.
+    """
+    _deleting.__dict__.clear()
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, **kwargs):
+    instance._previous_group = None
+    if instance.pk is not None:
+        instance._previous_group = Group.objects.filter(
+            posts=instance.pk
+        ).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    scopes = cache.post_scopes(instance)
+    previous_group = getattr(instance, '_previous_group', None)
+    if previous_group is not None:
+        scopes.append(cache.group_scope(previous_group.slug))
+    cache.bump(*scopes)
+    objects.posts.forget(instance.pk)
+    if created:
+        counters.change_post_count(instance.author_id, 1)
+        timeline.fan_out(instance)
+        hot.push(instance)
+    elif getattr(previous_group, 'pk', None) != instance.group_id:
+        # Место старого поста в новой ленте группы неизвестно,
+        # ее список строится заново
+        if previous_group is not None:
+            hot.remove(instance, [cache.group_scope(previous_group.slug)])
+        if instance.group_id is not None:
+            hot.discard(cache.group_scope(instance.group.slug))
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    deleting_posts().discard(instance.pk)
+    counters.change_post_count(instance.author_id, -1)
+    cache.bump(*cache.post_scopes(instance))
+    hot.remove(instance)
+    objects.posts.forget(instance.pk)
+
+
+def bump_post_feeds(post_id):
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is not None:
+        cache.bump(*cache.post_scopes(post))
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comment_count(instance.post_id, 1)
+        bump_post_feeds(instance.post_id)
+        objects.posts.forget(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in deleting_posts():
+        # Пост удаляется вместе со счетчиком и сбросит ленты сам
+        return
+    counters.change_comment_count(instance.post_id, -1)
+    bump_post_feeds(instance.post_id)
+    objects.posts.forget(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_follower_count(instance.following_id, 1)
+    cache.bump(cache.profile_scope(instance.following.username))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    followers = counters.change_follower_count(instance.following_id, -1)
+    if followers == settings.TIMELINE_FANOUT_LIMIT:
+        # Автор опустился до порога: посты, написанные, пока он был
+        # популярен, разложит по лентам подписчиков fill_timelines
+        timeline.schedule_fill(instance.following_id)
+    cache.bump(cache.profile_scope(instance.following.username))
+
+
+def author_profile_scopes(group):
+    """
+    Профили авторов, у которых есть посты в группе.
+    """
+    return [
+        cache.profile_scope(username) for username in
+        User.objects.filter(posts__group=group)
+        .values_list('username', flat=True).distinct()
+    ]
+
+
+@receiver(pre_save, sender=Group)
+def group_changing(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk is not None:
+        instance._previous = Group.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', 'title').first()
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    objects.groups.forget(instance)
+    scopes = [cache.group_scope(instance.slug)]
+    previous = getattr(instance, '_previous', None)
+    if previous is not None and previous != (instance.slug, instance.title):
+        # Адрес и название группы есть в карточках ее постов
+        # на главной, в профилях авторов и в закешированных постах
+        objects.posts.reset()
+        scopes += [
+            cache.index_scope(),
+            cache.group_scope(previous[0]),
+            *author_profile_scopes(instance),
+        ]
+    cache.bump(*scopes)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Посты группы останутся без нее: их ленты запоминаются,
+    # пока связь с группой еще в базе
+    instance._author_scopes = author_profile_scopes(instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    objects.groups.forget(instance)
+    # Django обнуляет ссылку на группу одним UPDATE без сигналов Post,
+    # а группа сохранена в закешированных постах и страницах лент
+    objects.posts.reset()
+    cache.bump(
+        cache.index_scope(),
+        cache.group_scope(instance.slug),
+        *getattr(instance, '_author_scopes', ())
+    )
+
+
+# Поля пользователя, которые выводятся на страницах лент
+USER_DISPLAY_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(pre_save, sender=User)
+def user_changing(sender, instance, update_fields=None, **kwargs):
+    instance._previous = None
+    if instance.pk is not None and (
+            update_fields is None
+            or set(update_fields) & set(USER_DISPLAY_FIELDS)):
+        instance._previous = User.objects.filter(
+            pk=instance.pk
+        ).values_list(*USER_DISPLAY_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    objects.users.forget(instance)
+    previous = getattr(instance, '_previous', None)
+    if previous is None:
+        return
+    username = previous[0]
+    if username != instance.username:
+        # Имя автора сохранено в закешированных постах
+        # и в ссылках страниц лент с его постами
+        objects.posts.reset()
+        cache.bump(
+            cache.index_scope(),
+            cache.profile_scope(username),
+            cache.profile_scope(instance.username),
+            *(cache.group_scope(slug) for slug in Group.objects.filter(
+                posts__author=instance
+            ).values_list('slug', flat=True).distinct())
+        )
+    elif previous != tuple(
+            getattr(instance, field) for field in USER_DISPLAY_FIELDS):
+        # Полное имя выводится в заголовке профиля, карточки
+        # постов показывают только username
+        cache.bump(cache.profile_scope(instance.username))
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    objects.users.forget(instance)
+
+
+@receiver(post_migrate)
+def migrated(sender, using, **kwargs):
+    if sender.name == 'posts':
+        search.ensure_triggers(connections[using])
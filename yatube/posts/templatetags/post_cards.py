@@ -0,0 +1,31 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from posts import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def load_post_cards(context, posts):
+    """
+    Достает из кеша карточки всех постов страницы одним запросом.
+    """
+    context['post_cards'] = cards.get_cards(posts)
+    return ''
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post, full=False):
+    """
+    Выводит карточку поста из кеша: в лентах с отрывком текста,
+    с full=True (страница поста) - с полным текстом. Карточки
+    результатов поиска содержат выделенные совпадения и не кешируются.
+    """
+    if getattr(post, 'snippet', None):
+        html = template.loader.get_template(cards.CARD_TEMPLATE).render(
+            {'post': post}
+        )
+    else:
+        html = cards.render_card(post, context.get('post_cards'), full)
+    return mark_safe(cards.personalize(html, post, context['user']))
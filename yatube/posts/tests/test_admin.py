@@ -0,0 +1,116 @@
+"""
+Модуль предназначен для тестирования списков объектов в админке.
+"""
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.admin import AdminZonePost
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import EstimatedCountPaginator
+
+TEST_ADMIN_USERNAME = 'admin'
+TEST_TEXT = 'Текст'
+TEST_ROWS = 3
+# Сессия, пользователь, число строк, строки страницы
+# и для постов группы для list_filter и list_editable
+EXPECTED_QUERIES = {
+    'admin:posts_post_changelist': 7,
+    'admin:posts_group_changelist': 4,
+    'admin:posts_comment_changelist': 4,
+    'admin:posts_follow_changelist': 4,
+}
+
+
+class AdminChangelistQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.admin = User.objects.create_superuser(
+            username=TEST_ADMIN_USERNAME,
+            email='admin@example.com',
+            password='password'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = Group.objects.count()
+        for i in range(start, start + count):
+            author = User.objects.create_user(
+                username=f'author{i}', first_name='Имя', last_name='Фамилия'
+            )
+            group = Group.objects.create(
+                title=f'Группа {i}', slug=f'group{i}'
+            )
+            post = Post.objects.create(
+                author=author, group=group, text=TEST_TEXT
+            )
+            Comment.objects.create(post=post, author=author, text=TEST_TEXT)
+            Follow.objects.create(user=self.admin, following=author)
+
+    def count_queries(self, url_name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        """
+        Тест проверяет, что число запросов списка в админке
+        не зависит от числа строк на странице.
+        """
+        self.add_rows(TEST_ROWS)
+        for url_name, expected in EXPECTED_QUERIES.items():
+            with self.subTest(url_name=url_name):
+                self.assertEqual(self.count_queries(url_name), expected)
+        self.add_rows(TEST_ROWS)
+        for url_name, expected in EXPECTED_QUERIES.items():
+            with self.subTest(url_name=url_name):
+                self.assertEqual(self.count_queries(url_name), expected)
+
+    @override_settings(EXACT_COUNT_LIMIT=TEST_ROWS)
+    def test_estimated_count(self):
+        """
+        Тест проверяет, что после порога число строк оценивается
+        по максимальному id, а для выборки с фильтром - на страницу
+        больше порога.
+        """
+        self.add_rows(TEST_ROWS * 2)
+        posts = Post.objects.all()
+        last = posts.order_by('pk').last()
+        self.assertEqual(
+            EstimatedCountPaginator(posts, 1).count, last.pk
+        )
+        self.assertEqual(
+            EstimatedCountPaginator(posts.filter(text=TEST_TEXT), 1).count,
+            TEST_ROWS + 1
+        )
+        self.assertEqual(
+            EstimatedCountPaginator(list(posts), 1).count, TEST_ROWS * 2
+        )
+
+    @override_settings(EXACT_COUNT_LIMIT=TEST_ROWS)
+    def test_filtered_changelist_pages_past_limit(self):
+        """
+        Тест проверяет, что список с фильтром листается дальше порога:
+        каждая открытая страница делает доступной следующую.
+        """
+        self.add_rows(TEST_ROWS * 3)
+        url = reverse('admin:posts_post_changelist')
+        with mock.patch.object(AdminZonePost, 'list_per_page', 1):
+            for number in range(TEST_ROWS * 3):
+                response = self.client.get(
+                    url, {'q': TEST_TEXT, 'p': number}
+                )
+                with self.subTest(number=number):
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(
+                        len(response.context['cl'].result_list), 1
+                    )
@@ -0,0 +1,190 @@
+"""
+Модуль предназначен для тестирования кеширования страниц лент.
+"""
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts import cache as feed_cache
+from posts.models import Comment, Group, Post, User
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_OTHER_USERNAME = 'stranger'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_OTHER_GROUP_SLUG = 'other-slug'
+TEST_POST_TEXT = 'Текст'
+TEST_NEW_TEXT = 'Новый текст'
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.other = User.objects.create_user(username=TEST_OTHER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+        cls.other_group = Group.objects.create(
+            title=TEST_OTHER_GROUP_SLUG,
+            description=TEST_OTHER_GROUP_SLUG,
+            slug=TEST_OTHER_GROUP_SLUG
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text=TEST_POST_TEXT
+        )
+        self.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group',
+                             kwargs={'slug': TEST_GROUP_SLUG}),
+            'other_group': reverse('posts:group',
+                                   kwargs={'slug': TEST_OTHER_GROUP_SLUG}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': TEST_AUTHOR_USERNAME}),
+            'other_profile': reverse('posts:profile',
+                                     kwargs={'username': TEST_OTHER_USERNAME}),
+        }
+
+    def snapshot(self):
+        return {
+            name: self.client.get(url).content
+            for name, url in self.urls.items()
+        }
+
+    def changed(self, before):
+        after = self.snapshot()
+        return {name for name in before if before[name] != after[name]}
+
+    def test_pages_served_from_cache(self):
+        """
+        Тест проверяет, что страницы лент берутся из кеша, пока
+        посты не менялись через ORM-сигналы.
+        """
+        before = self.snapshot()
+        Post.objects.update(text=TEST_NEW_TEXT)
+        self.assertEqual(self.changed(before), set())
+
+    def test_edit_bumps_affected_feeds(self):
+        """
+        Тест проверяет, что перенос поста в другую группу сбрасывает
+        обе группы, главную и профиль автора, но не чужой профиль.
+        """
+        before = self.snapshot()
+        self.post.group = self.other_group
+        self.post.save()
+        self.assertEqual(
+            self.changed(before),
+            {'index', 'group', 'other_group', 'profile'}
+        )
+
+    def test_comment_bumps_post_feeds(self):
+        """
+        Тест проверяет, что новый комментарий обновляет счетчик
+        на страницах лент с этим постом.
+        """
+        before = self.snapshot()
+        Comment.objects.create(
+            post=self.post, author=self.other, text=TEST_POST_TEXT
+        )
+        self.assertEqual(
+            self.changed(before), {'index', 'group', 'profile'}
+        )
+
+    def test_group_edit_bumps_feeds_with_its_posts(self):
+        """
+        Тест проверяет, что новое название группы сбрасывает главную,
+        ленту группы и профили авторов ее постов, а новое описание -
+        только ленту группы.
+        """
+        before = self.snapshot()
+        self.group.description = TEST_NEW_TEXT
+        self.group.save()
+        self.assertEqual(self.changed(before), {'group'})
+        before = self.snapshot()
+        self.group.title = TEST_NEW_TEXT
+        self.group.save()
+        self.assertEqual(
+            self.changed(before), {'index', 'group', 'profile'}
+        )
+        for name in ('index', 'profile'):
+            with self.subTest(feed=name):
+                self.assertContains(
+                    self.client.get(self.urls[name]), TEST_NEW_TEXT
+                )
+
+    def test_full_name_bumps_profile(self):
+        """
+        Тест проверяет, что новое полное имя автора сбрасывает
+        его профиль, а обновление last_login - нет.
+        """
+        author = User.objects.get(pk=self.author.pk)
+        before = self.snapshot()
+        author.first_name = TEST_NEW_TEXT
+        author.save()
+        self.assertEqual(self.changed(before), {'profile'})
+        self.assertContains(
+            self.client.get(self.urls['profile']), TEST_NEW_TEXT
+        )
+        before = self.snapshot()
+        author.save(update_fields=['last_login'])
+        self.assertEqual(self.changed(before), set())
+
+    def test_delete_bumps_post_feeds(self):
+        """
+        Тест проверяет, что удаление поста сбрасывает его ленты.
+        """
+        before = self.snapshot()
+        self.post.delete()
+        self.assertEqual(
+            self.changed(before), {'index', 'group', 'profile'}
+        )
+
+    def test_stale_page_served_while_locked(self):
+        """
+        Тест проверяет, что пока другой воркер держит блокировку
+        пересчета, отдается устаревшая копия страницы.
+        """
+        url = self.urls['index']
+        lock = feed_cache.page_key(
+            RequestFactory().get(url), feed_cache.index_scope()
+        ) + ':lock'
+        stale = self.client.get(url).content
+        Post.objects.create(author=self.author, text=TEST_NEW_TEXT)
+        feed_cache.reset_stats()
+        cache.add(lock, 1)
+        self.assertEqual(self.client.get(url).content, stale)
+        self.assertEqual(feed_cache.get_stats()['stale'], 1)
+        cache.delete(lock)
+        self.assertIn(TEST_NEW_TEXT.encode(), self.client.get(url).content)
+        self.assertEqual(feed_cache.get_stats()['refresh'], 1)
+
+    def test_stats_count_hits_and_misses(self):
+        """
+        Тест проверяет счетчики попаданий и промахов кеша лент
+        и то, что они копятся в процессе, а не пишутся в кеш
+        при каждом обращении.
+        """
+        feed_cache.reset_stats()
+        self.client.get(self.urls['index'])
+        self.client.get(self.urls['index'])
+        self.assertIsNone(cache.get(feed_cache._stats_key('hit')))
+        stats = feed_cache.get_stats()
+        self.assertEqual(stats['miss'], 1)
+        self.assertEqual(stats['hit'], 1)
+
+    @override_settings(FEED_CACHE_TIMEOUT=0, FEED_CACHE_STALE_TIMEOUT=60)
+    def test_early_expiration(self):
+        """
+        Тест проверяет досрочный пересчет страницы с истекающим сроком.
+        """
+        feed_cache.reset_stats()
+        self.client.get(self.urls['index'])
+        self.client.get(self.urls['index'])
+        self.assertEqual(feed_cache.get_stats()['early'], 1)
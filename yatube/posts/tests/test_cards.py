@@ -0,0 +1,104 @@
+"""
+Модуль предназначен для тестирования кеширования карточек постов.
+"""
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import cache as feed_cache
+from posts.models import Comment, Group, Post, User
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_POST_TEXT = 'Текст'
+TEST_NEW_TEXT = 'Новый текст'
+TEST_NEW_TITLE = 'Новое название'
+TEST_COMMENT_TEXT = 'Комментарий'
+CARD_TEMPLATE = 'posts/includes/post_item.html'
+ACTIONS_TEMPLATE = 'posts/includes/post_actions.html'
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text=TEST_POST_TEXT
+        )
+        self.url = reverse('posts:post_detail', kwargs={
+            'username': TEST_AUTHOR_USERNAME, 'post_id': self.post.pk
+        })
+        self.edit_url = reverse('posts:post_edit', kwargs={
+            'username': TEST_AUTHOR_USERNAME, 'post_id': self.post.pk
+        })
+
+    def test_card_shared_between_viewers(self):
+        """
+        Тест проверяет, что карточка рендерится один раз для всех
+        зрителей и один раз для всех лент (отдельно от карточки
+        страницы поста), а кнопка редактирования есть только у автора.
+        """
+        response = self.reader_client.get(self.url)
+        self.assertTemplateUsed(response, CARD_TEMPLATE)
+        self.assertNotContains(response, self.edit_url)
+
+        response = self.author_client.get(self.url)
+        self.assertTemplateNotUsed(response, CARD_TEMPLATE)
+        self.assertTemplateUsed(response, ACTIONS_TEMPLATE)
+        self.assertContains(response, self.edit_url)
+
+        feeds = (
+            reverse('posts:index'),
+            reverse('posts:group', kwargs={'slug': TEST_GROUP_SLUG}),
+            reverse('posts:profile',
+                    kwargs={'username': TEST_AUTHOR_USERNAME}),
+        )
+        for number, url in enumerate(feeds):
+            with self.subTest(url=url):
+                response = self.reader_client.get(url)
+                if number == 0:
+                    self.assertTemplateUsed(response, CARD_TEMPLATE)
+                else:
+                    self.assertTemplateNotUsed(response, CARD_TEMPLATE)
+                self.assertContains(response, TEST_POST_TEXT)
+
+    def test_card_invalidation(self):
+        """
+        Тест проверяет, что карточка обновляется после комментария,
+        редактирования поста и переименования группы.
+        """
+        self.reader_client.get(self.url)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        self.assertContains(
+            self.reader_client.get(self.url), 'Комментариев: 1'
+        )
+
+        self.post.refresh_from_db()
+        self.post.text = TEST_NEW_TEXT
+        self.post.save()
+        self.assertContains(self.reader_client.get(self.url), TEST_NEW_TEXT)
+
+        self.group.title = TEST_NEW_TITLE
+        self.group.save()
+        feed_cache.bump(feed_cache.index_scope())
+        self.assertContains(
+            self.reader_client.get(reverse('posts:index')), TEST_NEW_TITLE
+        )
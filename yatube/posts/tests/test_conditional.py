@@ -0,0 +1,180 @@
+"""
+Модуль предназначен для тестирования условных GET-запросов страниц.
+"""
+import datetime as dt
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Comment, Follow, Group, Post, User
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_POST_TEXT = 'Текст'
+TEST_NEW_TEXT = 'Новый текст'
+TEST_COMMENT_TEXT = 'Комментарий'
+# Сессия и пользователь, для поста еще запрос валидаторов;
+# валидаторы лент берутся из кеша
+NOT_MODIFIED_QUERIES = {'group': 2, 'profile': 2, 'post_detail': 3}
+TEST_PAST = dt.timedelta(days=1)
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text=TEST_POST_TEXT
+        )
+        self.urls = {
+            'group': reverse('posts:group',
+                             kwargs={'slug': TEST_GROUP_SLUG}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': TEST_AUTHOR_USERNAME}),
+            'post_detail': reverse('posts:post_detail', kwargs={
+                'username': TEST_AUTHOR_USERNAME, 'post_id': self.post.pk
+            }),
+        }
+
+    def etags(self):
+        return {
+            name: self.client.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+
+    def test_not_modified(self):
+        """
+        Тест проверяет, что на неизменившуюся страницу с совпадающим
+        ETag или Last-Modified приходит 304 без запроса ленты
+        и без рендеринга шаблона.
+        """
+        for name, url in self.urls.items():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            validators = {
+                'HTTP_IF_NONE_MATCH': response['ETag'],
+                'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+            }
+            for header, value in validators.items():
+                with self.subTest(name=name, header=header):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(url, **{header: value})
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(
+                        len(queries), NOT_MODIFIED_QUERIES[name]
+                    )
+                    self.assertFalse(response.templates)
+
+    def test_etag_changes(self):
+        """
+        Тест проверяет, что ETag страниц меняется после комментария,
+        редактирования и удаления поста и отличается у разных
+        пользователей.
+        """
+        initial = self.etags()
+        Comment.objects.create(
+            post=self.post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        commented = self.etags()
+        self.post.text = TEST_NEW_TEXT
+        self.post.save()
+        edited = self.etags()
+        for name in self.urls:
+            with self.subTest(name=name):
+                self.assertNotEqual(initial[name], commented[name])
+                self.assertNotEqual(commented[name], edited[name])
+
+        self.client.force_login(self.author)
+        for name, etag in self.etags().items():
+            with self.subTest(name=name):
+                self.assertNotEqual(edited[name], etag)
+
+        other = Post.objects.create(
+            author=self.author, group=self.group, text=TEST_POST_TEXT
+        )
+        before = self.etags()
+        other.delete()
+        after = self.etags()
+        for name in ('group', 'profile'):
+            with self.subTest(name=name):
+                self.assertNotEqual(before[name], after[name])
+
+    def test_last_modified(self):
+        """
+        Тест проверяет, что Last-Modified поста учитывает
+        последний комментарий.
+        """
+        url = self.urls['post_detail']
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        Comment.objects.filter(pk=comment.pk).update(
+            created=self.post.updated_at.replace(year=2100)
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            response['Last-Modified'],
+            http_date(self.post.updated_at.replace(year=2100).timestamp())
+        )
+
+    def test_feed_last_modified_follows_changes(self):
+        """
+        Тест проверяет, что Last-Modified лент сдвигается при удалении
+        поста и подписке, которые не меняют даты изменения постов.
+        """
+        past = time.time() - TEST_PAST.total_seconds()
+        feeds = ('group', 'profile')
+        with mock.patch('time.time', return_value=past):
+            cache.clear()
+            modified = {
+                name: self.client.get(self.urls[name])['Last-Modified']
+                for name in feeds
+            }
+        self.assertEqual(modified['group'], http_date(past))
+        self.post.delete()
+        Follow.objects.create(user=self.reader, following=self.author)
+        for name in feeds:
+            with self.subTest(name=name):
+                response = self.client.get(
+                    self.urls[name], HTTP_IF_MODIFIED_SINCE=modified[name]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['Last-Modified'], modified[name])
+
+    def test_post_last_modified_after_comment_delete(self):
+        """
+        Тест проверяет, что Last-Modified поста сдвигается
+        после удаления комментария.
+        """
+        url = self.urls['post_detail']
+        comment = Comment.objects.create(
+            post=self.post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        past = self.post.updated_at - TEST_PAST
+        Post.objects.filter(pk=self.post.pk).update(updated_at=past)
+        Comment.objects.filter(pk=comment.pk).update(created=past)
+        modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(modified, http_date(past.timestamp()))
+        comment.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,146 @@
+"""
+Модуль предназначен для тестирования денормализованных счетчиков.
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import DatabaseError, connection, transaction
+from django.db.models.sql import DeleteQuery
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Follow, Post, User
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_POST_TEXT = 'Текст'
+TEST_COMMENT_TEXT = 'Комментарий'
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+
+    def post_count(self):
+        return AuthorStats.objects.get(user=self.author).post_count
+
+    def comment_count(self, post):
+        post.refresh_from_db()
+        return post.comment_count
+
+    def test_post_counter(self):
+        """
+        Тест проверяет счетчик постов автора при создании и удалении постов.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        self.assertEqual(self.post_count(), 2)
+        post.delete()
+        self.assertEqual(self.post_count(), 1)
+
+    def test_comment_counter(self):
+        """
+        Тест проверяет счетчик комментариев при создании и удалении
+        комментариев.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        Comment.objects.create(
+            post=post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        self.assertEqual(self.comment_count(post), 2)
+        comment.delete()
+        self.assertEqual(self.comment_count(post), 1)
+
+    def test_post_delete_skips_comment_counters(self):
+        """
+        Тест проверяет, что при удалении поста его комментарии
+        не обновляют счетчик и ленты по одному.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        for _ in range(3):
+            Comment.objects.create(
+                post=post, author=self.reader, text=TEST_COMMENT_TEXT
+            )
+        with CaptureQueriesContext(connection) as queries:
+            post.delete()
+        self.assertFalse(any(
+            query['sql'].startswith(f'UPDATE "{Post._meta.db_table}"')
+            for query in queries.captured_queries
+        ))
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(self.post_count(), 0)
+
+    def test_failed_post_delete_keeps_comment_counters(self):
+        """
+        Тест проверяет, что прерванное ошибкой удаление поста
+        не отключает счетчик его комментариев после запроса.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        with mock.patch.object(
+            DeleteQuery, 'delete_batch', side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                post.delete()
+        request_started.send(sender=None)
+        comment.delete()
+        self.assertEqual(self.comment_count(post), 0)
+
+    def test_recount_repairs_drift(self):
+        """
+        Тест проверяет, что команда recount исправляет расхождения
+        счетчиков, в том числе после bulk_create без сигналов.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        Post.objects.bulk_create(
+            Post(author=self.author, text=TEST_POST_TEXT) for _ in range(3)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.reader, text=TEST_COMMENT_TEXT)
+            for _ in range(2)
+        )
+        Post.objects.exclude(pk=post.pk).update(comment_count=7)
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, following=self.author)]
+        )
+        call_command('recount', batch_size=2, stdout=StringIO())
+        self.assertEqual(self.post_count(), 4)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).follower_count, 1
+        )
+        self.assertEqual(self.comment_count(post), 2)
+        self.assertFalse(
+            Post.objects.exclude(pk=post.pk)
+            .filter(comment_count__gt=0).exists()
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.reader).post_count, 0
+        )
+
+    def test_pages_show_stored_counters(self):
+        """
+        Тест проверяет, что страницы выводят сохраненные счетчики.
+        """
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        Comment.objects.create(
+            post=post, author=self.reader, text=TEST_COMMENT_TEXT
+        )
+        client = Client()
+        response = client.get(
+            reverse('posts:profile',
+                    kwargs={'username': TEST_AUTHOR_USERNAME})
+        )
+        self.assertContains(response, 'Всего постов: 1')
+        self.assertContains(response, 'Комментариев: 1')
@@ -0,0 +1,131 @@
+"""
+Модуль предназначен для тестирования отрывков постов в лентах.
+"""
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import (EXCERPT_LENGTH, EXCERPT_PLACEHOLDER, Follow, Group,
+                          Post, User, make_excerpt)
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_SHORT_TEXT = 'Короткий пост'
+TEST_WORD = 'слово'
+TEST_TAIL = 'окончание'
+TEST_LONG_TEXT = '\n'.join(
+    ' '.join([TEST_WORD] * 10) for _ in range(EXCERPT_LENGTH // 50)
+) + ' ' + TEST_TAIL
+TEXT_COLUMN = '"posts_post"."text"'
+BULK_POSTS = 3
+
+
+class ExcerptTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+        Follow.objects.create(user=cls.reader, following=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text=TEST_LONG_TEXT
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_excerpt_filled_on_save(self):
+        """
+        Тест проверяет, что отрывок заполняется при сохранении,
+        обрезается по границе слова и сохраняет переносы строк.
+        """
+        excerpt = self.post.excerpt
+        self.assertLessEqual(len(excerpt), EXCERPT_LENGTH)
+        self.assertTrue(self.post.is_truncated)
+        head = excerpt[:-len(EXCERPT_PLACEHOLDER)]
+        self.assertTrue(TEST_LONG_TEXT.startswith(head))
+        self.assertTrue(head.endswith(TEST_WORD))
+        self.assertIn('\n', head)
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = TEST_SHORT_TEXT
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, TEST_SHORT_TEXT)
+        self.assertFalse(post.is_truncated)
+
+    def test_fill_excerpts(self):
+        """
+        Тест проверяет, что команда заполняет отрывки постов,
+        созданных без save().
+        """
+        Post.objects.bulk_create(
+            Post(author=self.author, text=TEST_LONG_TEXT)
+            for _ in range(BULK_POSTS)
+        )
+        self.assertEqual(Post.objects.filter(excerpt='').count(), BULK_POSTS)
+        call_command('fill_excerpts', batch_size=2, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(excerpt='').exists())
+        self.assertEqual(
+            set(Post.objects.values_list('excerpt', flat=True)),
+            {make_excerpt(TEST_LONG_TEXT)}
+        )
+
+    def test_feeds_skip_full_text(self):
+        """
+        Тест проверяет, что ленты не читают полный текст постов
+        и показывают отрывок со ссылкой на полный текст.
+        """
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group', kwargs={'slug': TEST_GROUP_SLUG}),
+            reverse('posts:profile',
+                    kwargs={'username': TEST_AUTHOR_USERNAME}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertFalse(any(
+                    TEXT_COLUMN in query['sql']
+                    for query in queries.captured_queries
+                ))
+                self.assertContains(response, TEST_WORD)
+                self.assertNotContains(response, TEST_TAIL)
+                self.assertContains(response, 'Читать полностью')
+
+    def test_post_detail_shows_full_text(self):
+        """
+        Тест проверяет, что страница поста показывает полный текст
+        без ссылки на него, а карточка ленты с отрывком кешируется
+        отдельно и не подменяет карточку страницы поста.
+        """
+        detail_url = reverse('posts:post_detail', kwargs={
+            'username': TEST_AUTHOR_USERNAME, 'post_id': self.post.pk
+        })
+        self.assertNotContains(
+            self.client.get(reverse('posts:index')), TEST_TAIL
+        )
+        for _ in range(2):
+            response = self.client.get(detail_url)
+            self.assertContains(response, TEST_TAIL)
+            self.assertNotContains(response, 'Читать полностью')
+        self.assertNotContains(
+            self.client.get(reverse('posts:index')), TEST_TAIL
+        )
@@ -0,0 +1,135 @@
+"""
+Модуль предназначен для тестирования hot-листов главной и лент групп.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import cache as feed_cache
+from posts import hot
+from posts.models import Group, Post, User
+from posts.paginators import paginate
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_OTHER_GROUP_SLUG = 'other-slug'
+TEST_POST_TEXT = 'Текст'
+POSTS_COUNT = 12
+PER_PAGE = 3
+HOT_PAGES = 2
+
+
+@override_settings(ELEMENTS_PER_PAGE=PER_PAGE, HOT_FEED_PAGES=HOT_PAGES)
+class HotFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+        cls.other_group = Group.objects.create(
+            title=TEST_OTHER_GROUP_SLUG,
+            description=TEST_OTHER_GROUP_SLUG,
+            slug=TEST_OTHER_GROUP_SLUG
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        for _ in range(POSTS_COUNT):
+            Post.objects.create(
+                author=self.author, group=self.group, text=TEST_POST_TEXT
+            )
+
+    def feeds(self):
+        return {
+            feed_cache.index_scope(): Post.objects.select_related(
+                'author', 'group'
+            ),
+            feed_cache.group_scope(TEST_GROUP_SLUG): self.group.posts.all(),
+        }
+
+    def assert_pages_match(self):
+        for mode in ('pages', 'cursor'):
+            with self.settings(PAGINATION_MODE=mode):
+                for scope, posts in self.feeds().items():
+                    params = {}
+                    for number in range(1, HOT_PAGES + 2):
+                        with self.subTest(mode=mode, scope=scope, page=number):
+                            if mode == 'pages':
+                                params = {'page': number}
+                            request = self.factory.get('/', params)
+                            page = hot.paginate(request, scope, posts)
+                            expected = paginate(request, posts)
+                            self.assertEqual(
+                                [post.pk for post in page],
+                                [post.pk for post in expected]
+                            )
+                            self.assertEqual(
+                                page.has_next(), expected.has_next()
+                            )
+                            if mode == 'cursor' and page.has_next():
+                                params = {'after': page.next_cursor}
+
+    def test_pages_match_database(self):
+        """
+        Тест проверяет, что страницы из hot-листа совпадают
+        со страницами из базы, в том числе после создания,
+        удаления поста и переноса его в другую группу.
+        """
+        self.assert_pages_match()
+        new_post = Post.objects.create(
+            author=self.author, group=self.group, text=TEST_POST_TEXT
+        )
+        ids, count = hot.load(feed_cache.index_scope(), Post.objects.all())
+        self.assertEqual(ids[0], new_post.pk)
+        self.assertEqual(count, POSTS_COUNT + 1)
+        self.assert_pages_match()
+
+        new_post.delete()
+        ids, count = hot.load(feed_cache.index_scope(), Post.objects.all())
+        self.assertNotIn(new_post.pk, ids)
+        self.assertEqual(count, POSTS_COUNT)
+        self.assert_pages_match()
+
+        moved = Post.objects.first()
+        moved.group = self.other_group
+        moved.save()
+        self.assert_pages_match()
+
+    def test_hot_page_skips_feed_query(self):
+        """
+        Тест проверяет, что первые страницы ленты из прогретого
+        hot-листа не сортируют посты и не выбирают их из базы.
+        """
+        client = Client()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group', kwargs={'slug': TEST_GROUP_SLUG}),
+        )
+        for url in urls:
+            client.get(url)
+            client.get(url, {'page': 2})
+        feed_cache.bump(
+            feed_cache.index_scope(), feed_cache.group_scope(TEST_GROUP_SLUG)
+        )
+        for url in urls:
+            for number in range(1, HOT_PAGES + 1):
+                with self.subTest(url=url, page=number):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get(url, {'page': number})
+                    self.assertEqual(len(response.context['page']), PER_PAGE)
+                    posts_queries = [
+                        query['sql'] for query in queries.captured_queries
+                        if 'posts_post' in query['sql']
+                    ]
+                    self.assertFalse(any(
+                        'ORDER BY' in sql or '"text"' in sql
+                        for sql in posts_queries
+                    ))
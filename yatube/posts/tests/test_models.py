@@ -155,7 +155,7 @@ class CommentModelTest(TestCase):
         comment = CommentModelTest.comment
         fields = {
             'post': ('Пост', 'Комментируемый пост'),
-            'created': ('Дата и время', 'Дата и время комментария'),
+            'created': ('Дата добавления', 'Дата добавления комментария'),
             'author': ('Автор', 'Автор комментария'),
             'text': ('Текст', 'Текст комментария')
         }
@@ -191,7 +191,7 @@ class FollowModelTest(TestCase):
             username=TEST_USER_USERNAME,
         )
         cls.follow = Follow.objects.create(
-            author=cls.author,
+            following=cls.author,
             user=cls.user
         )
 
@@ -202,8 +202,8 @@ class FollowModelTest(TestCase):
         """
         follow = FollowModelTest.follow
         fields = {
-            'author': ('Автор', 'Автор'),
-            'user': ('Подписчик', 'Подписчик пользователя')
+            'following': ('Автор', 'Автор'),
+            'user': ('Подписчик', 'Подписчик автора')
         }
         for field_name, expected_values in fields.items():
             with self.subTest(value=field_name):
@@ -219,6 +219,7 @@ class FollowModelTest(TestCase):
         self.assertEqual(
             str(follow),
             (f'Подписка {follow.user.get_full_name()} '
-                f'({follow.user.username}) на {follow.author.get_full_name()} '
-                f'({follow.author.username})')
+                f'({follow.user.username}) на '
+                f'{follow.following.get_full_name()} '
+                f'({follow.following.username})')
         )
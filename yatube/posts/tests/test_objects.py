@@ -0,0 +1,155 @@
+"""
+Модуль предназначен для тестирования кеша объектов.
+"""
+from django.core.cache import cache
+from django.http import Http404
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import cache as feed_cache
+from posts import objects
+from posts.models import Group, Post, User
+
+TEST_USERNAME = 'writer'
+TEST_NEW_USERNAME = 'renamed'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_NEW_TITLE = 'Новое название'
+TEST_POST_TEXT = 'Текст'
+
+
+class ObjectCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+
+    def setUp(self):
+        cache.clear()
+        objects.local.clear()
+        objects.forget_generations()
+        objects.reset_stats()
+
+    def test_layers_and_stats(self):
+        """
+        Тест проверяет, что объект читается из базы один раз,
+        дальше из кеша процесса или общего кеша, и что обращения
+        учитываются в счетчиках.
+        """
+        with self.assertNumQueries(1):
+            user = objects.users.get(username=TEST_USERNAME)
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                objects.users.get(username=TEST_USERNAME), self.user
+            )
+            self.assertEqual(objects.users.get(self.user.pk), self.user)
+        objects.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                objects.users.get(username=TEST_USERNAME), self.user
+            )
+        stats = objects.get_stats()[objects.users.label]
+        self.assertEqual(stats, {'local': 3, 'shared': 2, 'miss': 1})
+        with self.assertRaises(Http404):
+            objects.groups.get_or_404(slug='missing')
+
+    def test_password_not_cached(self):
+        """
+        Тест проверяет, что хеш пароля пользователя не попадает в кеш.
+        """
+        user = objects.users.get(username=TEST_USERNAME)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertNotIn('password', user.__dict__)
+
+    def test_invalidation(self):
+        """
+        Тест проверяет, что изменение и удаление объекта
+        сбрасывают его в кеше по id и по естественному ключу.
+        """
+        objects.users.get(username=TEST_USERNAME)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = TEST_NEW_USERNAME
+        user.save()
+        self.assertIsNone(objects.users.get(username=TEST_USERNAME))
+        self.assertEqual(
+            objects.users.get(username=TEST_NEW_USERNAME).username,
+            TEST_NEW_USERNAME
+        )
+
+        objects.groups.get(slug=TEST_GROUP_SLUG)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = TEST_NEW_TITLE
+        group.save()
+        self.assertEqual(
+            objects.groups.get(slug=TEST_GROUP_SLUG).title, TEST_NEW_TITLE
+        )
+
+        post = Post.objects.create(author=user, text=TEST_POST_TEXT)
+        self.assertEqual(objects.users.get(user.pk).stats.post_count, 1)
+        objects.posts.get(post.pk)
+        post.delete()
+        self.assertIsNone(objects.posts.get(post.pk))
+        self.assertEqual(objects.users.get(user.pk).stats.post_count, 0)
+
+    def test_group_delete_and_rename_reach_feeds(self):
+        """
+        Тест проверяет, что после удаления группы и переименования
+        автора закешированные посты и страницы лент не ссылаются
+        на старую группу и старое имя.
+        """
+        group = Group.objects.create(
+            title=TEST_NEW_TITLE, description=TEST_NEW_TITLE, slug='old'
+        )
+        post = Post.objects.create(
+            author=self.user, group=group, text=TEST_POST_TEXT
+        )
+        client = Client()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': TEST_USERNAME}),
+        )
+        for url in urls:
+            self.assertContains(client.get(url), TEST_NEW_TITLE)
+        self.assertEqual(objects.posts.get(post.pk).group, group)
+
+        group.delete()
+        self.assertIsNone(objects.posts.get(post.pk).group)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotContains(client.get(url), TEST_NEW_TITLE)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.username = TEST_NEW_USERNAME
+        user.save()
+        self.assertEqual(
+            objects.posts.get(post.pk).author.username, TEST_NEW_USERNAME
+        )
+        response = client.get(urls[0])
+        self.assertContains(response, f'@{TEST_NEW_USERNAME}')
+        self.assertNotContains(response, f'@{TEST_USERNAME}')
+
+    def test_feed_pages_skip_local_cache(self):
+        """
+        Тест проверяет, что страница ленты строится мимо кеша процесса:
+        изменение, после которого другой воркер сбросил пост только
+        в общем кеше, попадает на новую страницу ленты.
+        """
+        post = Post.objects.create(author=self.user, text=TEST_POST_TEXT)
+        objects.posts.get(post.pk)
+        Post.objects.filter(pk=post.pk).update(
+            excerpt=TEST_NEW_TITLE, updated_at=timezone.now()
+        )
+        cache.delete(
+            objects.posts._pk_key(objects.posts._generation(), post.pk)
+        )
+        feed_cache.bump(feed_cache.index_scope())
+        self.assertContains(
+            Client().get(reverse('posts:index')), TEST_NEW_TITLE
+        )
@@ -0,0 +1,141 @@
+"""
+Модуль предназначен для контроля количества SQL-запросов view-функций.
+
+Число запросов закреплено для каждой страницы и не должно зависеть
+от количества постов и комментариев на ней: появление N+1 роняет тест.
+"""
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_POST_TEXT = 'Текст'
+TEST_COMMENT_TEXT = 'Комментарий'
+# Запросы, которые ищут автора по username или пост по id
+LOOKUP_PATTERN = re.compile(
+    r'"auth_user"\."username" = |"posts_post"\."id" = '
+)
+POST_VIEWS = ('post_detail', 'post_edit', 'add_comment')
+SMALL = 1
+LARGE = 10
+
+# Сессия и пользователь запроса - по запросу на каждую страницу
+# авторизованного клиента (валидаторы условного GET лент берутся
+# из кеша); пост с автором и группой - один запрос
+EXPECTED_QUERIES = {
+    'index': 4,
+    'group': 5,
+    'profile': 5,
+    'post_detail': 4,
+    'post_edit': 4,
+    'add_comment': 4,
+    'follow_index': 5,
+}
+
+
+class QueryCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+        Follow.objects.create(user=cls.reader, following=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def populate(self, size):
+        """
+        Создает size постов с size комментариями от разных читателей.
+        """
+        commenters = [
+            User.objects.create_user(username=f'commenter{size}_{i}')
+            for i in range(size)
+        ]
+        for _ in range(size):
+            post = Post.objects.create(
+                author=self.author, group=self.group, text=TEST_POST_TEXT
+            )
+            for commenter in commenters:
+                Comment.objects.create(
+                    post=post, author=commenter, text=TEST_COMMENT_TEXT
+                )
+        return post
+
+    def urls(self, post):
+        post_kwargs = {
+            'username': TEST_AUTHOR_USERNAME,
+            'post_id': post.pk
+        }
+        return {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group',
+                             kwargs={'slug': TEST_GROUP_SLUG}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': TEST_AUTHOR_USERNAME}),
+            'post_detail': reverse('posts:post_detail', kwargs=post_kwargs),
+            'post_edit': reverse('posts:post_edit', kwargs=post_kwargs),
+            'add_comment': reverse('posts:add_comment', kwargs=post_kwargs),
+            'follow_index': reverse('posts:follow_index'),
+        }
+
+    def count_queries(self, url, client):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        return len(queries)
+
+    def test_query_count_does_not_grow(self):
+        """
+        Тест проверяет, что число запросов каждой страницы закреплено
+        и не растет вместе с количеством постов и комментариев.
+        """
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        clients = {'follow_index': reader_client}
+        measured = {}
+        for size in (SMALL, LARGE):
+            post = self.populate(size)
+            for name, url in self.urls(post).items():
+                client = clients.get(name, self.client)
+                measured.setdefault(name, []).append(
+                    self.count_queries(url, client)
+                )
+        for name, expected in EXPECTED_QUERIES.items():
+            with self.subTest(view=name):
+                self.assertEqual(measured[name], [expected, expected])
+
+    def test_post_views_single_lookup(self):
+        """
+        Тест проверяет, что страницы поста находят автора
+        и пост одним запросом.
+        """
+        post = self.populate(SMALL)
+        urls = self.urls(post)
+        for name in POST_VIEWS:
+            with self.subTest(view=name):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(urls[name])
+                self.assertEqual(response.status_code, 200)
+                lookups = [
+                    query['sql'] for query in queries.captured_queries
+                    if LOOKUP_PATTERN.search(query['sql'])
+                ]
+                self.assertEqual(len(lookups), 1, lookups)
@@ -0,0 +1,177 @@
+"""
+Модуль предназначен для проверки планов запросов лент.
+
+Каждый запрос, который выполняют ленты, страница поста и комментарии,
+прогоняется через EXPLAIN QUERY PLAN. План не должен читать таблицу
+целиком (SCAN без индекса) и сортировать строки во временном B-дереве:
+и то и другое на большой таблице стоит пропорционально ее размеру.
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from posts import cache as feed_cache
+from posts import hot, objects, timeline
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import paginate
+from posts.resolvers import resolve_post
+from posts.views import comments_context
+
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-slug'
+TEST_POST_TEXT = 'Текст'
+TEST_COMMENT_TEXT = 'Комментарий'
+POSTS_COUNT = 6
+PER_PAGE = 2
+
+
+@override_settings(
+    ELEMENTS_PER_PAGE=PER_PAGE, COMMENTS_PER_PAGE=PER_PAGE, HOT_FEED_PAGES=1
+)
+class QueryPlanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_SLUG,
+            description=TEST_GROUP_SLUG,
+            slug=TEST_GROUP_SLUG
+        )
+        Follow.objects.create(user=cls.reader, following=cls.author)
+        for _ in range(POSTS_COUNT):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group, text=TEST_POST_TEXT
+            )
+        for _ in range(POSTS_COUNT):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=TEST_COMMENT_TEXT
+            )
+
+    def setUp(self):
+        cache.clear()
+        objects.local.clear()
+        self.factory = RequestFactory()
+
+    def request(self, **params):
+        request = self.factory.get('/', params)
+        request.user = self.reader
+        return request
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans_use_indexes(self, run):
+        """
+        Выполняет run и проверяет планы всех его запросов SELECT.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects)
+        for sql in selects:
+            for step in self.explain(sql):
+                with self.subTest(sql=sql, step=step):
+                    self.assertFalse(
+                        step.startswith('SCAN') and 'USING' not in step
+                    )
+                    self.assertNotIn('TEMP B-TREE', step)
+
+    def walk_pages(self, queryset):
+        """
+        Открывает страницы queryset во всех режимах пагинации,
+        включая переходы вперед и назад по курсору.
+        """
+        with self.settings(PAGINATION_MODE='pages'):
+            for number in (1, 2):
+                list(paginate(self.request(page=number), queryset))
+        with self.settings(PAGINATION_MODE='cursor'):
+            page = paginate(self.request(), queryset)
+            page = paginate(self.request(after=page.next_cursor), queryset)
+            list(paginate(self.request(before=page.previous_cursor), queryset))
+
+    def test_feed_plans(self):
+        """
+        Тест проверяет, что главная, лента группы, профиль,
+        лента подписок и hot-листы читают посты по индексу
+        в порядке ленты, без полного просмотра и сортировки.
+        """
+        feeds = {
+            'index': Post.objects.select_related('author', 'group'),
+            'group': self.group.posts.select_related('author', 'group'),
+            'profile': self.author.posts.select_related('group'),
+        }
+        for name, posts in feeds.items():
+            with self.subTest(feed=name):
+                self.assert_plans_use_indexes(lambda: self.walk_pages(posts))
+        scopes = {
+            feed_cache.index_scope(): feeds['index'],
+            feed_cache.group_scope(TEST_GROUP_SLUG): feeds['group'],
+        }
+        for scope, posts in scopes.items():
+            with self.subTest(scope=scope):
+                self.assert_plans_use_indexes(
+                    lambda: hot.load(scope, posts)
+                )
+        self.assert_plans_use_indexes(
+            lambda: list(timeline.get_feed_page(self.request(), self.reader))
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_follow_feed_plans(self):
+        """
+        Тест проверяет, что лента подписок с популярным автором
+        сливается из диапазонов индексов без полного просмотра
+        и сортировки во всех режимах пагинации.
+        """
+        def feed(**params):
+            return timeline.get_feed_page(self.request(**params), self.reader)
+
+        def run():
+            with self.settings(PAGINATION_MODE='pages'):
+                for number in (1, 2):
+                    page = feed(page=number)
+                    self.assertEqual(len(page), PER_PAGE)
+            with self.settings(PAGINATION_MODE='cursor'):
+                page = feed()
+                page = feed(after=page.next_cursor)
+                self.assertEqual(len(page), PER_PAGE)
+                list(feed(before=page.previous_cursor))
+
+        self.assertEqual(timeline.get_popular_authors(self.reader),
+                         [self.author.pk])
+        self.assert_plans_use_indexes(run)
+
+    def test_post_plans(self):
+        """
+        Тест проверяет, что пост, его комментарии, проверка подписки
+        и даты для условных запросов читаются по индексам.
+        """
+        def run():
+            request = self.request()
+            post = resolve_post(
+                request, TEST_AUTHOR_USERNAME, self.post.pk
+            )
+            context = comments_context(
+                request, TEST_AUTHOR_USERNAME, self.post.pk,
+                post.comments.all()
+            )
+            cursor = context['comments'].next_cursor
+            list(comments_context(
+                self.request(after=cursor), TEST_AUTHOR_USERNAME,
+                self.post.pk, post.comments.all()
+            )['comments'])
+            Follow.objects.filter(
+                user=self.reader, following=self.author
+            ).exists()
+
+        self.assert_plans_use_indexes(run)
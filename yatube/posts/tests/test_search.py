@@ -0,0 +1,120 @@
+"""
+Модуль предназначен для тестирования полнотекстового поиска.
+"""
+from django.conf import settings
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.search import SearchPaginator, build_match
+
+TEST_USER_USERNAME = 'amogus'
+TEST_ADMIN_USERNAME = 'admin'
+TEST_MATCHING_TEXT = 'Котики и собаки гуляют'
+TEST_OTHER_TEXT = 'Погода сегодня хорошая'
+TEST_QUERY = 'котик'
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER_USERNAME)
+        cls.admin = User.objects.create_superuser(
+            username=TEST_ADMIN_USERNAME,
+            email='admin@example.com',
+            password='password'
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    def search(self, query, **params):
+        return self.client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+
+    def test_build_match_drops_operators(self):
+        """
+        Тест проверяет, что операторы FTS5 из строки поиска
+        не попадают в запрос.
+        """
+        self.assertEqual(build_match('котик OR "*собака'),
+                         '"котик"* "OR"* "собака"*')
+        self.assertEqual(build_match('-()*'), '')
+
+    def test_search_highlights_and_escapes(self):
+        """
+        Тест проверяет, что поиск находит пост по префиксу слова,
+        выделяет совпадение и экранирует текст поста.
+        """
+        Post.objects.create(
+            author=self.user, text=TEST_MATCHING_TEXT + ' <script>'
+        )
+        Post.objects.create(author=self.user, text=TEST_OTHER_TEXT)
+        response = self.search(TEST_QUERY)
+        page = response.context['page']
+        self.assertEqual(len(page), 1)
+        self.assertContains(response, '<mark>Котики</mark>')
+        self.assertContains(response, '&lt;script&gt;')
+        self.assertNotContains(response, TEST_OTHER_TEXT)
+
+    def test_index_follows_edits_and_deletes(self):
+        """
+        Тест проверяет, что индекс обновляется при изменении
+        и удалении поста.
+        """
+        post = Post.objects.create(author=self.user, text=TEST_OTHER_TEXT)
+        self.assertEqual(len(self.search(TEST_QUERY).context['page']), 0)
+        post.text = TEST_MATCHING_TEXT
+        post.save()
+        self.assertEqual(len(self.search(TEST_QUERY).context['page']), 1)
+        post.delete()
+        self.assertEqual(len(self.search(TEST_QUERY).context['page']), 0)
+
+    def test_ranked_keyset_pages(self):
+        """
+        Тест проверяет, что более релевантный пост идет первым,
+        а курсоры обходят все результаты без повторов.
+        """
+        count = settings.ELEMENTS_PER_PAGE * 2 + 1
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'{TEST_MATCHING_TEXT} {i}')
+            for i in range(count)
+        )
+        best = Post.objects.create(author=self.user, text='Котики котики')
+        paginator = SearchPaginator(TEST_QUERY, settings.ELEMENTS_PER_PAGE)
+        page = paginator.page()
+        self.assertEqual(page[0], best)
+        seen = list(page)
+        while page.has_next():
+            page = paginator.page(after=page.next_cursor)
+            seen.extend(page)
+        self.assertEqual(len(seen), count + 1)
+        self.assertEqual(len(set(seen)), count + 1)
+        previous = paginator.page(before=page.previous_cursor)
+        self.assertEqual(
+            list(previous), seen[-len(page) - len(previous):-len(page)]
+        )
+
+    def test_admin_search_uses_index(self):
+        """
+        Тест проверяет, что поиск в админке идет по индексу FTS5.
+        """
+        Post.objects.create(author=self.user, text=TEST_MATCHING_TEXT)
+        Post.objects.create(author=self.user, text=TEST_OTHER_TEXT)
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('admin:posts_post_changelist'), {'q': TEST_QUERY}
+            )
+        self.assertEqual(response.context['cl'].result_count, 1)
+        self.assertTrue(any(
+            'posts_post_fts' in query['sql'] for query in queries
+        ))
+        self.assertFalse(any(
+            'LIKE' in query['sql'] for query in queries
+        ))
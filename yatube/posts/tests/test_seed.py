@@ -0,0 +1,111 @@
+"""
+Модуль предназначен для тестирования генератора синтетического контента.
+"""
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Count, F, Sum
+from django.test import TestCase, override_settings
+
+from posts.models import (AuthorStats, Comment, Follow, Group, Post,
+                          TimelineEntry, User)
+
+TEST_USERS = 30
+TEST_GROUPS = 3
+TEST_POSTS = 60
+TEST_COMMENTS = 90
+TEST_FOLLOWS = 4
+TEST_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=(TEST_DIR + '/media'))
+class SeedContentTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def seed(self, seed=0):
+        call_command(
+            'seed_content',
+            users=TEST_USERS,
+            groups=TEST_GROUPS,
+            posts=TEST_POSTS,
+            comments=TEST_COMMENTS,
+            follows=TEST_FOLLOWS,
+            image_ratio=0.5,
+            seed=seed,
+            batch_size=7,
+            stdout=StringIO()
+        )
+
+    def snapshot(self):
+        return (
+            list(User.objects.order_by('username')
+                 .values_list('username', 'first_name', 'password')),
+            list(Post.objects.order_by('pub_date').values_list(
+                'author__username', 'group__slug', 'text', 'pub_date', 'image'
+            )),
+            list(Comment.objects.order_by('created').values_list(
+                'post__text', 'author__username', 'text', 'created'
+            )),
+            list(Follow.objects.order_by(
+                'user__username', 'following__username'
+            ).values_list('user__username', 'following__username')),
+        )
+
+    def test_seed_creates_consistent_content(self):
+        """
+        Тест проверяет, что команда создает заданное число объектов
+        и заполняет счетчики и ленты подписок.
+        """
+        self.seed()
+        self.assertEqual(User.objects.count(), TEST_USERS)
+        self.assertEqual(Group.objects.count(), TEST_GROUPS)
+        self.assertEqual(Post.objects.count(), TEST_POSTS)
+        self.assertEqual(Comment.objects.count(), TEST_COMMENTS)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        self.assertEqual(
+            Post.objects.aggregate(total=Sum('comment_count'))['total'],
+            TEST_COMMENTS
+        )
+        self.assertEqual(
+            AuthorStats.objects.aggregate(total=Sum('post_count'))['total'],
+            TEST_POSTS
+        )
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertFalse(
+            Follow.objects.filter(user=F('following')).exists()
+        )
+
+    def test_seed_is_deterministic(self):
+        """
+        Тест проверяет, что один seed дает одни и те же данные,
+        а другой seed - другие.
+        """
+        self.seed()
+        first = self.snapshot()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed()
+        self.assertEqual(self.snapshot(), first)
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed(seed=1)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_follow_graph_is_skewed(self):
+        """
+        Тест проверяет, что подписчики распределены неравномерно:
+        у самого популярного автора их намного больше среднего.
+        """
+        self.seed()
+        followers = list(
+            User.objects.annotate(total=Count('following'))
+            .values_list('total', flat=True)
+        )
+        self.assertGreater(max(followers), 3 * sum(followers) / TEST_USERS)
@@ -0,0 +1,132 @@
+"""
+Модуль предназначен для тестирования подготовки миниатюр.
+"""
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts import thumbnails
+from posts.models import Post, User
+
+TEST_USER_USERNAME = 'amogus'
+TEST_POST_TEXT = 'Текст'
+TEST_IMAGE_TYPE = 'image/png'
+TEST_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='big.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (1920, 1080), 'red').save(buffer, 'png')
+    return SimpleUploadedFile(
+        name=name, content=buffer.getvalue(), content_type=TEST_IMAGE_TYPE
+    )
+
+
+@override_settings(MEDIA_ROOT=(TEST_DIR + '/media'), THUMBNAIL_WORKERS=0)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER_USERNAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def run_on_commit(self):
+        """
+        Выполняет отложенные до фиксации транзакции действия:
+        в TestCase транзакция теста не фиксируется.
+        """
+        callbacks = connection.run_on_commit
+        connection.run_on_commit = []
+        for _, callback in callbacks:
+            callback()
+
+    def test_generate_stores_thumbnail(self):
+        """
+        Тест проверяет, что generate сохраняет готовую миниатюру
+        нужного размера.
+        """
+        post = Post.objects.create(
+            author=self.user, text=TEST_POST_TEXT, image=make_image()
+        )
+        name = thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail.name, name)
+        self.assertTrue(os.path.exists(post.thumbnail.path))
+        with Image.open(post.thumbnail.path) as image:
+            self.assertEqual(
+                f'{image.width}x{image.height}',
+                settings.POST_THUMBNAIL_GEOMETRY
+            )
+
+    def test_create_and_edit_schedule_thumbnail(self):
+        """
+        Тест проверяет, что создание и редактирование поста с картинкой
+        ставят миниатюру в очередь, а лента выводит готовый файл.
+        """
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': TEST_POST_TEXT, 'image': make_image()}
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.thumbnail.name, '')
+        self.run_on_commit()
+        post.refresh_from_db()
+        self.assertNotEqual(post.thumbnail.name, '')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, post.thumbnail.url)
+
+        first = post.thumbnail.name
+        self.client.post(
+            reverse('posts:post_edit', kwargs={
+                'username': TEST_USER_USERNAME, 'post_id': post.pk
+            }),
+            {'text': TEST_POST_TEXT, 'image': make_image('other.png')}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail.name, '')
+        self.run_on_commit()
+        post.refresh_from_db()
+        self.assertNotIn(post.thumbnail.name, ('', first))
+
+    def test_create_without_image_skips_thumbnail(self):
+        """
+        Тест проверяет, что пост без картинки не обновляется
+        повторно ради пустой миниатюры.
+        """
+        post = Post.objects.create(author=self.user, text=TEST_POST_TEXT)
+        with self.assertNumQueries(0):
+            thumbnails.schedule(post)
+
+    def test_command_backfills_thumbnails(self):
+        """
+        Тест проверяет, что команда generate_thumbnails готовит
+        миниатюры для постов без них.
+        """
+        Post.objects.create(
+            author=self.user, text=TEST_POST_TEXT, image=make_image()
+        )
+        Post.objects.create(author=self.user, text=TEST_POST_TEXT)
+        call_command('generate_thumbnails', workers=0, stdout=StringIO())
+        self.assertFalse(
+            Post.objects.exclude(image='').filter(thumbnail='').exists()
+        )
@@ -0,0 +1,186 @@
+"""
+Модуль предназначен для тестирования материализованной ленты подписок.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import AuthorStats, Follow, Post, TimelineEntry, User
+
+TEST_READER_USERNAME = 'reader'
+TEST_AUTHOR_USERNAME = 'writer'
+TEST_OTHER_USERNAME = 'stranger'
+TEST_POST_TEXT = 'Текст'
+POSTS_COUNT = 3
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        cls.author = User.objects.create_user(username=TEST_AUTHOR_USERNAME)
+        cls.other = User.objects.create_user(username=TEST_OTHER_USERNAME)
+        for _ in range(POSTS_COUNT):
+            Post.objects.create(author=cls.author, text=TEST_POST_TEXT)
+        Post.objects.create(author=cls.other, text=TEST_POST_TEXT)
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.follow_url = reverse(
+            'posts:profile_follow',
+            kwargs={'username': TEST_AUTHOR_USERNAME}
+        )
+        self.unfollow_url = reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': TEST_AUTHOR_USERNAME}
+        )
+        self.feed_url = reverse('posts:follow_index')
+
+    def feed_authors(self):
+        response = self.reader_client.get(self.feed_url)
+        return [post.author for post in response.context['page']]
+
+    def test_follow_backfills_timeline(self):
+        """
+        Тест проверяет, что после подписки в ленте появляются
+        прежние посты автора и только они.
+        """
+        self.reader_client.get(self.follow_url)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(),
+            POSTS_COUNT
+        )
+        self.assertEqual(self.feed_authors(), [self.author] * POSTS_COUNT)
+
+    def test_new_post_fans_out(self):
+        """
+        Тест проверяет, что новый пост попадает в ленты подписчиков.
+        """
+        self.reader_client.get(self.follow_url)
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post, pub_date=post.pub_date
+        ).exists())
+        response = self.reader_client.get(self.feed_url)
+        self.assertEqual(response.context['page'][0], post)
+
+    def test_unfollow_trims_timeline(self):
+        """
+        Тест проверяет, что после отписки посты автора уходят из ленты.
+        """
+        self.reader_client.get(self.follow_url)
+        self.reader_client.get(self.unfollow_url)
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(self.feed_authors(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_read_on_demand(self):
+        """
+        Тест проверяет, что посты автора с подписчиками сверх порога
+        не раскладываются по лентам, но видны в ленте при чтении.
+        """
+        self.reader_client.get(self.follow_url)
+        Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, following=self.author
+        ).exists())
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+        self.assertEqual(
+            self.feed_authors(), [self.author] * (POSTS_COUNT + 1)
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_below_limit_fills_timelines(self):
+        """
+        Тест проверяет, что число подписчиков хранится в статистике
+        автора, а когда автор опускается до порога, его посты периода
+        популярности раскладывает по лентам подписчиков
+        команда fill_timelines, а не запрос отписки.
+        """
+        other_client = Client()
+        other_client.force_login(self.other)
+        self.reader_client.get(self.follow_url)
+        other_client.get(self.follow_url)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).follower_count, 2
+        )
+        post = Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists()
+        )
+        other_client.get(self.unfollow_url)
+        stats = AuthorStats.objects.get(user=self.author)
+        self.assertEqual(stats.follower_count, 1)
+        self.assertTrue(stats.fill_pending)
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists()
+        )
+        call_command('fill_timelines', stdout=StringIO())
+        self.assertFalse(
+            AuthorStats.objects.get(user=self.author).fill_pending
+        )
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post
+        ).exists())
+        self.assertEqual(
+            self.feed_authors(), [self.author] * (POSTS_COUNT + 1)
+        )
+
+    @override_settings(PAGINATION_MODE='cursor', ELEMENTS_PER_PAGE=2)
+    def test_cursor_pages_over_timeline(self):
+        """
+        Тест проверяет курсорную паджинацию ленты подписок.
+        """
+        self.reader_client.get(self.follow_url)
+        first = self.reader_client.get(self.feed_url).context['page']
+        second = self.reader_client.get(
+            self.feed_url, {'after': first.next_cursor}
+        ).context['page']
+        posts = [*first, *second]
+        self.assertEqual(len(set(posts)), POSTS_COUNT)
+        self.assertEqual(
+            posts,
+            list(Post.objects.filter(author=self.author)
+                 .order_by('-pub_date', '-pk'))
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1, ELEMENTS_PER_PAGE=2)
+    def test_popular_author_merged_with_timeline(self):
+        """
+        Тест проверяет, что посты популярного автора сливаются
+        с лентой по дате без повторов в обоих режимах пагинации.
+        """
+        self.reader_client.get(self.follow_url)
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': TEST_OTHER_USERNAME}
+        ))
+        Follow.objects.create(user=self.other, following=self.author)
+        Post.objects.create(author=self.other, text=TEST_POST_TEXT)
+        Post.objects.create(author=self.author, text=TEST_POST_TEXT)
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        with self.settings(PAGINATION_MODE='cursor'):
+            posts, params = [], {}
+            while True:
+                page = self.reader_client.get(
+                    self.feed_url, params
+                ).context['page']
+                posts.extend(page)
+                if not page.has_next():
+                    break
+                params = {'after': page.next_cursor}
+        self.assertEqual(posts, expected)
+        with self.settings(PAGINATION_MODE='pages'):
+            page = self.reader_client.get(
+                self.feed_url, {'page': 2}
+            ).context['page']
+        self.assertEqual(page.paginator.count, len(expected))
+        self.assertEqual(list(page), expected[2:4])
@@ -0,0 +1,138 @@
+"""
+Модуль предназначен для тестирования выгрузки и загрузки контента.
+"""
+import datetime as dt
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import (AuthorStats, Comment, Follow, Group, Post,
+                          TimelineEntry, User)
+from posts.transfer import read_checkpoint, write_checkpoint
+
+TEST_AUTHOR_USERNAME = 'author'
+TEST_READER_USERNAME = 'reader'
+TEST_GROUP_SLUG = 'test-group'
+TEST_POST_TEXT = 'Текст'
+TEST_POSTS = 5
+TEST_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+class TransferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.path = os.path.join(TEST_DIR, 'content.ndjson')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+    def setUp(self):
+        author = User.objects.create_user(
+            username=TEST_AUTHOR_USERNAME, is_staff=True
+        )
+        reader = User.objects.create_user(username=TEST_READER_USERNAME)
+        group = Group.objects.create(
+            title='Группа', slug=TEST_GROUP_SLUG, description='Описание'
+        )
+        Follow.objects.create(user=reader, following=author)
+        self.pub_date = timezone.now() - dt.timedelta(days=30)
+        for i in range(TEST_POSTS):
+            post = Post.objects.create(
+                author=author, group=group, text=f'{TEST_POST_TEXT} {i}'
+            )
+            Comment.objects.create(
+                post=post, author=reader, text=TEST_POST_TEXT
+            )
+        Post.objects.update(pub_date=self.pub_date)
+        call_command('export_content', output=self.path, stderr=StringIO())
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def assert_restored(self):
+        self.assertEqual(Post.objects.count(), TEST_POSTS)
+        self.assertFalse(Post.objects.exclude(pub_date=self.pub_date).exists())
+        self.assertFalse(Post.objects.exclude(comment_count=1).exists())
+        self.assertEqual(
+            AuthorStats.objects.get(
+                user__username=TEST_AUTHOR_USERNAME
+            ).post_count,
+            TEST_POSTS
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user__username=TEST_READER_USERNAME
+            ).count(),
+            TEST_POSTS
+        )
+        self.assertEqual(
+            Post.objects.filter(group__slug=TEST_GROUP_SLUG).count(),
+            TEST_POSTS
+        )
+
+    def test_export_import_round_trip(self):
+        """
+        Тест проверяет, что загрузка выгрузки восстанавливает контент,
+        даты и денормализованные поля.
+        """
+        call_command(
+            'import_content', self.path, batch_size=2, stdout=StringIO()
+        )
+        self.assert_restored()
+        self.assertTrue(
+            User.objects.get(username=TEST_AUTHOR_USERNAME).is_staff
+        )
+        self.assertFalse(os.path.exists(self.path + '.checkpoint'))
+        call_command(
+            'import_content', self.path, batch_size=2, stdout=StringIO()
+        )
+        self.assertEqual(Comment.objects.count(), TEST_POSTS)
+
+    def test_import_resumes_from_checkpoint(self):
+        """
+        Тест проверяет, что загрузка продолжается с контрольной точки
+        и не повторяет уже загруженные строки.
+        """
+        checkpoint = self.path + '.checkpoint'
+        with open(self.path) as source:
+            lines = source.readlines()
+        before_follows = next(
+            number for number, line in enumerate(lines)
+            if '"type": "follow"' in line
+        )
+        call_command('import_content', self.path, batch_size=100,
+                     stdout=StringIO(), restart=True)
+        Post.objects.filter(text=f'{TEST_POST_TEXT} 0').delete()
+        write_checkpoint(checkpoint, before_follows)
+        self.assertEqual(read_checkpoint(checkpoint), before_follows)
+        call_command('import_content', self.path, stdout=StringIO())
+        self.assertFalse(
+            Post.objects.filter(text=f'{TEST_POST_TEXT} 0').exists()
+        )
+        self.assertEqual(Post.objects.count(), TEST_POSTS - 1)
+
+    def test_import_refuses_taken_ids(self):
+        """
+        Тест проверяет, что загрузка останавливается, если id поста
+        занят другим постом, и не прикрепляет к нему комментарии.
+        """
+        with open(self.path) as source:
+            first_post = next(
+                json.loads(line) for line in source
+                if '"type": "post"' in line
+            )
+        other = User.objects.create_user(username='other')
+        Post.objects.create(pk=first_post['id'], author=other, text='Чужой')
+        with self.assertRaises(CommandError):
+            call_command('import_content', self.path, stdout=StringIO())
+        self.assertFalse(Comment.objects.exists())
@@ -10,10 +10,13 @@ from django import forms
 from django.conf import settings
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Follow, Group, Post, User
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import WindowedPaginator
 
 UTF_OFFSET = dt.datetime.utcnow()
 POSTS_COUNT = 15
@@ -26,6 +29,9 @@ TEST_GROUP_SLUG = 'test-slug'
 TEST_GROUP_DESC = 'Описание'
 TEST_POST_TEXT = 'Текст'
 TEST_EMPTY_GROUP_SLUG = 'empty_group'
+TEST_COMMENT_TEXT = 'Комментарий'
+COMMENTS_COUNT = 7
+COMMENTS_PER_PAGE = 5
 TEST_IMAGE = (
     b'\x47\x49\x46\x38\x39\x61\x01\x00'
     b'\x01\x00\x00\x00\x00\x21\xf9\x04'
@@ -256,13 +262,18 @@ class PostPagesTest(TestCase):
             len(response.context['page'].object_list), 0
         )
 
-    def test_cache_duration(self):
+    def test_cache_invalidation(self):
         """
-        Тест проверяет длительность хранения кешированных значений.
+        Тест проверяет, что главная страница берется из кеша,
+        пока не появится новый пост.
         """
+        cache.clear()
         request = REQUEST_TEMPLATE_DICT['homepage'][0]
-        response = self.authorized_client1.get(request)
-        self.assertEqual(response['cache-control'], 'max-age=20')
+        content = self.guest_client.get(request).content
+        Post.objects.update(text='Обновленный текст')
+        self.assertEqual(self.guest_client.get(request).content, content)
+        Post.objects.create(author=self.user1, text='Новый пост')
+        self.assertNotEqual(self.guest_client.get(request).content, content)
 
     def test_follow_unfollow(self):
         """
@@ -298,4 +309,187 @@ class PostPagesTest(TestCase):
         self.authorized_client2.get(request)
         user2 = PostPagesTest.user1
         self.assertFalse(Follow.objects.filter(
-                         user=user2, author=user2).exists())
+                         user=user2, following=user2).exists())
+
+
+@override_settings(PAGINATION_MODE='cursor')
+class CursorPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER1_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_TITLE,
+            description=TEST_GROUP_DESC,
+            slug=TEST_GROUP_SLUG
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=TEST_POST_TEXT)
+            for _ in range(POSTS_COUNT)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_pages_cover_feed(self):
+        """
+        Тест проверяет, что курсорные страницы обходят всю ленту
+        без пропусков и повторов в обе стороны.
+        """
+        for view_name in ('homepage', 'group', 'profile'):
+            url = REQUEST_TEMPLATE_DICT[view_name][0]
+            with self.subTest(url=url):
+                cache.clear()
+                first = self.client.get(url).context['page']
+                self.assertFalse(first.has_previous())
+                self.assertTrue(first.has_next())
+                self.assertEqual(len(first), POST_PER_PAGE_COUNT)
+
+                second = self.client.get(
+                    url, {'after': first.next_cursor}).context['page']
+                self.assertFalse(second.has_next())
+                self.assertTrue(second.has_previous())
+                self.assertEqual(len(second), POSTS_COUNT - len(first))
+                seen = {post.pk for post in [*first, *second]}
+                self.assertEqual(len(seen), POSTS_COUNT)
+
+                back = self.client.get(
+                    url, {'before': second.previous_cursor}).context['page']
+                self.assertEqual(
+                    [post.pk for post in back],
+                    [post.pk for post in first]
+                )
+
+    def test_broken_cursor_returns_first_page(self):
+        """
+        Тест проверяет, что испорченный курсор открывает первую страницу.
+        """
+        url = REQUEST_TEMPLATE_DICT['group'][0]
+        page = self.client.get(url, {'after': 'not-a-cursor'}).context['page']
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page), POST_PER_PAGE_COUNT)
+
+    def test_cursor_page_skips_count(self):
+        """
+        Тест проверяет, что курсорная страница не выполняет COUNT(*).
+        """
+        url = REQUEST_TEMPLATE_DICT['group'][0]
+        first = self.client.get(url).context['page']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'after': first.next_cursor})
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+
+@override_settings(PAGINATION_MODE='pages', ELEMENTS_PER_PAGE=1)
+class WindowedPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER1_USERNAME)
+        cls.group = Group.objects.create(
+            title=TEST_GROUP_TITLE,
+            description=TEST_GROUP_DESC,
+            slug=TEST_GROUP_SLUG
+        )
+        for _ in range(POSTS_COUNT):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=TEST_POST_TEXT
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_page_window(self):
+        """
+        Тест проверяет, что лента выводит ссылки только на первую,
+        последнюю и соседние с текущей страницы.
+        """
+        ellipsis = WindowedPaginator.ELLIPSIS
+        windows = {
+            1: [1, 2, 3, ellipsis, POSTS_COUNT],
+            8: [1, ellipsis, 6, 7, 8, 9, 10, ellipsis, POSTS_COUNT],
+            POSTS_COUNT: [1, ellipsis, 13, 14, POSTS_COUNT],
+        }
+        for view_name in ('homepage', 'group', 'profile'):
+            url = REQUEST_TEMPLATE_DICT[view_name][0]
+            for number, window in windows.items():
+                with self.subTest(url=url, page=number):
+                    response = self.client.get(url, {'page': number})
+                    self.assertEqual(
+                        response.context['page'].page_window, window
+                    )
+                    self.assertNotContains(response, 'page=4"')
+
+    def test_count_cached(self):
+        """
+        Тест проверяет, что число записей ленты считается один раз.
+        """
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                WindowedPaginator(Post.objects.all(), 1).count, POSTS_COUNT
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                WindowedPaginator(Post.objects.all(), 1).count, POSTS_COUNT
+            )
+            self.assertEqual(
+                WindowedPaginator(Post.objects.none(), 1, count=3).count, 3
+            )
+
+
+@override_settings(COMMENTS_PER_PAGE=COMMENTS_PER_PAGE)
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = User.objects.create_user(username=TEST_USER1_USERNAME)
+        cls.post = Post.objects.create(author=cls.user, text=TEST_POST_TEXT)
+        for _ in range(COMMENTS_COUNT):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=TEST_COMMENT_TEXT
+            )
+        cls.kwargs = {'username': TEST_USER1_USERNAME, 'post_id': cls.post.pk}
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_comments_pages_cover_post(self):
+        """
+        Тест проверяет, что страница поста показывает первую страницу
+        комментариев, а фрагмент отдает остальные по порядку.
+        """
+        first = self.client.get(
+            reverse('posts:post_detail', kwargs=self.kwargs)
+        ).context['comments']
+        self.assertEqual(len(first), COMMENTS_PER_PAGE)
+        self.assertTrue(first.has_next())
+
+        response = self.client.get(
+            reverse('posts:comments', kwargs=self.kwargs),
+            {'after': first.next_cursor}
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        rest = response.context['comments']
+        self.assertFalse(rest.has_next())
+        self.assertEqual(
+            [comment.pk for comment in [*first, *rest]],
+            list(self.post.comments.values_list('pk', flat=True))
+        )
+
+    def test_comments_of_missing_post(self):
+        """
+        Тест проверяет, что фрагмент комментариев чужого
+        или несуществующего поста не найден.
+        """
+        response = self.client.get(reverse('posts:comments', kwargs={
+            'username': TEST_USER2_USERNAME, 'post_id': self.post.pk
+        }))
+        self.assertEqual(response.status_code, 404)
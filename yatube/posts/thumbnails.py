@@ -0,0 +1,85 @@
+"""
+Подготовка миниатюр изображений постов вне запроса.
+
+Миниатюра строится в пуле процессов после сохранения поста и
+записывается в Post.thumbnail, поэтому шаблоны только выводят
+готовый файл и никогда не декодируют изображения сами.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from . import cache, objects
+from .models import Post
+
+_executor = None
+
+
+def make_executor(workers):
+    """
+    Создает пул процессов. Процессы запускаются через spawn
+    и не наследуют соединения с базой родительского процесса.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup
+    )
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = make_executor(settings.THUMBNAIL_WORKERS)
+    return _executor
+
+
+def generate(post_id):
+    """
+    Строит миниатюру поста и сохраняет ее имя в Post.thumbnail.
+    Возвращает имя файла миниатюры или пустую строку.
+    """
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        return ''
+    name = ''
+    if post.image:
+        name = get_thumbnail(
+            post.image,
+            settings.POST_THUMBNAIL_GEOMETRY,
+            **settings.POST_THUMBNAIL_OPTIONS
+        ).name
+    Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail=name, updated_at=timezone.now()
+    )
+    cache.bump(*cache.post_scopes(post))
+    objects.posts.forget(post_id)
+    return name
+
+
+def schedule(post):
+    """
+    Сбрасывает устаревшую миниатюру поста и ставит построение новой
+    в очередь после фиксации транзакции. Посту без изображения
+    и без миниатюры делать нечего.
+    """
+    if not post.image and not post.thumbnail:
+        return
+    Post.objects.filter(pk=post.pk).update(
+        thumbnail='', updated_at=timezone.now()
+    )
+    objects.posts.forget(post.pk)
+    post.thumbnail = ''
+    if not post.image:
+        return
+    if not settings.THUMBNAIL_WORKERS:
+        transaction.on_commit(lambda: generate(post.pk))
+        return
+    transaction.on_commit(lambda: get_executor().submit(generate, post.pk))
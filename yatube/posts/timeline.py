@@ -0,0 +1,201 @@
+"""
+Материализованная лента подписок (fan-out on write).
+
+Посты автора раскладываются по лентам подписчиков при публикации,
+поэтому чтение ленты - один проход по индексу (user, -pub_date).
+Посты авторов, у которых подписчиков больше
+settings.TIMELINE_FANOUT_LIMIT, не раскладываются, а подмешиваются
+в ленту при чтении (fan-out on read). Число подписчиков хранится
+в AuthorStats.follower_count, поэтому проверка порога - чтение
+одной строки. Когда автор опускается ниже порога, его последние
+посты раскладываются по лентам подписчиков (fill), иначе посты
+периода популярности пропали бы из лент. Заполнение идет вне
+запроса: отписка только отмечает автора (schedule_fill),
+а ленты заполняет команда fill_timelines.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from .models import (CARD_FIELDS, AuthorStats, Follow, Post,
+                     TimelineEntry)
+from .paginators import MergedFeed, paginate
+
+
+def is_popular(author):
+    """
+    Проверяет, что подписчиков у автора больше порога
+    и его посты не раскладываются по лентам.
+    """
+    return AuthorStats.objects.filter(
+        user=author, follower_count__gt=settings.TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def get_followers(author):
+    """
+    Возвращает id подписчиков автора или None, если их больше порога.
+    """
+    if is_popular(author):
+        return None
+    return list(
+        Follow.objects.filter(following=author)
+        .values_list('user_id', flat=True)
+    )
+
+
+def fan_out(post):
+    """
+    Добавляет новый пост в ленты подписчиков автора.
+    """
+    followers = get_followers(post.author_id)
+    if not followers:
+        return
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user_id=user_id,
+                       post=post,
+                       author_id=post.author_id,
+                       pub_date=post.pub_date)
+         for user_id in followers),
+        ignore_conflicts=True
+    )
+
+
+def backfill(user, author):
+    """
+    Добавляет в ленту пользователя последние посты автора после подписки.
+    """
+    if get_followers(author) is None:
+        return
+    posts = (
+        author.posts.order_by('-pub_date')
+        .values_list('pk', 'pub_date')[:settings.TIMELINE_BACKFILL_LIMIT]
+    )
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(user=user,
+                       post_id=post_id,
+                       author=author,
+                       pub_date=pub_date)
+         for post_id, pub_date in posts),
+        ignore_conflicts=True
+    )
+
+
+def fill(author_ids):
+    """
+    Раскладывает последние посты авторов по лентам их подписчиков.
+    Нужна после массовой загрузки, когда сигналы не срабатывают.
+    Ленты автора заполняются одним INSERT ... SELECT
+    (подписчики x последние посты), без объектов в памяти.
+    """
+    ops = connection.ops
+    for author_id in author_ids:
+        if not get_followers(author_id):
+            continue
+        followers, followers_params = (
+            Follow.objects.filter(following_id=author_id)
+            .values('user_id').query.sql_with_params()
+        )
+        posts, posts_params = (
+            Post.objects.filter(author_id=author_id)
+            .order_by('-pub_date')
+            .values('pk', 'pub_date')[:settings.TIMELINE_BACKFILL_LIMIT]
+            .query.sql_with_params()
+        )
+        sql = (
+            f'{ops.insert_statement(ignore_conflicts=True)} '
+            f'{ops.quote_name(TimelineEntry._meta.db_table)} '
+            '(user_id, post_id, author_id, pub_date) '
+            'SELECT f.user_id, p.id, %s, p.pub_date '
+            f'FROM ({followers}) f CROSS JOIN ({posts}) p '
+            f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql, (author_id, *followers_params, *posts_params)
+            )
+
+
+def schedule_fill(author_id):
+    """
+    Отмечает, что посты автора нужно разложить по лентам подписчиков.
+    """
+    AuthorStats.objects.filter(user_id=author_id).update(fill_pending=True)
+
+
+def fill_pending():
+    """
+    Заполняет ленты подписчиков отмеченных авторов и снимает отметки.
+    Возвращает число обработанных авторов.
+    """
+    author_ids = list(
+        AuthorStats.objects.filter(fill_pending=True)
+        .values_list('user_id', flat=True)
+    )
+    for author_id in author_ids:
+        with transaction.atomic():
+            AuthorStats.objects.filter(user_id=author_id).update(
+                fill_pending=False
+            )
+            fill([author_id])
+    return len(author_ids)
+
+
+def trim(user, author):
+    """
+    Убирает посты автора из ленты пользователя после отписки.
+    """
+    TimelineEntry.objects.filter(user=user, author=author).delete()
+
+
+def get_popular_authors(user):
+    """
+    Возвращает id авторов из подписок пользователя,
+    чьи посты не раскладываются по лентам.
+    """
+    return list(
+        Follow.objects.filter(
+            user=user,
+            following__stats__follower_count__gt=(
+                settings.TIMELINE_FANOUT_LIMIT
+            )
+        )
+        .order_by()
+        .values_list('following_id', flat=True)
+    )
+
+
+def get_feed_page(request, user):
+    """
+    Возвращает страницу ленты подписок пользователя.
+    Если среди подписок есть популярные авторы, лента сливается
+    из диапазона индекса ленты и диапазонов индекса
+    (author, -pub_date, -id) каждого популярного автора.
+    """
+    popular = get_popular_authors(user)
+    if popular:
+        entries = TimelineEntry.objects.filter(user=user).exclude(
+            author_id__in=popular
+        )
+        streams = [(entries, ('pub_date', 'post_id'))] + [
+            (Post.objects.filter(author_id=author_id), ('pub_date', 'pk'))
+            for author_id in popular
+        ]
+
+        def load(ids):
+            posts = Post.objects.for_cards().in_bulk(ids)
+            return [posts[pk] for pk in ids if pk in posts]
+
+        def count():
+            stats = AuthorStats.objects.filter(user_id__in=popular).aggregate(
+                total=Sum('post_count')
+            )
+            return entries.count() + (stats['total'] or 0)
+
+        return paginate(request, MergedFeed(streams, load, count))
+    entries = TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).only('pub_date', 'post', *(f'post__{name}' for name in CARD_FIELDS))
+    page = paginate(request, entries, key=('pub_date', 'post_id'))
+    page.object_list = [entry.post for entry in page.object_list]
+    return page
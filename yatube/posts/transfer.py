@@ -0,0 +1,338 @@
+"""
+Выгрузка и загрузка контента в формате NDJSON: одна запись JSON на строку.
+
+Записи идут в порядке зависимостей: пользователи, группы, посты,
+комментарии, подписки. На пользователей и группы записи ссылаются
+по username и slug, а посты и комментарии сохраняют свои id,
+поэтому повторная загрузка пачки не создает дублей. Если id поста
+или комментария уже занят другим объектом (загрузка в непустую базу),
+загрузка останавливается, а не прикрепляет комментарии к чужому посту.
+"""
+import datetime as dt
+import json
+import os
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from . import cache, counters, hot, objects, timeline
+from .models import Comment, Follow, Group, Post, User, make_excerpt
+
+# Больше переменных в одном запросе SQLite не принимает
+LOOKUP_CHUNK = 500
+
+USER_FIELDS = {
+    'username': 'username',
+    'password': 'password',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email',
+    'is_active': 'is_active',
+    'is_staff': 'is_staff',
+    'is_superuser': 'is_superuser',
+    'date_joined': 'date_joined',
+}
+GROUP_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+POST_FIELDS = {
+    'id': 'pk',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'image': 'image',
+    'thumbnail': 'thumbnail',
+}
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+FOLLOW_FIELDS = {
+    'user': 'user__username',
+    'following': 'following__username',
+}
+
+
+class ContentImportError(Exception):
+    pass
+
+
+def _export(record_type, queryset, fields, chunk_size):
+    rows = queryset.order_by('pk').values(*fields.values())
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = {'type': record_type}
+        for name, source in fields.items():
+            record[name] = row[source]
+        yield record
+
+
+def export_records(chunk_size=2000):
+    """
+    Отдает записи всего контента по одной. Строки читаются из базы
+    кусками по chunk_size, поэтому память не растет с размером базы.
+    """
+    yield from _export('user', User.objects, USER_FIELDS, chunk_size)
+    yield from _export('group', Group.objects, GROUP_FIELDS, chunk_size)
+    yield from _export('post', Post.objects, POST_FIELDS, chunk_size)
+    yield from _export('comment', Comment.objects, COMMENT_FIELDS, chunk_size)
+    yield from _export('follow', Follow.objects, FOLLOW_FIELDS, chunk_size)
+
+
+class ContentEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder обрезает даты до миллисекунд,
+    а выгрузка сохраняет их целиком.
+    """
+
+    def default(self, o):
+        if isinstance(o, dt.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump_record(record):
+    return json.dumps(record, cls=ContentEncoder, ensure_ascii=False)
+
+
+def read_checkpoint(path):
+    """
+    Возвращает число уже загруженных строк файла.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path) as checkpoint:
+        return json.load(checkpoint)['line']
+
+
+def write_checkpoint(path, line):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as checkpoint:
+        json.dump({'line': line}, checkpoint)
+    os.replace(temporary, path)
+
+
+@contextmanager
+def explicit_dates():
+    """
+    Отключает auto_now_add у дат постов и комментариев,
+    чтобы bulk_create сохранил даты из выгрузки.
+    """
+    fields = (
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'),
+    )
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def refresh_denormalized(models, batch_size=1000):
+    """
+    Приводит базу в порядок после bulk_create, который не вызывает
+    сигналы: сдвигает последовательности id моделей models после
+    вставки с явными id, пересчитывает счетчики, заполняет ленты подписок
+    и сбрасывает hot-листы лент и кеш объектов.
+    """
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+    counters.recount_comments(batch_size)
+    counters.recount_authors(batch_size)
+    timeline.fill(list(
+        Follow.objects.order_by()
+        .values_list('following_id', flat=True).distinct()
+    ))
+    hot.reset()
+    objects.reset()
+
+
+class Importer:
+    """
+    Загружает записи пачками по batch_size строк: каждая пачка
+    одного типа сохраняется одним bulk_create в своей транзакции.
+    Пользователи и группы ищутся по username и slug
+    через словари в памяти, которые дополняются по мере загрузки.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.users = {}
+        self.groups = {}
+        self.usernames = set()
+        self.slugs = set()
+        self.pending = []
+        self.pending_type = None
+        self.pending_line = 0
+        self.done_line = 0
+        self.loaded = 0
+
+    def add(self, record, line):
+        """
+        Добавляет запись из строки line. Если перед ней пачка
+        сохранилась, done_line указывает на последнюю сохраненную строку.
+        """
+        if (record.get('type') != self.pending_type
+                or len(self.pending) >= self.batch_size):
+            self.flush()
+        self.pending_type = record.get('type')
+        self.pending.append(record)
+        self.pending_line = line
+
+    def flush(self):
+        if self.pending:
+            loader = getattr(self, f'load_{self.pending_type}', None)
+            if loader is None:
+                raise ContentImportError(
+                    f'Неизвестный тип записи: {self.pending_type}'
+                )
+            with transaction.atomic(), explicit_dates():
+                loader(self.pending)
+            self.loaded += len(self.pending)
+            self.pending = []
+        self.done_line = self.pending_line
+
+    def resolve(self, model, field, names, known):
+        """
+        Дополняет словарь known (значение field -> id) недостающими
+        значениями из names и возвращает его.
+        """
+        missing = list({name for name in names if name not in known})
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            known.update(model.objects.filter(
+                **{f'{field}__in': missing[start:start + LOOKUP_CHUNK]}
+            ).values_list(field, 'pk'))
+        unknown = [name for name in missing if name not in known]
+        if unknown:
+            raise ContentImportError(
+                f'Не найдены {model.__name__}.{field}: '
+                + ', '.join(map(str, unknown[:10]))
+            )
+        return known
+
+    def user_ids(self, records, *fields):
+        names = [record[field] for record in records for field in fields]
+        self.usernames.update(names)
+        return self.resolve(User, 'username', names, self.users)
+
+    def group_ids(self, records):
+        slugs = [record['group'] for record in records if record['group']]
+        self.slugs.update(slugs)
+        return self.resolve(Group, 'slug', slugs, self.groups)
+
+    def check_ids(self, model, records, fields, values_of):
+        """
+        Проверяет, что уже занятые id записей принадлежат тем же
+        объектам (повторная загрузка пачки), сравнивая поля fields
+        объекта в базе со значениями values_of(record).
+        """
+        ids = [record['id'] for record in records]
+        existing = {}
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            existing.update(
+                (pk, values) for pk, *values in model.objects.filter(
+                    pk__in=ids[start:start + LOOKUP_CHUNK]
+                ).values_list('pk', *fields)
+            )
+        clashes = [
+            record['id'] for record in records
+            if record['id'] in existing
+            and existing[record['id']] != values_of(record)
+        ]
+        if clashes:
+            raise ContentImportError(
+                f'id {model.__name__} уже заняты другими объектами: '
+                + ', '.join(map(str, clashes[:10]))
+                + '. Выгрузку можно загрузить только в базу без них'
+            )
+
+    def load_user(self, records):
+        # В выгрузках без флагов is_staff/is_superuser
+        # пользователи получают значения по умолчанию
+        User.objects.bulk_create(
+            (User(date_joined=parse_datetime(record['date_joined']),
+                  **{name: record[name] for name in USER_FIELDS
+                     if name != 'date_joined' and name in record})
+             for record in records),
+            ignore_conflicts=True
+        )
+
+    def load_group(self, records):
+        Group.objects.bulk_create(
+            (Group(**{name: record[name] for name in GROUP_FIELDS})
+             for record in records),
+            ignore_conflicts=True
+        )
+
+    def load_post(self, records):
+        users = self.user_ids(records, 'author')
+        groups = self.group_ids(records)
+        self.check_ids(
+            Post, records, ('author_id', 'pub_date'),
+            lambda record: [users[record['author']],
+                            parse_datetime(record['pub_date'])]
+        )
+        Post.objects.bulk_create(
+            (Post(pk=record['id'],
+                  author_id=users[record['author']],
+                  group_id=groups.get(record['group']),
+                  text=record['text'],
+                  excerpt=make_excerpt(record['text']),
+                  pub_date=parse_datetime(record['pub_date']),
+                  image=record['image'],
+                  thumbnail=record['thumbnail'])
+             for record in records),
+            ignore_conflicts=True
+        )
+
+    def load_comment(self, records):
+        users = self.user_ids(records, 'author')
+        self.check_ids(
+            Comment, records, ('post_id', 'author_id', 'created'),
+            lambda record: [record['post'], users[record['author']],
+                            parse_datetime(record['created'])]
+        )
+        Comment.objects.bulk_create(
+            (Comment(pk=record['id'],
+                     post_id=record['post'],
+                     author_id=users[record['author']],
+                     text=record['text'],
+                     created=parse_datetime(record['created']))
+             for record in records),
+            ignore_conflicts=True
+        )
+
+    def load_follow(self, records):
+        users = self.user_ids(records, 'user', 'following')
+        Follow.objects.bulk_create(
+            (Follow(user_id=users[record['user']],
+                    following_id=users[record['following']])
+             for record in records),
+            ignore_conflicts=True
+        )
+
+    def finish(self):
+        """
+        Сохраняет последнюю пачку и пересчитывает то, что при обычном
+        сохранении поддерживают сигналы: счетчики, ленты подписок
+        и версии закешированных лент.
+        """
+        self.flush()
+        refresh_denormalized([Post, Comment], self.batch_size)
+        cache.bump(
+            cache.index_scope(),
+            *(cache.group_scope(slug) for slug in self.slugs),
+            *(cache.profile_scope(username) for username in self.usernames)
+        )
@@ -9,9 +9,13 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('new/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
     path('<username>/', views.profile, name='profile'),
     path('<username>/<int:post_id>/', views.post_detail, name='post_detail'),
     path('<username>/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('<username>/<int:post_id>/comments/',
+         views.comments,
+         name='comments'),
     path('<username>/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
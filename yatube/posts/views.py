@@ -1,38 +1,41 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.core.paginator import Paginator
-from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
-
-from yatube.settings import ELEMENTS_PER_PAGE
-
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
+
+from . import hot, objects, thumbnails, timeline
+from .cache import cache_feed, group_scope, index_scope, profile_scope
+from .conditional import conditional_feed, post_etag, post_last_modified
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Post
+from .paginators import CursorPaginator, paginate
+from .resolvers import get_post_or_404
+from .search import SearchPaginator, is_available
 
 User = get_user_model()
 
 
-@cache_page(20, key_prefix='index_page')
+@cache_feed(index_scope)
 def index(request):
     template = 'posts/index.html'
-    posts = Post.objects.select_related('group').all()
-    paginator = Paginator(posts, ELEMENTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = Post.objects.for_cards()
+    page = hot.paginate(request, index_scope(), posts)
     context = {
         'page': page
     }
     return render(request, template, context)
 
 
+@conditional_feed(group_scope)
+@cache_feed(group_scope)
 def group_posts(request, slug):
     template = 'posts/group.html'
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, ELEMENTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    group = objects.groups.get_or_404(slug=slug)
+    posts = group.posts.for_cards()
+    page = hot.paginate(request, group_scope(slug), posts)
     context = {
         'group': group,
         'page': page
@@ -40,36 +43,73 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    if is_available():
+        page = SearchPaginator(query, settings.ELEMENTS_PER_PAGE).page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before')
+        )
+    else:
+        posts = Post.objects.for_cards()
+        if query:
+            posts = posts.filter(text__icontains=query)
+        else:
+            posts = posts.none()
+        page = paginate(request, posts)
+    context = {
+        'query': query,
+        'query_prefix': urlencode({'q': query}) + '&',
+        'page': page
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@conditional_feed(profile_scope)
+@cache_feed(profile_scope)
 def profile(request, username):
     user = request.user
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, ELEMENTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = False
-    try:
-        Follow.objects.get(user=user, author=author)
-    except ObjectDoesNotExist:
-        pass
-    except MultipleObjectsReturned:
-        following = True
-    else:
-        following = True
-    finally:
-        context = {
-            'author': author,
-            'page': page,
-            'following': following
-        }
-        return render(request, template, context)
+    author = objects.users.get_or_404(username=username)
+    posts = author.posts.for_cards()
+    stats = getattr(author, 'stats', None)
+    page = paginate(
+        request, posts, count=stats.post_count if stats else None
+    )
+    following = (
+        user.is_authenticated
+        and Follow.objects.filter(user=user, following=author).exists()
+    )
+    context = {
+        'author': author,
+        'page': page,
+        'following': following
+    }
+    return render(request, template, context)
+
+
+def comments_context(request, username, post_id, comments):
+    """
+    Первая страница комментариев comments или страница после курсора
+    ?after=. Комментарии идут от старых к новым по индексу (post, created).
+    """
+    comments = comments.select_related('author')
+    paginator = CursorPaginator(
+        comments, settings.COMMENTS_PER_PAGE,
+        key=('created', 'pk'), descending=False
+    )
+    return {
+        'comments': paginator.page(after=request.GET.get('after')),
+        'username': username,
+        'post_id': post_id,
+    }
 
 
+@condition(etag_func=post_etag, last_modified_func=post_last_modified)
 def post_detail(request, username, post_id):
     template = 'posts/post_detail.html'
-    author = get_object_or_404(User, username=username)
-    post = get_object_or_404(author.posts, pk=post_id)
+    post = get_post_or_404(request, username, post_id)
+    author = post.author
     if request.POST:
         form = CommentForm(request.POST)
         if form.is_valid():
@@ -82,37 +122,59 @@ def post_detail(request, username, post_id):
     context = {
         'author': author,
         'post': post,
-        'form': form
+        'form': form,
+        **comments_context(
+            request, author.username, post.pk, post.comments.all()
+        )
     }
     return render(request, template, context)
 
 
+def comments(request, username, post_id):
+    """
+    Фрагмент со следующей страницей комментариев для подгрузки
+    при прокрутке страницы поста.
+    """
+    comments = Comment.objects.filter(
+        post_id=post_id, post__author__username=username
+    )
+    context = comments_context(request, username, post_id, comments)
+    if not context['comments'] and not Post.objects.filter(
+        pk=post_id, author__username=username
+    ).exists():
+        raise Http404
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if request.method == 'POST':
         if form.is_valid():
-            Post.objects.create(
+            post = Post.objects.create(
                 text=form.cleaned_data['text'],
                 author=request.user,
                 group=form.cleaned_data['group'],
                 image=form.cleaned_data['image']
             )
+            thumbnails.schedule(post)
             return redirect('posts:index')
     return render(request, 'posts/create_post.html', {'form': form})
 
 
 @login_required
 def post_edit(request, username, post_id):
-    author = get_object_or_404(User, username=username)
-    post = get_object_or_404(author.posts, pk=post_id)
+    post = get_post_or_404(request, username, post_id)
+    author = post.author
     if request.user != author:
         return redirect('posts:post_detail', author.username, post_id)
     form = PostForm(request.POST or None,
                     files=request.FILES or None,
                     instance=post)
     if request.POST and form.is_valid():
-        form.save()
+        post = form.save()
+        if 'image' in form.changed_data:
+            thumbnails.schedule(post)
         return redirect('posts:post_detail', author.username, post_id)
     return render(request, 'posts/create_post.html',
                   {'is_edit': True, 'form': form, 'post': post})
@@ -121,8 +183,8 @@ def post_edit(request, username, post_id):
 @login_required
 def add_comment(request, username, post_id):
     template = 'posts/comment.html'
-    author = get_object_or_404(User, username=username)
-    post = get_object_or_404(author.posts, pk=post_id)
+    post = get_post_or_404(request, username, post_id)
+    author = post.author
     if request.POST:
         form = CommentForm(request.POST)
         if form.is_valid():
@@ -132,46 +194,42 @@ def add_comment(request, username, post_id):
                 author=request.user,
             )
         return redirect('posts:post_detail', author.username, post_id)
-    comments = post.comments.all()
     form = CommentForm()
     context = {
         'form': form,
-        'comments': comments
+        **comments_context(
+            request, author.username, post.pk, post.comments.all()
+        )
     }
     return render(request, template, context)
 
 
 @login_required
 def follow_index(request):
-    user = request.user
-    authors = []
-    for follow in Follow.objects.filter(user=user):
-        authors.append(follow.author)
-    posts = Post.objects.filter(author__in=authors)
-    paginator = Paginator(posts, ELEMENTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    page = timeline.get_feed_page(request, request.user)
     return render(request, 'posts/follow.html', {'page': page})
 
 
 @login_required
 def profile_follow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
+    author = objects.users.get_or_404(username=username)
     if user != author:
-        if not Follow.objects.filter(user=user, author=author).exists():
+        if not Follow.objects.filter(user=user, following=author).exists():
             Follow.objects.create(
                 user=user,
-                author=author
+                following=author
             )
+            timeline.backfill(user, author)
     return redirect('posts:follow_index')
 
 
 @login_required
 def profile_unfollow(request, username):
     user = request.user
-    author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=user, author=author).delete()
+    author = objects.users.get_or_404(username=username)
+    Follow.objects.filter(user=user, following=author).delete()
+    timeline.trim(user, author)
     return redirect('posts:follow_index')
 
 
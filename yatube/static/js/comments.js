@@ -0,0 +1,42 @@
+// Подгружает следующую страницу комментариев, когда ссылка
+// "Показать еще комментарии" появляется на экране.
+// Без JavaScript ссылка открывает следующую страницу целиком.
+(function () {
+  if (!('IntersectionObserver' in window) || !window.fetch) {
+    return;
+  }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (entry.isIntersecting) {
+        observer.unobserve(entry.target);
+        load(entry.target);
+      }
+    });
+  });
+
+  function observe() {
+    document.querySelectorAll('.js-more-comments').forEach(function (link) {
+      observer.observe(link);
+    });
+  }
+
+  function load(link) {
+    fetch(link.dataset.fragment, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        link.insertAdjacentHTML('beforebegin', html);
+        link.remove();
+        observe();
+      })
+      .catch(function () {
+        // Ссылка остается и открывает следующую страницу по клику
+      });
+  }
+
+  observe();
+})();
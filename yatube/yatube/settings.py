@@ -1,4 +1,5 @@
 import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -26,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,10 +40,13 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Тесты всегда работают с кешем в памяти процесса
+TEST_RUNNER = 'core.runner.TestRunner'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR, ],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -57,13 +63,68 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# DATABASE_PROFILE=production включает журнал WAL, отображение файла
+# базы в память и постоянные соединения (см. core/db.py)
+DATABASE_PROFILES = {
+    'default': {
+        'CONN_MAX_AGE': 0,
+        'PRAGMAS': {},
+    },
+    'production': {
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', default=600)),
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': int(
+                os.getenv('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024)
+            ),
+            # Отрицательное значение - размер кеша страниц в КиБ
+            'cache_size': -int(
+                os.getenv('SQLITE_CACHE_KIB', default=64 * 1024)
+            ),
+            'busy_timeout': int(
+                os.getenv('SQLITE_BUSY_TIMEOUT', default=5000)
+            ),
+        },
+    },
+}
+DATABASE_PROFILE = DATABASE_PROFILES[
+    os.getenv('DATABASE_PROFILE', default='default')
+]
+SQLITE_PRAGMAS = DATABASE_PROFILE['PRAGMAS']
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': DATABASE_PROFILE['CONN_MAX_AGE'],
     }
 }
 
+# Копии базы для чтения: пути к файлам SQLite через запятую.
+# Копии обновляет команда sync_replicas (см. core/routers.py)
+DATABASE_REPLICAS = []
+for number, path in enumerate(filter(None, os.getenv(
+    'DATABASE_REPLICA_PATHS', default=''
+).split(',')), 1):
+    DATABASE_REPLICAS.append(f'replica{number}')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Чтения каких view-функций идут в копии
+REPLICA_VIEW_MODULES = ('posts.views',)
+# Модели каких приложений читаются из копий
+REPLICA_APP_LABELS = ('posts', 'auth')
+# Сколько секунд после записи пользователь читает из основной базы;
+# должно быть больше интервала sync_replicas
+REPLICA_STICKY_SECONDS = int(
+    os.getenv('REPLICA_STICKY_SECONDS', default=30)
+)
+REPLICA_STICKY_COOKIE = 'read_primary'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -79,10 +140,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# По умолчанию у каждого процесса свой кеш в памяти (locmem).
+# CACHE_BACKEND=sqlite - кеш, общий для всех воркеров хоста, в файле
+# CACHE_LOCATION; каталог файла должен быть доступен только владельцу
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'core.cache.LocMemCache',
+    },
+    'sqlite': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', default=50000)),
+            'MAX_SIZE': int(
+                os.getenv('CACHE_MAX_SIZE', default=256 * 1024 * 1024)
+            ),
+        },
+    },
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', default='locmem')
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'default': CACHE_BACKENDS[CACHE_BACKEND]
 }
 
 LANGUAGE_CODE = 'ru'
@@ -109,3 +187,91 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 ELEMENTS_PER_PAGE = 10
+# Столько первых страниц главной и лент групп отдается
+# из списков id последних постов в кеше
+HOT_FEED_PAGES = int(os.getenv('HOT_FEED_PAGES', default=5))
+# Комментарии на странице поста, остальные подгружаются при прокрутке
+COMMENTS_PER_PAGE = 20
+
+# 'pages' - нумерованные страницы, 'cursor' - курсорные (?after=/?before=)
+PAGINATION_MODE = os.getenv('PAGINATION_MODE', default='pages')
+# Сколько секунд хранится число записей ленты для нумерованных страниц
+PAGE_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGE_COUNT_CACHE_TIMEOUT', default=60)
+)
+# До этого числа строк паджинатор с оценкой считает их точно,
+# дальше оценивает число строк по максимальному id
+EXACT_COUNT_LIMIT = int(os.getenv('EXACT_COUNT_LIMIT', default=10000))
+
+# Посты авторов, у которых подписчиков больше порога, не раскладываются
+# по лентам при публикации, а подмешиваются в ленту при чтении
+TIMELINE_FANOUT_LIMIT = int(os.getenv('TIMELINE_FANOUT_LIMIT', default=1000))
+# Сколько последних постов автора попадает в ленту при подписке
+TIMELINE_BACKFILL_LIMIT = int(
+    os.getenv('TIMELINE_BACKFILL_LIMIT', default=1000)
+)
+
+# Бюджет страницы по имени view: число запросов и время в мс.
+# Значения 'default' действуют для всех страниц
+REQUEST_BUDGETS = {
+    'default': {'queries': 20, 'sql_ms': 200, 'total_ms': 1000},
+}
+# 'warn' - предупреждение в лог, 'raise' - исключение RequestBudgetExceeded
+REQUEST_BUDGET_ACTION = os.getenv('REQUEST_BUDGET_ACTION', default='warn')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', default='WARNING'),
+        },
+    },
+}
+
+# Сколько секунд хранятся страницы лент и hot-листы; устаревшие
+# страницы сбрасываются при изменении постов и комментариев.
+# В кеше процесса сброс не доходит до других воркеров, поэтому
+# с CACHE_BACKEND=locmem страницы хранятся не дольше
+# LOCAL_FEED_CACHE_TIMEOUT секунд (иначе предупреждение core.W001)
+LOCAL_FEED_CACHE_TIMEOUT = 20
+FEED_CACHE_TIMEOUT = int(os.getenv(
+    'FEED_CACHE_TIMEOUT',
+    default=(LOCAL_FEED_CACHE_TIMEOUT if CACHE_BACKEND == 'locmem'
+             else 60 * 60 * 6)
+))
+# Сколько секунд после срока страница ленты еще может отдаваться,
+# пока один воркер ее пересчитывает
+FEED_CACHE_STALE_TIMEOUT = int(os.getenv(
+    'FEED_CACHE_STALE_TIMEOUT',
+    default=0 if CACHE_BACKEND == 'locmem' else 60 * 10
+))
+FEED_CACHE_LOCK_TIMEOUT = 10
+# Коэффициент досрочного пересчета: больше - пересчет раньше срока
+FEED_CACHE_BETA = float(os.getenv('FEED_CACHE_BETA', default=1.0))
+
+# Сколько секунд хранится отрендеренная карточка поста; при изменении
+# поста или его комментариев карточка получает новый ключ
+POST_CARD_CACHE_TIMEOUT = int(
+    os.getenv('POST_CARD_CACHE_TIMEOUT', default=60 * 60 * 24)
+)
+
+# Кеш объектов: сколько секунд объект хранится в общем кеше
+# и в кеше процесса (L1), который не сбрасывается из других процессов
+OBJECT_CACHE_TIMEOUT = int(os.getenv('OBJECT_CACHE_TIMEOUT', default=60 * 5))
+OBJECT_CACHE_LOCAL_TIMEOUT = float(
+    os.getenv('OBJECT_CACHE_LOCAL_TIMEOUT', default=5)
+)
+OBJECT_CACHE_LOCAL_MAX_ENTRIES = 10000
+
+# Миниатюры изображений постов готовятся в пуле процессов после
+# сохранения поста; 0 - готовить сразу в текущем процессе
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', default=2))
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}